@@ -1,13 +1,25 @@
-from django.contrib.auth.hashers import check_password, make_password
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
 from accounts.models import User
+from accounts.utils.cache_utils import UsuarioCache
+from accounts.utils.senha_utils import SenhaUtils
 
 
 class Authentication:
     def signin(self, email:str, password:str) -> User | bool:
         user = User.objects.filter(email=email).first()
         
-        if user and check_password(password, user.password):
-            return user
+        if user:
+            valida, novo_hash = SenhaUtils.verificar_sync(password, user.password)
+            if valida:
+                self._atualizar_hash(user, novo_hash)
+                return user
         
         return False
     
@@ -21,4 +33,65 @@ class Authentication:
             password=make_password(password)
         )
         
-        return user
\ No newline at end of file
+        return user
+
+    async def asignin(self, email:str, password:str) -> User | bool:
+        """signin para views assíncronas, com o hash fora do event loop"""
+        user = await User.objects.filter(email=email).afirst()
+
+        if user:
+            valida, novo_hash = await SenhaUtils.verificar(password, user.password)
+            if valida:
+                await sync_to_async(self._atualizar_hash)(user, novo_hash)
+                return user
+
+        return False
+
+    async def asignup(self, name:str, email:str, password:str) -> User | bool:
+        """signup para views assíncronas, com o hash fora do event loop"""
+        if await User.objects.filter(email=email).aexists():
+            return False
+
+        return await User.objects.acreate(
+            name=name,
+            email=email,
+            password=await SenhaUtils.gerar(password)
+        )
+
+    def _atualizar_hash(self, user:User, novo_hash:str | None):
+        # Hasher ou parâmetros (ex: iterações) mudaram: grava o hash atual
+        if novo_hash:
+            user.password = novo_hash
+            user.save(update_fields=['password'])
+
+class JWTCacheAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que busca o usuário no UsuarioCache
+    No caso comum a validação do token não faz nenhuma consulta ao banco
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification")
+
+        try:
+            user = UsuarioCache.obter(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                "User not found", code="user_not_found")
+
+        # Mesmas verificações do JWTAuthentication
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed")
+
+        return user
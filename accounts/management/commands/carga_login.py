@@ -0,0 +1,100 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga do signin: dispara logins simultâneos contra um ou mais "
+        "servidores (ex: WSGI com as views síncronas e ASGI com as assíncronas) "
+        "e mede a latência de uma rota leve durante a rajada"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+',
+                            help="URLs base dos servidores (ex: http://127.0.0.1:8000)")
+        parser.add_argument('--email', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--requisicoes', type=int, default=200)
+        parser.add_argument('--concorrencia', type=int, default=20)
+        parser.add_argument('--sonda', default='/api/v1/accounts/me',
+                            help="Rota leve medida durante a rajada de logins")
+
+    def handle(self, *args, **options):
+        for url in options['urls']:
+            url = url.rstrip('/')
+            resposta = requests.post(
+                f"{url}/api/v1/accounts/signin",
+                json={'email': options['email'], 'password': options['password']},
+                timeout=30
+            )
+            if resposta.status_code != 200:
+                raise CommandError(
+                    f"{url}: login falhou ({resposta.status_code}), confira e-mail e senha")
+
+            self._medir(url, options)
+
+    def _medir(self, url, options):
+        sessao = threading.local()
+        fim = threading.Event()
+        latencias = []
+        sondas = []
+        falhas = 0
+
+        def login():
+            if not hasattr(sessao, 'valor'):
+                sessao.valor = requests.Session()
+            inicio = time.perf_counter()
+            resposta = sessao.valor.post(
+                f"{url}/api/v1/accounts/signin",
+                json={'email': options['email'], 'password': options['password']},
+                timeout=60
+            )
+            return resposta.status_code, time.perf_counter() - inicio
+
+        def sondar():
+            # Requisição leve em paralelo: mostra se o worker ficou bloqueado
+            with requests.Session() as s:
+                while not fim.is_set():
+                    inicio = time.perf_counter()
+                    s.get(f"{url}{options['sonda']}", timeout=60)
+                    sondas.append(time.perf_counter() - inicio)
+                    time.sleep(0.05)
+
+        sonda = threading.Thread(target=sondar, daemon=True)
+        inicio = time.perf_counter()
+        sonda.start()
+
+        with ThreadPoolExecutor(max_workers=options['concorrencia']) as executor:
+            for status, latencia in executor.map(
+                lambda _: login(), range(options['requisicoes'])
+            ):
+                latencias.append(latencia)
+                if status != 200:
+                    falhas += 1
+
+        total = time.perf_counter() - inicio
+        fim.set()
+        sonda.join()
+
+        self.stdout.write(
+            f"{url}: {options['requisicoes']} logins em {total:.2f} s "
+            f"({options['requisicoes'] / total:.1f}/s, {falhas} falhas) | "
+            f"login p50 {self._percentil(latencias, 50):.0f} ms "
+            f"p95 {self._percentil(latencias, 95):.0f} ms | "
+            f"sonda p50 {self._percentil(sondas, 50):.0f} ms "
+            f"p95 {self._percentil(sondas, 95):.0f} ms"
+        )
+
+    @staticmethod
+    def _percentil(valores, percentil):
+        if not valores:
+            return 0.0
+        if len(valores) == 1:
+            return valores[0] * 1000
+        return statistics.quantiles(valores, n=100)[percentil - 1] * 1000
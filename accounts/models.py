@@ -17,6 +17,8 @@ class UserManager(BaseUserManager):
 
 class User(AbstractBaseUser):
     avatar = models.TextField(default='/media/avatars/default-avatar.png')
+    # Hash do conteúdo do avatar enviado (nome dos arquivos reduzidos)
+    avatar_hash = models.CharField(max_length=64, null=True, db_index=True)
     name = models.CharField(max_length=80)
     email = models.EmailField(unique=True)
     is_superuser = models.BooleanField(default=False)
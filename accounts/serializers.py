@@ -3,15 +3,37 @@ from django.conf import settings
 from rest_framework import serializers
 
 from accounts.models import User
+from accounts.utils.avatar_utils import AvatarUtils
+from app.utils.midia_utils import MidiaUtils
 
 
 class UserModelSerializer(serializers.ModelSerializer):
+    avatars = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['id', 'avatar', 'name', 'email', 'last_access']
+        fields = ['id', 'avatar', 'avatars', 'name', 'email', 'last_access']
+
+    def get_avatars(self, instance):
+        # URLs por tamanho e formato: {'64': {'webp': ..., 'jpg': ...}, '256': {...}}
+        if not instance.avatar_hash:
+            padrao = f"{settings.CURRENT_URL}{MidiaUtils.versionar(instance.avatar)}"
+            return {
+                str(tamanho): {extensao: padrao for extensao in AvatarUtils.FORMATOS}
+                for tamanho in AvatarUtils.TAMANHOS
+            }
+
+        return {
+            tamanho: {
+                extensao: f"{settings.CURRENT_URL}{url}"
+                for extensao, url in urls.items()
+            }
+            for tamanho, urls in AvatarUtils.urls(instance.avatar_hash).items()
+        }
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data['avatar'] = f"{settings.CURRENT_URL}{instance.avatar}"
+        # URL versionada pelo conteúdo: pode ficar em cache indefinidamente
+        data['avatar'] = f"{settings.CURRENT_URL}{MidiaUtils.versionar(instance.avatar)}"
 
         return data
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from accounts.utils.cache_utils import UsuarioCache
+
+
+@receiver(post_save, sender=User)
+def invalidar_usuario_ao_salvar(sender, instance, created, **kwargs):
+    # Perfil, senha ou desativação: a próxima requisição relê o usuário
+    # Após o commit, para que outra requisição não salve a linha antiga
+    if not created:
+        user_id = instance.pk
+        transaction.on_commit(lambda: UsuarioCache.invalidar(user_id))
+
+
+@receiver(post_delete, sender=User)
+def invalidar_usuario_ao_excluir(sender, instance, **kwargs):
+    # O pk da instância é apagado ao final da exclusão
+    user_id = instance.pk
+    transaction.on_commit(lambda: UsuarioCache.invalidar(user_id))
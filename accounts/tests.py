@@ -1,3 +1,347 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from accounts.utils.avatar_utils import AvatarUtils
+from accounts.utils.senha_utils import SenhaUtils
+from accounts.utils.ultimo_acesso_utils import UltimoAcessoBuffer
+from accounts.views import AsyncSignInView, AsyncSignUpView
+
+
+def imagem(formato='PNG', tamanho=(600, 400)):
+    conteudo = io.BytesIO()
+    Image.new('RGB', tamanho, (200, 30, 30)).save(conteudo, formato)
+    return conteudo.getvalue()
+
+
+class AvatarTests(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _enviar(self, conteudo, content_type='image/png'):
+        return self.client.put('/api/v1/accounts/me', {
+            'name': 'Teste', 'email': 'teste@teste.com',
+            'avatar': SimpleUploadedFile('avatar.png', conteudo, content_type=content_type),
+        }, format='multipart')
+
+    def _aguardar_pool(self):
+        # Redução e gravação no usuário acontecem nas threads do pool
+        limite = time.monotonic() + 10
+        while AvatarUtils._em_andamento or AvatarUtils._pendentes:
+            self.assertLess(time.monotonic(), limite)
+            time.sleep(0.01)
+        self.user.refresh_from_db()
+
+    def test_avatar_gravado_depois_dos_tamanhos_reduzidos(self):
+        response = self._enviar(imagem())
+
+        self.assertEqual(response.status_code, 202)
+        # Até a redução terminar o usuário mantém o avatar anterior
+        self.assertEqual(response.json()['user']['avatar'].split('/media/')[1],
+                         'avatars/default-avatar.png')
+
+        self._aguardar_pool()
+        self.assertTrue(AvatarUtils.existe(self.user.avatar_hash))
+        response = self.client.get('/api/v1/accounts/me')
+        self.assertEqual(
+            response.json()['user']['avatars']['64']['webp'].split('/media/')[1],
+            f'avatars/{self.user.avatar_hash}-64.webp')
+
+        with Image.open(AvatarUtils.diretorio() / f'{self.user.avatar_hash}-256.jpg') as reduzida:
+            self.assertEqual(reduzida.size, (256, 256))
+
+    def test_requisicao_nao_espera_a_reducao(self):
+        liberar = threading.Event()
+        processar = AvatarUtils._processar
+
+        def processar_depois(*args):
+            self.assertTrue(liberar.wait(10))
+            return processar(*args)
+
+        with mock.patch.object(AvatarUtils, '_processar', processar_depois):
+            response = self._enviar(imagem())
+            self.assertEqual(response.status_code, 202)
+            self.user.refresh_from_db()
+            self.assertIsNone(self.user.avatar_hash)
+
+            liberar.set()
+            self._aguardar_pool()
+
+        self.assertTrue(AvatarUtils.existe(self.user.avatar_hash))
+
+    def test_mesmo_conteudo_ja_processado(self):
+        conteudo = imagem()
+        self._enviar(conteudo)
+        self._aguardar_pool()
+        hash_ = self.user.avatar_hash
+
+        User.objects.filter(pk=self.user.pk).update(
+            avatar_hash=None, avatar='/media/avatars/default-avatar.png')
+        response = self._enviar(conteudo)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['avatar'].split('/media/')[1],
+                         f'avatars/{hash_}-256.jpg')
+
+    def test_imagem_truncada_nao_altera_o_usuario(self):
+        # O cabeçalho é válido, a decodificação falha no pool
+        conteudo = imagem('JPEG')
+        response = self._enviar(conteudo[:len(conteudo) // 2], 'image/jpeg')
+
+        self.assertEqual(response.status_code, 202)
+        self._aguardar_pool()
+        self.assertIsNone(self.user.avatar_hash)
+        self.assertEqual(list(AvatarUtils.diretorio().glob('*-*.*')), [])
+
+    def test_arquivo_que_nao_e_imagem(self):
+        response = self._enviar(b'nao sou uma imagem')
+
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.avatar_hash)
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class SignInSignUpTests(TestCase):
+    """As views assíncronas (servidor ASGI) respondem como as síncronas"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create(
+            name='Teste', email='teste@teste.com', password=make_password('senha123'))
+
+    async def _async(self, view, url, dados):
+        request = self.factory.post(
+            url, json.dumps(dados), content_type='application/json')
+        response = await view.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    def _sync(self, url, dados):
+        response = self.client.post(url, dados, format='json')
+        return response.status_code, response.json()
+
+    async def _comparar(self, view, url, dados):
+        status_sync, corpo_sync = await sync_to_async(self._sync)(url, dados)
+        status_async, corpo_async = await self._async(view, url, dados)
+
+        self.assertEqual(status_async, status_sync)
+        if status_sync == 200:
+            self.assertEqual(corpo_async['user'], corpo_sync['user'])
+            self.assertTrue(corpo_async['access_token'])
+        else:
+            self.assertEqual(corpo_async, corpo_sync)
+        return status_async
+
+    async def test_signin(self):
+        url = '/api/v1/accounts/signin'
+        for dados, esperado in (
+            ({'email': 'teste@teste.com', 'password': 'senha123'}, 200),
+            ({'email': 'teste@teste.com', 'password': 'errada'}, 401),
+            ({'email': 'outro@teste.com', 'password': 'senha123'}, 401),
+            ({}, 401),
+        ):
+            with self.subTest(dados=dados):
+                self.assertEqual(
+                    await self._comparar(AsyncSignInView, url, dados), esperado)
+
+    async def test_signup(self):
+        url = '/api/v1/accounts/signup'
+        status, _ = await self._async(AsyncSignUpView, url, {
+            'name': 'Novo', 'email': 'novo@teste.com', 'password': 'senha123'})
+        self.assertEqual(status, 200)
+
+        novo = await User.objects.aget(email='novo@teste.com')
+        self.assertTrue(novo.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(check_password('senha123', novo.password))
+
+        for dados in (
+            {'name': 'Teste', 'email': 'teste@teste.com', 'password': 'senha123'},
+            {'name': '', 'email': 'vazio@teste.com', 'password': 'senha123'},
+        ):
+            with self.subTest(dados=dados):
+                self.assertEqual(
+                    await self._comparar(AsyncSignUpView, url, dados), 401)
+
+    async def test_hash_da_senha_fora_do_event_loop(self):
+        verificar_sync = SenhaUtils.verificar_sync
+        threads = []
+
+        def verificar(*args):
+            threads.append(threading.current_thread().name)
+            return verificar_sync(*args)
+
+        with mock.patch.object(SenhaUtils, 'verificar_sync', verificar):
+            status, _ = await self._async(AsyncSignInView, '/api/v1/accounts/signin', {
+                'email': 'teste@teste.com', 'password': 'senha123'})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('senha-hash'))
+
+    def test_hash_antigo_atualizado_no_login(self):
+        for nome, signin in (
+            ('sync', lambda dados: self._sync('/api/v1/accounts/signin', dados)[0]),
+            ('async', lambda dados: async_to_sync(self._async)(
+                AsyncSignInView, '/api/v1/accounts/signin', dados)[0]),
+        ):
+            with self.subTest(view=nome):
+                User.objects.filter(pk=self.user.pk).update(
+                    password=make_password('senha123', hasher='md5'))
+
+                self.assertEqual(signin({'email': 'teste@teste.com', 'password': 'errada'}), 401)
+                self.user.refresh_from_db()
+                self.assertTrue(self.user.password.startswith('md5$'))
+
+                self.assertEqual(signin({'email': 'teste@teste.com', 'password': 'senha123'}), 200)
+                self.user.refresh_from_db()
+                self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+                self.assertTrue(check_password('senha123', self.user.password))
+
+
+class UsuarioCacheTests(TestCase):
+    URL = '/api/v1/accounts/me'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        consultas_usuario = [
+            consulta['sql'] for consulta in consultas if '"users"' in consulta['sql']]
+        return response.json()['user'], consultas_usuario
+
+    def test_segunda_requisicao_nao_consulta_o_usuario(self):
+        _, consultas = self._get()
+        self.assertEqual(len(consultas), 1)
+
+        user, consultas = self._get()
+        self.assertEqual(consultas, [])
+        self.assertEqual(user['name'], 'Teste')
+
+    def test_releitura_apos_commit_do_save(self):
+        self._get()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.name = 'Alterado'
+            self.user.save()
+
+            # Antes do commit a cópia em cache continua valendo
+            user, consultas = self._get()
+            self.assertEqual(consultas, [])
+            self.assertEqual(user['name'], 'Teste')
+
+        for callback in callbacks:
+            callback()
+
+        user, consultas = self._get()
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(user['name'], 'Alterado')
+
+        _, consultas = self._get()
+        self.assertEqual(consultas, [])
+
+
+@override_settings(ULTIMO_ACESSO_MINIMO=0, ULTIMO_ACESSO_INTERVALO=60)
+class UltimoAcessoBufferTests(TestCase):
+    def setUp(self):
+        self.agora = now()
+        self.users = [
+            User.objects.create(name=f'Teste {indice}', email=f'teste{indice}@teste.com')
+            for indice in range(3)
+        ]
+        # Parte de um último acesso antigo para todos
+        User.objects.update(last_access=self.agora - timedelta(days=1))
+        for user in self.users:
+            user.refresh_from_db()
+
+        # Sem a thread de gravação: o teste chama descarregar()
+        iniciar = mock.patch.object(UltimoAcessoBuffer, '_iniciar')
+        iniciar.start()
+        self.addCleanup(iniciar.stop)
+        self.addCleanup(setattr, UltimoAcessoBuffer, '_pendentes', {})
+        self.addCleanup(setattr, UltimoAcessoBuffer, '_gravados', {})
+        UltimoAcessoBuffer._pendentes = {}
+        UltimoAcessoBuffer._gravados = {}
+
+    def _registrar(self, user, instante):
+        with mock.patch('accounts.utils.ultimo_acesso_utils.now', return_value=instante):
+            UltimoAcessoBuffer.registrar(user)
+
+    def _acessos(self):
+        return dict(User.objects.values_list('id', 'last_access'))
+
+    def test_um_update_para_varios_usuarios(self):
+        esperados = {}
+        for indice, user in enumerate(self.users):
+            esperados[user.pk] = self.agora + timedelta(seconds=indice)
+            self._registrar(user, esperados[user.pk])
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(UltimoAcessoBuffer.descarregar(), 3)
+
+        self.assertEqual(len(consultas), 1)
+        self.assertTrue(consultas[0]['sql'].startswith('UPDATE'))
+        self.assertEqual(self._acessos(), esperados)
+
+        # Nada pendente: nenhuma consulta
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(UltimoAcessoBuffer.descarregar(), 0)
+        self.assertEqual(len(consultas), 0)
+
+    def test_acesso_antigo_nao_sobrescreve_o_novo(self):
+        recente, antigo, outro = self.users
+        mais_novo = self.agora + timedelta(hours=1)
+        # Gravado por outro processo depois do registro deste
+        User.objects.filter(pk=recente.pk).update(last_access=mais_novo)
+
+        self._registrar(recente, self.agora)
+        # Registros fora de ordem no buffer mantêm o mais novo
+        self._registrar(antigo, self.agora)
+        self._registrar(antigo, self.agora - timedelta(minutes=5))
+        self._registrar(outro, self.agora)
+
+        with CaptureQueriesContext(connection) as consultas:
+            UltimoAcessoBuffer.descarregar()
+        self.assertEqual(len(consultas), 1)
+
+        acessos = self._acessos()
+        self.assertEqual(acessos[recente.pk], mais_novo)
+        self.assertEqual(acessos[antigo.pk], self.agora)
+        self.assertEqual(acessos[outro.pk], self.agora)
@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from accounts.views import SignInView, SignUpView, UserView
+from accounts.views import (
+    AsyncSignInView, AsyncSignUpView, SignInView, SignUpView, UserView
+)
+
+# No servidor ASGI (app/asgi.py) signin e signup usam as views assíncronas
+signin_view = AsyncSignInView if settings.SERVIDOR_ASGI else SignInView
+signup_view = AsyncSignUpView if settings.SERVIDOR_ASGI else SignUpView
 
 urlpatterns = [
-    path('signin', SignInView.as_view(), name='signin'),
-    path('signup', SignUpView.as_view(), name='signup'),
+    path('signin', signin_view.as_view(), name='signin'),
+    path('signup', signup_view.as_view(), name='signup'),
     path('me', UserView.as_view(), name='me'),
 ]
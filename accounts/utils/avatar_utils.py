@@ -0,0 +1,305 @@
+# utils/avatar_utils.py
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from accounts.models import User
+from app.utils.exceptions import ValidationError
+
+
+class AvatarUtils:
+    """
+    Avatares reduzidos para tamanhos fixos, em WebP e JPEG
+    Os arquivos são nomeados pelo hash do conteúdo enviado
+    (avatars/<hash>-<tamanho>.<extensão>): envios iguais compartilham os arquivos
+    A decodificação e a redução acontecem em um pool de threads, fora da requisição;
+    aplicar_quando_pronto() grava o hash no usuário quando os arquivos existem
+    """
+    TAMANHOS = (64, 256)
+    FORMATOS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+    # Tamanho/formato gravado em User.avatar (compatibilidade)
+    PADRAO = (256, 'jpg')
+    ACEITOS = ('PNG', 'JPEG')
+
+    _lock = threading.Lock()
+    _executor = None
+    # Hashes em processamento: hash -> Future
+    _em_andamento = {}
+    # Último avatar enviado por usuário, ainda não gravado: user_id -> hash
+    _pendentes = {}
+
+    @staticmethod
+    def diretorio():
+        return Path(settings.MEDIA_ROOT) / 'avatars'
+
+    @staticmethod
+    def nome_arquivo(hash_, tamanho, extensao):
+        return f'{hash_}-{tamanho}.{extensao}'
+
+    @staticmethod
+    def url(hash_, tamanho, extensao):
+        return f"/{settings.MEDIA_URL.strip('/')}/avatars/" \
+            f"{AvatarUtils.nome_arquivo(hash_, tamanho, extensao)}"
+
+    @staticmethod
+    def urls(hash_):
+        """URLs de cada tamanho e formato: {'64': {'webp': ..., 'jpg': ...}, ...}"""
+        return {
+            str(tamanho): {
+                extensao: AvatarUtils.url(hash_, tamanho, extensao)
+                for extensao in AvatarUtils.FORMATOS
+            }
+            for tamanho in AvatarUtils.TAMANHOS
+        }
+
+    @staticmethod
+    def salvar(arquivo):
+        """
+        Grava o upload em disco em blocos calculando o hash do conteúdo,
+        confere o cabeçalho da imagem e agenda a redução em segundo plano
+        Retorna o hash (nome dos arquivos gerados)
+        """
+        diretorio = AvatarUtils.diretorio()
+        diretorio.mkdir(parents=True, exist_ok=True)
+
+        sha256 = hashlib.sha256()
+        total = 0
+        descritor, temporario = tempfile.mkstemp(
+            dir=diretorio, prefix='.upload-')
+
+        try:
+            with os.fdopen(descritor, 'wb') as destino:
+                for bloco in arquivo.chunks():
+                    total += len(bloco)
+                    if total > settings.AVATAR_MAX_BYTES:
+                        raise ValidationError(
+                            f"O avatar deve ter no máximo "
+                            f"{settings.AVATAR_MAX_BYTES // (1024 * 1024)} MB")
+                    sha256.update(bloco)
+                    destino.write(bloco)
+
+            AvatarUtils._validar(temporario)
+        except Exception:
+            os.remove(temporario)
+            raise
+
+        hash_ = sha256.hexdigest()
+
+        if AvatarUtils.existe(hash_):
+            # Mesmo conteúdo já processado
+            os.remove(temporario)
+            return hash_
+
+        with AvatarUtils._lock:
+            if hash_ in AvatarUtils._em_andamento:
+                os.remove(temporario)
+                return hash_
+
+            futuro = AvatarUtils._get_executor().submit(
+                AvatarUtils._processar, temporario, hash_)
+            AvatarUtils._em_andamento[hash_] = futuro
+
+        futuro.add_done_callback(
+            lambda _: AvatarUtils._em_andamento.pop(hash_, None))
+        return hash_
+
+    @staticmethod
+    def existe(hash_):
+        return all(
+            (AvatarUtils.diretorio() / AvatarUtils.nome_arquivo(hash_, tamanho, extensao)).exists()
+            for tamanho in AvatarUtils.TAMANHOS
+            for extensao in AvatarUtils.FORMATOS
+        )
+
+    @staticmethod
+    def aguardar(hash_, timeout=None):
+        """
+        Aguarda o processamento do hash, se estiver em andamento
+        Retorna True quando os arquivos reduzidos existem e False quando a
+        imagem não pôde ser decodificada ou o tempo esgotou
+        """
+        futuro = AvatarUtils._em_andamento.get(hash_)
+        if futuro is not None:
+            try:
+                futuro.result(timeout)
+            except Exception:
+                # TimeoutError ou erro do Pillow (ex: imagem truncada)
+                return False
+        return AvatarUtils.existe(hash_)
+
+    @staticmethod
+    def aplicar_quando_pronto(user_id, hash_):
+        """
+        Grava o avatar no usuário assim que os arquivos reduzidos existirem,
+        sem esperar na requisição: até lá o usuário mantém o avatar anterior
+        Retorna True quando o avatar já foi gravado (mesmo conteúdo já
+        processado) e False quando será gravado pelo pool
+        """
+        with AvatarUtils._lock:
+            # Um envio mais recente do mesmo usuário substitui o anterior
+            AvatarUtils._pendentes[user_id] = hash_
+            futuro = AvatarUtils._em_andamento.get(hash_)
+
+        if futuro is None:
+            return AvatarUtils._aplicar(user_id, hash_)
+
+        futuro.add_done_callback(
+            lambda futuro: AvatarUtils._get_executor().submit(
+                AvatarUtils._aplicar_no_pool, user_id, hash_, futuro))
+        return False
+
+    @staticmethod
+    def remover(hash_):
+        for tamanho in AvatarUtils.TAMANHOS:
+            for extensao in AvatarUtils.FORMATOS:
+                caminho = AvatarUtils.diretorio() / \
+                    AvatarUtils.nome_arquivo(hash_, tamanho, extensao)
+                caminho.unlink(missing_ok=True)
+
+    @staticmethod
+    def remover_sem_uso(hash_):
+        """Remove os arquivos do hash quando nenhum usuário usa mais o avatar"""
+        if hash_ and not User.objects.filter(avatar_hash=hash_).exists():
+            AvatarUtils.aguardar(hash_)
+            AvatarUtils.remover(hash_)
+
+    @staticmethod
+    def remover_original(avatar):
+        """Remove um avatar enviado antes da redução (arquivo único, nome aleatório)"""
+        if not avatar or avatar == User._meta.get_field('avatar').default:
+            return
+        (AvatarUtils.diretorio() / avatar.split('/')[-1]).unlink(missing_ok=True)
+
+    @staticmethod
+    def _aplicar(user_id, hash_):
+        try:
+            return AvatarUtils._gravar_no_usuario(user_id, hash_)
+        finally:
+            AvatarUtils._concluir(user_id, hash_)
+
+    @staticmethod
+    def _gravar_no_usuario(user_id, hash_):
+        with AvatarUtils._lock:
+            atual = AvatarUtils._pendentes.get(user_id) == hash_
+            # Outro usuário aguardando o mesmo conteúdo
+            aguardado = any(
+                pendente == hash_ for usuario, pendente in AvatarUtils._pendentes.items()
+                if usuario != user_id)
+
+        user = User.objects.filter(pk=user_id).first() if atual else None
+        if user is None or not AvatarUtils.existe(hash_):
+            # Substituído por um envio mais recente ou usuário excluído
+            if not aguardado:
+                AvatarUtils.remover_sem_uso(hash_)
+            return False
+
+        antigo_hash, antigo_avatar = user.avatar_hash, user.avatar
+        user.avatar_hash = hash_
+        user.avatar = AvatarUtils.url(hash_, *AvatarUtils.PADRAO)
+        # save(): os signals invalidam o cache do usuário
+        user.save(update_fields=['avatar', 'avatar_hash'])
+
+        # Arquivos do avatar antigo, se nenhum outro usuário enviou o mesmo
+        if antigo_hash != hash_:
+            if antigo_hash:
+                AvatarUtils.remover_sem_uso(antigo_hash)
+            else:
+                AvatarUtils.remover_original(antigo_avatar)
+        return True
+
+    @staticmethod
+    def _concluir(user_id, hash_):
+        with AvatarUtils._lock:
+            if AvatarUtils._pendentes.get(user_id) == hash_:
+                del AvatarUtils._pendentes[user_id]
+
+    @staticmethod
+    def _aplicar_no_pool(user_id, hash_, futuro):
+        try:
+            if futuro.exception() is None:
+                AvatarUtils._aplicar(user_id, hash_)
+            else:
+                # Imagem que não pôde ser reduzida: o usuário fica como estava
+                AvatarUtils._concluir(user_id, hash_)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _validar(caminho):
+        # Somente o cabeçalho é lido aqui; a decodificação fica para o pool
+        try:
+            with Image.open(caminho) as imagem:
+                formato = imagem.format
+                largura, altura = imagem.size
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise ValidationError(
+                "Somente arquivos do tipo PNG ou JPEG são suportados")
+
+        if formato not in AvatarUtils.ACEITOS:
+            raise ValidationError(
+                "Somente arquivos do tipo PNG ou JPEG são suportados")
+
+        if largura * altura > settings.AVATAR_MAX_PIXELS:
+            raise ValidationError("Dimensões do avatar muito grandes")
+
+    @staticmethod
+    def _processar(origem, hash_):
+        try:
+            with Image.open(origem) as imagem:
+                # JPEG: decodifica direto em escala reduzida
+                maior = max(AvatarUtils.TAMANHOS)
+                imagem.draft('RGB', (maior * 2, maior * 2))
+                imagem = ImageOps.exif_transpose(imagem)
+                imagem = AvatarUtils._rgb(imagem)
+
+                for tamanho in sorted(AvatarUtils.TAMANHOS, reverse=True):
+                    # Recorte quadrado centralizado
+                    reduzida = ImageOps.fit(
+                        imagem, (tamanho, tamanho), Image.Resampling.LANCZOS)
+
+                    for extensao, formato in AvatarUtils.FORMATOS.items():
+                        AvatarUtils._gravar(
+                            reduzida, formato,
+                            AvatarUtils.diretorio() /
+                            AvatarUtils.nome_arquivo(hash_, tamanho, extensao)
+                        )
+        except Exception:
+            # Sem arquivos parciais: o hash fica sem nenhum tamanho gerado
+            AvatarUtils.remover(hash_)
+            raise
+        finally:
+            os.remove(origem)
+
+    @staticmethod
+    def _rgb(imagem):
+        # Transparência sobre fundo branco (JPEG não tem canal alfa)
+        if imagem.mode in ('RGBA', 'LA') or 'transparency' in imagem.info:
+            imagem = imagem.convert('RGBA')
+            fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+            fundo.paste(imagem, mask=imagem.getchannel('A'))
+            return fundo
+        return imagem.convert('RGB')
+
+    @staticmethod
+    def _gravar(imagem, formato, destino):
+        # Grava em um temporário e renomeia: nunca expõe arquivo incompleto
+        temporario = destino.with_name(f'.{destino.name}.tmp')
+        imagem.save(temporario, formato, quality=settings.AVATAR_QUALIDADE)
+        os.replace(temporario, destino)
+
+    @staticmethod
+    def _get_executor():
+        if AvatarUtils._executor is None:
+            AvatarUtils._executor = ThreadPoolExecutor(
+                max_workers=settings.AVATAR_WORKERS,
+                thread_name_prefix='avatar'
+            )
+        return AvatarUtils._executor
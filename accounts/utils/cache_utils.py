@@ -0,0 +1,81 @@
+# utils/cache_utils.py
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import User
+
+
+class UsuarioCache:
+    """
+    Cache curto das linhas de usuário usadas na autenticação JWT
+    A versão de cada usuário é incrementada quando o usuário é alterado
+    (perfil, senha, desativação ou exclusão), invalidando a cópia salva
+    """
+    PREFIXO = 'accounts:usuario'
+
+    @classmethod
+    def _chave_versao(cls, user_id):
+        return f'{cls.PREFIXO}:versao:{user_id}'
+
+    @classmethod
+    def _chave_dados(cls, user_id):
+        return f'{cls.PREFIXO}:dados:{user_id}'
+
+    @classmethod
+    def obter(cls, user_id):
+        """
+        Retorna o usuário, lendo versão e dados em uma única ida ao cache
+        Somente quando não há cópia válida o usuário é buscado no banco
+        Lança User.DoesNotExist quando o usuário não existe
+        """
+        chave_versao = cls._chave_versao(user_id)
+        chave_dados = cls._chave_dados(user_id)
+        valores = cache.get_many([chave_versao, chave_dados])
+
+        versao = valores.get(chave_versao)
+        salvo = valores.get(chave_dados)
+
+        if versao is not None and salvo is not None and salvo[0] == versao:
+            return cls._montar(salvo[1])
+
+        user = User.objects.get(pk=user_id)
+        cls.salvar(user, versao)
+        return user
+
+    @classmethod
+    def salvar(cls, user, versao=None):
+        if versao is None:
+            versao = cls._versao_atual(user.pk)
+
+        campos = [field.attname for field in User._meta.concrete_fields]
+        cache.set(
+            cls._chave_dados(user.pk),
+            (versao, [getattr(user, campo) for campo in campos]),
+            settings.USUARIO_CACHE_TIMEOUT
+        )
+
+    @classmethod
+    def invalidar(cls, user_id):
+        try:
+            cache.incr(cls._chave_versao(user_id))
+        except ValueError:
+            # Chave inexistente: a nova versão já descarta cópias antigas
+            cls._versao_atual(user_id)
+
+    @classmethod
+    def _montar(cls, valores):
+        campos = [field.attname for field in User._meta.concrete_fields]
+        return User.from_db('default', campos, valores)
+
+    @classmethod
+    def _versao_atual(cls, user_id):
+        chave = cls._chave_versao(user_id)
+        versao = cache.get(chave)
+        if versao is None:
+            # Versão inicial baseada no relógio para nunca coincidir com
+            # cópias salvas antes da chave ter sido removida do cache
+            cache.add(chave, time.time_ns(), None)
+            versao = cache.get(chave)
+        return versao
@@ -0,0 +1,52 @@
+# utils/senha_utils.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class SenhaUtils:
+    """
+    Hash de senhas fora do event loop (views assíncronas)
+    O PBKDF2 do hashlib libera o GIL, então um pool de threads limitado
+    usa os núcleos sem bloquear as demais requisições do worker
+    """
+    _lock = threading.Lock()
+    _executor = None
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.SENHA_HASH_WORKERS,
+                        thread_name_prefix='senha-hash'
+                    )
+        return cls._executor
+
+    @classmethod
+    async def _executar(cls, funcao, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._get_executor(), funcao, *args)
+
+    @classmethod
+    async def gerar(cls, senha):
+        return await cls._executar(make_password, senha)
+
+    @classmethod
+    async def verificar(cls, senha, encoded):
+        """
+        Retorna (senha correta, novo hash)
+        O novo hash só é gerado quando o hasher ou seus parâmetros mudaram
+        """
+        return await cls._executar(cls.verificar_sync, senha, encoded)
+
+    @staticmethod
+    def verificar_sync(senha, encoded):
+        novo = []
+        valida = check_password(
+            senha, encoded, setter=lambda raw: novo.append(make_password(raw)))
+        return valida, novo[0] if novo else None
@@ -0,0 +1,133 @@
+# utils/ultimo_acesso_utils.py
+import atexit
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.utils.timezone import now
+
+from accounts.models import User
+
+
+class UltimoAcessoBuffer:
+    """
+    Acumula em memória o último acesso de cada usuário (por processo)
+    Uma thread grava tudo de uma vez a cada ULTIMO_ACESSO_INTERVALO segundos
+    e o que restar é gravado ao encerrar o processo
+    """
+    _lock = threading.Lock()
+    _pendentes = {}
+    # Último valor gravado por este processo, para ignorar acessos recentes
+    _gravados = {}
+    _thread = None
+    _parar = threading.Event()
+
+    @classmethod
+    def registrar(cls, user):
+        agora = now()
+
+        # Ignora quando o valor gravado é mais recente que ULTIMO_ACESSO_MINIMO
+        minimo = timedelta(seconds=settings.ULTIMO_ACESSO_MINIMO)
+        with cls._lock:
+            gravado = max(
+                filter(None, (user.last_access, cls._gravados.get(user.pk))),
+                default=None
+            )
+            if minimo and gravado and agora - gravado < minimo:
+                return
+
+            cls._pendentes[user.pk] = max(agora, cls._pendentes.get(user.pk, agora))
+
+        if settings.ULTIMO_ACESSO_INTERVALO <= 0:
+            # Sem buffer: grava na própria requisição
+            cls.descarregar()
+            return
+
+        cls._iniciar()
+
+    @classmethod
+    def descarregar(cls):
+        """Grava os acessos pendentes com um único UPDATE"""
+        with cls._lock:
+            pendentes, cls._pendentes = cls._pendentes, {}
+
+        if not pendentes:
+            return 0
+
+        try:
+            if connection.vendor == 'postgresql':
+                cls._update_values(pendentes)
+            else:
+                cls._update_case(pendentes)
+        except Exception:
+            # Devolve ao buffer para a próxima tentativa
+            with cls._lock:
+                for user_id, acesso in pendentes.items():
+                    cls._pendentes[user_id] = max(
+                        acesso, cls._pendentes.get(user_id, acesso))
+            raise
+
+        with cls._lock:
+            cls._gravados.update(pendentes)
+
+        return len(pendentes)
+
+    @classmethod
+    def _update_values(cls, pendentes):
+        # UPDATE ... FROM (VALUES ...), sem regredir acessos mais novos
+        valores = ', '.join(['(%s, %s::timestamptz)'] * len(pendentes))
+        parametros = [item for par in pendentes.items() for item in par]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {User._meta.db_table} AS u "
+                "SET last_access = v.last_access "
+                f"FROM (VALUES {valores}) AS v (id, last_access) "
+                "WHERE u.id = v.id AND u.last_access < v.last_access",
+                parametros
+            )
+
+    @classmethod
+    def _update_case(cls, pendentes):
+        # Demais bancos: um único UPDATE com CASE por id, sem regredir
+        # acessos mais novos (gravados por outro processo)
+        User.objects.filter(id__in=list(pendentes)).update(
+            last_access=Case(
+                *(When(id=user_id, last_access__lt=acesso, then=Value(acesso))
+                  for user_id, acesso in pendentes.items()),
+                default=F('last_access'),
+                output_field=DateTimeField()
+            )
+        )
+
+    @classmethod
+    def _iniciar(cls):
+        if cls._thread is not None:
+            return
+
+        with cls._lock:
+            if cls._thread is not None:
+                return
+
+            cls._thread = threading.Thread(
+                target=cls._executar, name='ultimo-acesso', daemon=True)
+            cls._thread.start()
+            atexit.register(cls._encerrar)
+
+    @classmethod
+    def _executar(cls):
+        while not cls._parar.wait(settings.ULTIMO_ACESSO_INTERVALO):
+            try:
+                cls.descarregar()
+            except Exception:
+                # Banco indisponível: tenta novamente no próximo intervalo
+                pass
+            finally:
+                connections.close_all()
+
+    @classmethod
+    def _encerrar(cls):
+        cls._parar.set()
+        cls.descarregar()
@@ -1,19 +1,20 @@
-import uuid
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from django.core.files.storage import FileSystemStorage
-from django.conf import settings
-from pathlib import Path
-from django.utils.timezone import now
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
 from accounts.auth import Authentication
 from accounts.serializers import UserModelSerializer
-from accounts.models import User
+from accounts.utils.avatar_utils import AvatarUtils
+from accounts.utils.ultimo_acesso_utils import UltimoAcessoBuffer
 
+from app.utils.async_utils import AsyncUtils
 from app.utils.exceptions import ValidationError
 
 
@@ -63,10 +64,56 @@ class SignUpView(APIView, Authentication):
         })
 
 
+def _resposta_usuario(user):
+    access_token = RefreshToken.for_user(user).access_token
+
+    return AsyncUtils.resposta({
+        "user": UserModelSerializer(user).data,
+        "access_token": str(access_token)
+    })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSignInView(View, Authentication):
+    """SignInView para o servidor ASGI, com o hash da senha fora do event loop"""
+
+    async def post(self, request):
+        dados = AsyncUtils.dados_requisicao(request)
+
+        signin = await self.asignin(
+            dados.get('email', ''), dados.get('password', ''))
+
+        if not signin:
+            return AsyncUtils.resposta_erro(AuthenticationFailed())
+
+        return _resposta_usuario(signin)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSignUpView(View, Authentication):
+    """SignUpView para o servidor ASGI, com o hash da senha fora do event loop"""
+
+    async def post(self, request):
+        dados = AsyncUtils.dados_requisicao(request)
+        name = dados.get('name', '')
+        email = dados.get('email', '')
+        password = dados.get('password', '')
+
+        if not name or not email or not password:
+            return AsyncUtils.resposta_erro(AuthenticationFailed())
+
+        signup = await self.asignup(name, email, password)
+
+        if not signup:
+            return AsyncUtils.resposta_erro(AuthenticationFailed())
+
+        return _resposta_usuario(signup)
+
+
 class UserView(APIView):
     def get(self, request):
-        # Update last_access
-        User.objects.filter(id=request.user.id).update(last_access=now())
+        # Update last_access (gravado em lote pelo UltimoAcessoBuffer)
+        UltimoAcessoBuffer.registrar(request.user)
 
         user = UserModelSerializer(request.user).data
 
@@ -79,50 +126,33 @@ class UserView(APIView):
         email = request.data.get('email')
         password = request.data.get('password')
         avatar = request.FILES.get('avatar')
-
-        # Initialize storage
-        storage = FileSystemStorage(
-            str(Path(settings.MEDIA_ROOT) / "avatars"),
-            settings.MEDIA_URL + "avatars"
-        )
+        avatar_hash = None
 
         if avatar:
             content_type = avatar.content_type
 
-            # Extensão do arquivo, último elemento do array [-1] após o ponto
-            extension = avatar.name.split('.')[-1]
-
             # Validate avatar tipo de arquivo aceito
             if not content_type == "image/png" and not content_type == "image/jpeg":
                 raise ValidationError(
                     "Somente arquivos do tipo PNG ou JPEG são suportados")
 
-            # Save new avatar
-            file = storage.save(f"{uuid.uuid4()}.{extension}", avatar)
-            avatar = storage.url(file)
-
+        # O avatar só muda depois que os tamanhos reduzidos existem
         serializer = UserModelSerializer(request.user, data={
             "name": name,
             "email": email,
-            "avatar": avatar or request.user.avatar
+            "avatar": request.user.avatar
         })
 
         # Se não for valido o serializer
         if not serializer.is_valid():
-            # Delete uploaded file
-            if avatar:
-                # Deletar arquivo enviado, último elemento do array [-1] após o ponto
-                storage.delete(avatar.split("/")[-1])
-
             # Obter primeira mensagem de erro (string)
             first_error = list(serializer.errors.values())[0][0]
 
             raise ValidationError(first_error)
 
-        # Delete o avatar antigo enviado caso seja diferente do padrão
-        if avatar and request.user.avatar != "/media/avatars/default-avatar.png":
-            # Deletar arquivo enviado, último elemento do array [-1] após o ponto
-            storage.delete(request.user.avatar.split("/")[-1])
+        if avatar:
+            # Grava o original e agenda a geração dos tamanhos reduzidos
+            avatar_hash = AvatarUtils.salvar(avatar)
 
         # Update password
         if password:
@@ -130,6 +160,15 @@ class UserView(APIView):
 
         serializer.save()
 
+        if avatar_hash and not AvatarUtils.aplicar_quando_pronto(request.user.pk, avatar_hash):
+            # Redução em andamento no pool: o avatar anterior continua até lá
+            return Response({
+                "user": serializer.data
+            }, status=status.HTTP_202_ACCEPTED)
+
+        if avatar_hash:
+            request.user.refresh_from_db(fields=['avatar', 'avatar_hash'])
+
         return Response({
-            "user": serializer.data
+            "user": UserModelSerializer(request.user).data
         })
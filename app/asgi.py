@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+import socketio
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Rotas com versão assíncrona (signin/signup) usam as views async
+os.environ.setdefault('SERVIDOR_ASGI', 'true')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Socket.IO (feed de alterações) montado junto com o Django
+from app.socket import socket_async  # noqa: E402
+
+application = socketio.ASGIApp(socket_async, django_application)
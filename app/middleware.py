@@ -0,0 +1,148 @@
+import gzip
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # Sem o pacote Brotli, somente gzip
+    brotli = None
+
+
+class CompressaoMiddleware:
+    """
+    Comprime respostas de texto (JSON, CSV, NDJSON) com brotli ou gzip,
+    conforme o Accept-Encoding, a partir de COMPRESSAO_TAMANHO_MINIMO bytes
+    Respostas em streaming (exportações) são comprimidas bloco a bloco
+    HTML (admin, API navegável) fica de fora: tem token CSRF ao lado de
+    conteúdo refletido da requisição e ficaria exposto ao BREACH
+    Síncrono e assíncrono: no ASGI as views async não passam por uma thread
+    """
+    sync_capable = True
+    async_capable = True
+
+    COMPRESSIVEIS = ('application/json', 'text/csv', 'application/x-ndjson')
+    ACCEPT_ENCODING = _lazy_re_compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        return self.processar(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.processar(request, response)
+
+    def processar(self, request, response):
+        if not self._compressivel(response):
+            return response
+
+        # Varia conforme o Accept-Encoding, mesmo quando não comprime
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        codificacao = self._codificacao(request.headers.get('Accept-Encoding', ''))
+        if codificacao is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._comprimir_async(
+                    response.streaming_content, codificacao)
+            else:
+                response.streaming_content = self._comprimir_sequencia(
+                    response.streaming_content, codificacao)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSAO_TAMANHO_MINIMO:
+                return response
+
+            comprimido = self._comprimir(response.content, codificacao)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response['Content-Length'] = str(len(comprimido))
+
+        # O corpo mudou: a ETag forte deixa de valer byte a byte
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = codificacao
+        return response
+
+    def _compressivel(self, response):
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.has_header('Content-Encoding'):
+            return False
+        tipo = response.get('Content-Type', '')
+        return tipo.startswith(self.COMPRESSIVEIS)
+
+    def _codificacao(self, accept_encoding):
+        """br quando aceito (e disponível), senão gzip; None sem nenhum dos dois"""
+        aceitas = {}
+        for item in accept_encoding.lower().split(','):
+            encontrado = self.ACCEPT_ENCODING.match(item)
+            if not encontrado or not encontrado.group(1):
+                continue
+            try:
+                peso = float(encontrado.group(2)) if encontrado.group(2) else 1.0
+            except ValueError:
+                continue
+            aceitas[encontrado.group(1)] = peso
+
+        curinga = aceitas.get('*', 0)
+        if brotli is not None and aceitas.get('br', curinga) > 0:
+            return 'br'
+        if aceitas.get('gzip', curinga) > 0:
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def _comprimir(conteudo, codificacao):
+        if codificacao == 'br':
+            return brotli.compress(
+                conteudo, mode=brotli.MODE_TEXT,
+                quality=settings.COMPRESSAO_BROTLI_QUALIDADE)
+        # mtime=0: mesmo conteúdo, mesmos bytes
+        return gzip.compress(
+            conteudo, compresslevel=settings.COMPRESSAO_GZIP_NIVEL, mtime=0)
+
+    @staticmethod
+    def _compressor(codificacao):
+        if codificacao == 'br':
+            compressor = brotli.Compressor(
+                mode=brotli.MODE_TEXT, quality=settings.COMPRESSAO_BROTLI_QUALIDADE)
+            return compressor.process, compressor.finish
+
+        # wbits 16 + MAX_WBITS: formato gzip
+        compressor = zlib.compressobj(
+            settings.COMPRESSAO_GZIP_NIVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress, compressor.flush
+
+    def _comprimir_sequencia(self, blocos, codificacao):
+        # O compressor acumula as linhas pequenas e só devolve blocos completos
+        processar, finalizar = self._compressor(codificacao)
+        for bloco in blocos:
+            dados = processar(bloco)
+            if dados:
+                yield dados
+        yield finalizar()
+
+    async def _comprimir_async(self, blocos, codificacao):
+        processar, finalizar = self._compressor(codificacao)
+        async for bloco in blocos:
+            dados = processar(bloco)
+            if dados:
+                yield dados
+        yield finalizar()
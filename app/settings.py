@@ -33,6 +33,20 @@ ALLOWED_HOSTS = ['*']
 
 CURRENT_URL = 'http://127.0.0.1:8000'
 CNPJA_API_TOKEN = os.getenv('CNPJA_API_TOKEN')
+CNPJA_API_URL = os.getenv('CNPJA_API_URL', 'https://api.cnpja.com')
+# Tempos limite (segundos) das requisições para a API CNPJA: leitura e conexão
+CNPJA_TIMEOUT = float(os.getenv('CNPJA_TIMEOUT', 10))
+CNPJA_CONNECT_TIMEOUT = float(os.getenv('CNPJA_CONNECT_TIMEOUT', 3))
+# Conexões simultâneas com a API por worker ASGI
+CNPJA_ASYNC_MAX_CONEXOES = int(os.getenv('CNPJA_ASYNC_MAX_CONEXOES', 100))
+# Validade (segundos) das respostas da API CNPJA guardadas no banco
+CNPJA_CACHE_TTL = int(os.getenv('CNPJA_CACHE_TTL', 60 * 60 * 24 * 7))
+# Importação em lote: consultas simultâneas, limite por segundo e máximo por requisição
+# O máximo mantém a requisição abaixo dos timeouts do worker/proxy
+# (50 CNPJs a 5/s: ~10 s); listas maiores pelo comando importar_cnpjs
+CNPJA_IMPORT_WORKERS = int(os.getenv('CNPJA_IMPORT_WORKERS', 4))
+CNPJA_IMPORT_POR_SEGUNDO = float(os.getenv('CNPJA_IMPORT_POR_SEGUNDO', 5))
+CNPJA_IMPORT_MAXIMO = int(os.getenv('CNPJA_IMPORT_MAXIMO', 50))
 
 # Lista de permissão
 CORS_ALLOWED_ORIGINS = [
@@ -67,6 +81,9 @@ MIDDLEWARE = [
     # Cors (pip)
     'corsheaders.middleware.CorsMiddleware',
 
+    # Compressão brotli/gzip das respostas de texto (JSON, CSV, NDJSON)
+    'app.middleware.CompressaoMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,6 +111,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'app.wsgi.application'
+ASGI_APPLICATION = 'app.asgi.application'
+
+# Definido por app/asgi.py: ativa as views assíncronas nas rotas
+SERVIDOR_ASGI = os.getenv('SERVIDOR_ASGI', 'false').lower() == 'true'
 
 
 # Database
@@ -122,6 +143,62 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local-memory por padrão, pode ser trocado por file-based via .env
+# Com mais de um worker use um cache compartilhado (ex: Redis): a versão do
+# usuário fica neste cache e, no local-memory, cada processo só enxerga as
+# próprias invalidações (plano de contas e ETags usam a versão do banco)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'projeto-andre-tiago'),
+    }
+}
+
+# Tempo (segundos) que a árvore serializada do plano de contas fica em cache
+PLANO_CONTAS_CACHE_TIMEOUT = int(os.getenv('PLANO_CONTAS_CACHE_TIMEOUT', 3600))
+
+# Segundos que o usuário autenticado fica em cache (autenticação JWT)
+USUARIO_CACHE_TIMEOUT = int(os.getenv('USUARIO_CACHE_TIMEOUT', 60))
+
+# Último acesso dos usuários: intervalo de gravação em lote (0 grava na hora)
+# e idade mínima do valor gravado para uma nova gravação (0 sempre grava)
+ULTIMO_ACESSO_INTERVALO = int(os.getenv('ULTIMO_ACESSO_INTERVALO', 30))
+ULTIMO_ACESSO_MINIMO = int(os.getenv('ULTIMO_ACESSO_MINIMO', 0))
+
+# Threads usadas para gerar/verificar hashes de senha nas views assíncronas
+SENHA_HASH_WORKERS = int(os.getenv('SENHA_HASH_WORKERS', os.cpu_count() or 2))
+
+# Avatares: tamanho máximo do upload, limite de pixels da imagem original,
+# qualidade WebP/JPEG e threads que reduzem as imagens fora da requisição
+AVATAR_MAX_BYTES = int(os.getenv('AVATAR_MAX_BYTES', 10 * 1024 * 1024))
+AVATAR_MAX_PIXELS = int(os.getenv('AVATAR_MAX_PIXELS', 50_000_000))
+AVATAR_QUALIDADE = int(os.getenv('AVATAR_QUALIDADE', 85))
+AVATAR_WORKERS = int(os.getenv('AVATAR_WORKERS', 2))
+
+
+# Importação de fornecedores via CSV: linhas por lote e máximo de erros detalhados
+FORNECEDORES_IMPORT_LOTE = int(os.getenv('FORNECEDORES_IMPORT_LOTE', 2000))
+FORNECEDORES_IMPORT_MAX_ERROS = int(os.getenv('FORNECEDORES_IMPORT_MAX_ERROS', 1000))
+
+
+# Linhas lidas do banco por vez (cursor no servidor) nas exportações
+EXPORTACAO_CHUNK_SIZE = int(os.getenv('EXPORTACAO_CHUNK_SIZE', 2000))
+
+# Feed de alterações (Socket.IO): segundos sem novas alterações antes do envio,
+# espera máxima e quantidade de ids por grupo (acima disso envia só o total)
+ALTERACOES_INTERVALO = float(os.getenv('ALTERACOES_INTERVALO', 0.5))
+ALTERACOES_ESPERA_MAXIMA = float(os.getenv('ALTERACOES_ESPERA_MAXIMA', 3))
+ALTERACOES_MAX_IDS = int(os.getenv('ALTERACOES_MAX_IDS', 100))
+# Quantidade de empresas com o dono em memória (as menos usadas são descartadas)
+ALTERACOES_DONOS_MAXIMO = int(os.getenv('ALTERACOES_DONOS_MAXIMO', 10000))
+
+# Quantidade máxima de documentos por requisição na validação em lote
+DOCUMENTOS_VALIDACAO_MAXIMO = int(
+    os.getenv('DOCUMENTOS_VALIDACAO_MAXIMO', 10000))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -168,6 +245,9 @@ MEDIA_URL = 'media/'
 # Caminho completo para arquivos de mídia
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
+# Cache dos arquivos de mídia com URL imutável (1 ano)
+MIDIA_CACHE_MAX_AGE = int(os.getenv('MIDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 365))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -177,14 +257,41 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     # Utilizar o jwt para criação de token
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT com cache curto do usuário (accounts.utils.cache_utils.UsuarioCache)
+        'accounts.auth.JWTCacheAuthentication',
     ),
     # Todas as rotas precisão de autenticação
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
-    ]
+    ],
+    # Paginação por cursor em todas as listagens (?cursor= e ?page_size=)
+    'DEFAULT_PAGINATION_CLASS': 'app.utils.pagination.CursorPagination',
+    'PAGE_SIZE': int(os.getenv('PAGINATION_PAGE_SIZE', 50)),
+    # JSON com orjson (mesma saída do JSONRenderer/JSONParser padrão)
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.utils.renderers.OrjsonRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'app.utils.parsers.OrjsonParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Compressão das respostas: tamanho mínimo (bytes), qualidade do brotli
+# (0-11, valores baixos para conteúdo dinâmico) e nível do gzip (1-9)
+COMPRESSAO_TAMANHO_MINIMO = int(os.getenv('COMPRESSAO_TAMANHO_MINIMO', 1024))
+COMPRESSAO_BROTLI_QUALIDADE = int(os.getenv('COMPRESSAO_BROTLI_QUALIDADE', 4))
+COMPRESSAO_GZIP_NIVEL = int(os.getenv('COMPRESSAO_GZIP_NIVEL', 6))
+
+# Listagens (empresas, fornecedores e plano de contas) montadas a partir de
+# .values() sem instanciar serializers por linha (mesma saída dos serializers)
+LEITURA_RAPIDA = os.getenv('LEITURA_RAPIDA', 'true').lower() == 'true'
+
+# Tamanho máximo de página aceito em ?page_size=
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv('PAGINATION_MAX_PAGE_SIZE', 500))
+
 # Simple JWT Settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
@@ -1,9 +1,102 @@
+from urllib.parse import parse_qs
+
 import socketio
+from asgiref.sync import sync_to_async
 
 from django.conf import settings
 
+from app.utils.alteracoes_utils import AlteracoesBuffer
+
 
 # Create a Socket IO server
+# Servidor Socket.IO do app/wsgi.py (eventlet)
 socket = socketio.Server(
     cors_allowed_origins=settings.CORS_ALLOWED_ORIGINS
 )
+
+# Servidor Socket.IO do app/asgi.py
+socket_async = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins=settings.CORS_ALLOWED_ORIGINS
+)
+
+# Evento com as alterações acumuladas do usuário
+EVENTO_ALTERACOES = 'alteracoes'
+
+_envio_iniciado = False
+
+
+def sala_usuario(user_id):
+    return f'user:{user_id}'
+
+
+def autenticar(environ, auth):
+    """
+    Valida o token JWT enviado em auth ({"token": "..."}) ou em ?token=
+    Retorna o usuário ou recusa a conexão
+    """
+    # Importado aqui: este módulo é carregado antes do setup do Django
+    from rest_framework.exceptions import APIException
+    from accounts.auth import JWTCacheAuthentication
+
+    token = auth.get('token') if isinstance(auth, dict) else None
+    if not token:
+        token = parse_qs(environ.get('QUERY_STRING', '')).get('token', [None])[0]
+
+    if not token:
+        raise socketio.exceptions.ConnectionRefusedError(
+            "Token de acesso é obrigatório.")
+
+    autenticacao = JWTCacheAuthentication()
+    try:
+        return autenticacao.get_user(autenticacao.get_validated_token(token))
+    except APIException:
+        raise socketio.exceptions.ConnectionRefusedError(
+            "Token de acesso inválido.")
+
+
+@socket.event
+def connect(sid, environ, auth=None):
+    user = autenticar(environ, auth)
+    socket.enter_room(sid, sala_usuario(user.id))
+    _iniciar_envio(socket.start_background_task, _enviar)
+
+
+@socket_async.on('connect')
+async def connect_async(sid, environ, auth=None):
+    user = await sync_to_async(autenticar)(environ, auth)
+    await socket_async.enter_room(sid, sala_usuario(user.id))
+    _iniciar_envio(socket_async.start_background_task, _enviar_async)
+
+
+def _iniciar_envio(start_background_task, tarefa):
+    """Na primeira conexão, começa a acumular e enviar as alterações"""
+    global _envio_iniciado
+    if _envio_iniciado:
+        return
+
+    _envio_iniciado = True
+    AlteracoesBuffer.ativo = True
+    start_background_task(tarefa)
+
+
+def _enviar():
+    while True:
+        socket.sleep(settings.ALTERACOES_INTERVALO / 2)
+        for user_id, alteracoes in AlteracoesBuffer.retirar().items():
+            socket.emit(
+                EVENTO_ALTERACOES,
+                {'alteracoes': alteracoes},
+                to=sala_usuario(user_id)
+            )
+
+
+async def _enviar_async():
+    while True:
+        await socket_async.sleep(settings.ALTERACOES_INTERVALO / 2)
+        for user_id, alteracoes in AlteracoesBuffer.retirar().items():
+            await socket_async.emit(
+                EVENTO_ALTERACOES,
+                {'alteracoes': alteracoes},
+                to=sala_usuario(user_id)
+            )
@@ -0,0 +1,647 @@
+import asyncio
+import gzip
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+
+import httpx
+import socketio
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.db import transaction
+from django.urls import path
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.auth import Authentication
+from accounts.models import User
+from accounts.views import AsyncSignInView
+from app import socket as socket_app
+from app.middleware import CompressaoMiddleware, brotli
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from app.utils.leitura_rapida import LeituraRapida
+from app.utils.midia_utils import MidiaUtils
+from app.utils.renderers import OrjsonRenderer
+from app.utils.validate_document import (
+    STATUS_CNPJ_INVALIDO, STATUS_CPF_INVALIDO, STATUS_TAMANHO_INVALIDO, STATUS_VALIDO,
+    is_valid_cnpj, is_valid_cpf, validate_cpf_cnpj_batch
+)
+from empresa.models import Atividade, Empresa, Socio
+from empresa.utils.leitura_utils import EmpresaLeitura
+from empresa.views import AsyncEmpresaAPIView
+from fornecedores.models import Fornecedores
+from planoDeContas.models import PlanoAccount
+
+
+class CompressaoMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        for numero in range(20):
+            Empresa.objects.create(
+                user=self.user, tipo_documento='PF', documento=f'000.000.000-{numero:02d}',
+                nome=f'Pessoa {numero}', status='ATIVA', logradouro='Rua A', numero='1',
+                bairro='Centro', cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_json_comprimido_conforme_accept_encoding(self):
+        original = self.client.get('/api/v1/empresa/')
+        self.assertNotIn('Content-Encoding', original)
+        self.assertGreater(len(original.content), 1024)
+
+        response = self.client.get('/api/v1/empresa/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), original.content)
+
+        if brotli is not None:
+            response = self.client.get(
+                '/api/v1/empresa/', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(brotli.decompress(response.content), original.content)
+
+    def test_exportacao_csv_em_streaming_comprimida(self):
+        original = self.client.get('/api/v1/fornecedores/exportar/')
+        response = self.client.get(
+            '/api/v1/fornecedores/exportar/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(original.streaming_content))
+
+    def test_html_nao_e_comprimido(self):
+        # Admin e API navegável: CSRF ao lado de conteúdo refletido (BREACH)
+        for url in ('/admin/login/?next=/admin/', '/api/v1/empresa/?format=api'):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['Content-Type'].startswith('text/html'))
+            self.assertGreater(len(response.content), 1024)
+            self.assertNotIn('Content-Encoding', response)
+
+
+
+
+class ValidacaoDocumentosTests(TestCase):
+    """A validação em lote dá o mesmo resultado que a validação um a um"""
+
+    @staticmethod
+    def _individual(documento):
+        documento = re.sub(r"[^0-9]", "", documento)
+        if len(documento) == 11:
+            return STATUS_VALIDO if is_valid_cpf(documento) else STATUS_CPF_INVALIDO
+        if len(documento) == 14:
+            return STATUS_VALIDO if is_valid_cnpj(documento) else STATUS_CNPJ_INVALIDO
+        return STATUS_TAMANHO_INVALIDO
+
+    @staticmethod
+    def _documentos(quantidade, semente=42):
+        gerador = random.Random(semente)
+        documentos = []
+        for _ in range(quantidade):
+            tamanho = gerador.choice((11, 14, gerador.randint(0, 16)))
+            digitos = ''.join(gerador.choice('0123456789') for _ in range(tamanho))
+            if gerador.random() < 0.3 and tamanho in (11, 14):
+                # Dígitos verificadores corretos em parte dos documentos
+                validar = is_valid_cpf if tamanho == 11 else is_valid_cnpj
+                digitos = next(
+                    f'{digitos[:-2]}{final:02d}' for final in range(100)
+                    if validar(f'{digitos[:-2]}{final:02d}'))
+            documentos.append(gerador.choice((
+                digitos, f' {digitos[:3]}.{digitos[3:6]}/{digitos[6:]}-', f'x{digitos}ç')))
+        return documentos
+
+    def _comparar(self, documentos):
+        normalizados, status = validate_cpf_cnpj_batch(documentos)
+
+        self.assertEqual(normalizados, [re.sub(r"[^0-9]", "", d) for d in documentos])
+        self.assertEqual(status.tolist(), [self._individual(d) for d in documentos])
+
+    def test_documentos_aleatorios(self):
+        documentos = self._documentos(5000)
+        self._comparar(documentos)
+        self.assertGreater(
+            validate_cpf_cnpj_batch(documentos)[1].tolist().count(STATUS_VALIDO), 500)
+
+    def test_casos_limite(self):
+        self._comparar([
+            '529.982.247-25', '11.222.333/0001-81', '00.000.000/0001-91',
+            '111.111.111-11', '11.111.111/1111-11', '', '   ', '123',
+            'a\x00b', '529\x00982247-25', 'ação 529982247٢5', '５２９９８２２４７２５',
+            '529.982.247-2', '11.222.333/0001-810',
+        ])
+        normalizados, status = validate_cpf_cnpj_batch([])
+        self.assertEqual((normalizados, status.tolist()), ([], []))
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(name='Teste', email='teste@teste.com'))
+        url = '/api/v1/documentos/validar'
+
+        response = client.post(url, {'documentos': [
+            '529.982.247-25', '529.982.247-26', '11.222.333/0001-80', '123'
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        corpo = response.json()
+        self.assertEqual((corpo['total'], corpo['validos'], corpo['invalidos']), (4, 1, 3))
+        self.assertEqual(
+            [(r['documento'], r['status'], r['erro']) for r in corpo['resultados']], [
+                ('52998224725', 'valido', None),
+                ('52998224726', 'cpf_invalido', 'Invalid CPF.'),
+                ('11222333000180', 'cnpj_invalido', 'Invalid CNPJ.'),
+                ('123', 'tamanho_invalido', 'Invalid CPF or CNPJ.'),
+            ])
+
+        for dados in ({'documentos': '529.982.247-25'}, {'documentos': [52998224725]}):
+            with self.subTest(dados=dados):
+                self.assertEqual(client.post(url, dados, format='json').status_code, 400)
+
+        with override_settings(DOCUMENTOS_VALIDACAO_MAXIMO=2):
+            response = client.post(url, {'documentos': ['1', '2', '3']}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+# Rotas do servidor ASGI (SERVIDOR_ASGI=true) para CompressaoAsgiTests
+urlpatterns = [
+    path('api/v1/accounts/signin', AsyncSignInView.as_view()),
+    path('api/v1/empresa/', AsyncEmpresaAPIView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class CompressaoAsgiTests(TestCase):
+    """No ASGI as views assíncronas passam pelo middleware sem troca de thread"""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            name='Teste', email='teste@teste.com', password=make_password('senha123'))
+        for numero in range(20):
+            Empresa.objects.create(
+                user=self.user, tipo_documento='PF', documento=f'000.000.000-{numero:02d}',
+                nome=f'Pessoa {numero}', status='ATIVA', logradouro='Rua A', numero='1',
+                bairro='Centro', cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+            )
+
+    @override_settings(DEBUG=True)
+    def test_middleware_nao_e_adaptado(self):
+        # Com DEBUG o Django registra cada middleware adaptado
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    @override_settings(COMPRESSAO_TAMANHO_MINIMO=0)
+    async def test_view_assincrona_no_event_loop(self):
+        asignin = Authentication.asignin
+        processar = CompressaoMiddleware.processar
+        threads = []
+
+        async def view(*args):
+            threads.append(threading.current_thread())
+            return await asignin(*args)
+
+        def middleware(*args):
+            threads.append(threading.current_thread())
+            return processar(*args)
+
+        client = AsyncClient()
+        with mock.patch.object(Authentication, 'asignin', view), \
+                mock.patch.object(CompressaoMiddleware, 'processar', middleware):
+            response = await client.post(
+                '/api/v1/accounts/signin',
+                {'email': 'teste@teste.com', 'password': 'senha123'},
+                content_type='application/json', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            json.loads(gzip.decompress(response.content))['user']['email'], 'teste@teste.com')
+        self.assertEqual(threads, [threading.current_thread()] * 2)
+
+    async def test_view_sincrona_delegada_comprimida(self):
+        client = AsyncClient()
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        cabecalhos = {'Authorization': f'Bearer {token}'}
+
+        original = await client.get('/api/v1/empresa/', headers=cabecalhos)
+        response = await client.get(
+            '/api/v1/empresa/', headers={**cabecalhos, 'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), original.content)
+
+class OrjsonRendererTests(TestCase):
+    """O OrjsonRenderer gera os mesmos bytes que o JSONRenderer do DRF"""
+
+    def _comparar(self, dados):
+        self.assertEqual(OrjsonRenderer().render(dados), JSONRenderer().render(dados))
+
+    def test_tipos(self):
+        brasilia = timezone(timedelta(hours=-3))
+        for dados in (
+            {'texto': 'ação', 'inteiro': 10, 'real': 1.5, 'nulo': None, 'booleano': True},
+            OrderedDict([('b', 1), ('a', [1, 'dois', {'três': 3}])]),
+            [datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+             datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=brasilia),
+             datetime(2024, 5, 1, 12, 30), date(2024, 5, 1), time(8, 15, 30, 500)],
+            {'decimal': Decimal('1000.50'), 'zero': Decimal('0'), 'uuid': uuid.UUID(int=1)},
+            {'duracao': timedelta(hours=1, seconds=5), 'conjunto': ('a', 'b')},
+            {1: 'chave inteira', 'separadores': 'linha\u2028paragrafo\u2029fim'},
+            {'grande': 2 ** 70, 'negativo': -2 ** 65},
+            [], {}, 'texto', 0,
+        ):
+            with self.subTest(dados=dados):
+                self._comparar(dados)
+
+    def test_resposta_da_api(self):
+        user = User.objects.create(name='Teste', email='teste@teste.com')
+        Empresa.objects.create(
+            user=user, tipo_documento='PJ', documento='11.222.333/0001-81',
+            nome='Empresa "Teste" & Cia', capital_social=Decimal('1234.56'),
+            data_abertura=date(2020, 1, 1), status='ATIVA', logradouro='Rua A',
+            numero='1', bairro='Centro', cidade='São Paulo', estado='SP',
+            cep='01001000', pais='Brasil'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/v1/empresa/?include=socios,atividades,user')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_indentacao(self):
+        dados = {'lista': [1, 2], 'texto': 'ação'}
+        renderizado = OrjsonRenderer().render(dados, 'application/json; indent=4')
+
+        self.assertIn(b'\n  "lista"', renderizado)
+        self.assertEqual(json.loads(renderizado), dados)
+
+class LeituraRapidaTests(TestCase):
+    """A leitura por .values() gera os mesmos bytes que os serializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(name='Teste', email='teste@teste.com')
+
+        for numero in range(7):
+            empresa = Empresa.objects.create(
+                user=cls.user, tipo_documento='PJ', documento=f'11.222.333/0001-{numero:02d}',
+                nome=f'Empresa {numero}', nome_fantasia=None if numero % 2 else f'Fantasia {numero}',
+                data_abertura=date(2020, 1, numero + 1) if numero % 3 else None,
+                capital_social=Decimal('1000.50') * numero if numero % 2 else None,
+                matriz=bool(numero % 2), status='ATIVA', logradouro='Rua A', numero='1',
+                bairro='Centro', cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+            )
+            for indice in range(numero % 3):
+                Socio.objects.create(
+                    empresa=empresa, nome=f'Sócio {indice}', cpf='***123456**',
+                    funcao='Sócio-Administrador', data_entrada=date(2021, 5, indice + 1))
+                Atividade.objects.create(
+                    empresa=empresa, descricao=f'Atividade {indice}', principal=indice == 0)
+
+            Fornecedores.objects.create(
+                empresa=empresa, nome=f'Fornecedor {numero}', documento=f'529.982.247-{numero:02d}',
+                logradouro='Rua B', numero='10', bairro='Centro', cidade='Campinas',
+                estado='SP', cep='13010000', pais='Brasil',
+                email=f'fornecedor{numero}@teste.com' if numero % 2 else None
+            )
+
+            # Árvore com três níveis e códigos em ordem natural ("1.2" antes de "1.10")
+            raiz = cls._conta(empresa, f'{numero + 1}')
+            for filho in (10, 2):
+                conta = cls._conta(empresa, f'{numero + 1}.{filho}', raiz)
+                cls._conta(empresa, f'{numero + 1}.{filho}.1', conta, 'A')
+
+    @staticmethod
+    def _conta(empresa, codigo, vinculo=None, tipo='S'):
+        return PlanoAccount.objects.create(
+            empresa=empresa, codigo=codigo, nome=f'Conta {codigo}', tipo=tipo,
+            descricao=f'Descrição {codigo}', vinculo=vinculo)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _obter(self, url, leitura_rapida):
+        # A árvore do plano de contas fica em cache: força a montagem nos dois caminhos
+        cache.clear()
+        with override_settings(LEITURA_RAPIDA=leitura_rapida):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def _comparar_paginas(self, url):
+        paginas = 0
+        while url:
+            serializers = self._obter(url, False)
+            rapida = self._obter(url, True)
+            self.assertEqual(rapida.content, serializers.content, url)
+
+            paginas += 1
+            url = serializers.json()['next']
+        self.assertGreater(paginas, 1)
+
+    def test_empresas(self):
+        for query in (
+            'page_size=3',
+            'page_size=3&fields=nome,capital_social,data_abertura&include=socios',
+            'page_size=3&fields=matriz,nome&include=user,atividades',
+            'page_size=3&include=',
+            'page_size=3&fields=id',
+        ):
+            with self.subTest(query=query):
+                self._comparar_paginas(f'/api/v1/empresa/?{query}')
+
+    def test_fornecedores(self):
+        self._comparar_paginas('/api/v1/fornecedores/?page_size=3')
+
+    def test_plano_de_contas(self):
+        self._comparar_paginas('/api/v1/plano-de-contas/?page_size=3')
+        self._comparar_paginas('/api/v1/plano-de-contas/?page_size=2&codigo=1')
+
+    def test_ordem_dos_campos_nao_gera_nova_leitura(self):
+        # ?fields=id,nome,email e ?fields=email,nome,nome: mesma leitura
+        primeira = EmpresaLeitura.colunas(['id', 'nome', 'email'], ['socios'])
+        antes = LeituraRapida._compilar.cache_info()
+
+        segunda = EmpresaLeitura.colunas(['id', 'email', 'nome', 'nome'], ['socios'])
+
+        depois = LeituraRapida._compilar.cache_info()
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(depois.currsize, antes.currsize)
+        self.assertEqual(depois.hits, antes.hits + 1)
+
+
+class MidiaViewTests(TestCase):
+    HASH = 'ab' * 32
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        os.makedirs(os.path.join(self.media, 'avatars'))
+        self.conteudo = bytes(range(256)) * 4
+        self._gravar(f'avatars/{self.HASH}-64.webp', self.conteudo)
+        self._gravar('avatars/default.png', self.conteudo)
+
+    def _gravar(self, relativo, conteudo):
+        with open(os.path.join(self.media, relativo), 'wb') as arquivo:
+            arquivo.write(conteudo)
+
+    @staticmethod
+    def _corpo(response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_nome_pelo_hash_e_imutavel(self):
+        url = f'/media/avatars/{self.HASH}-64.webp'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._corpo(response), self.conteudo)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Length'], str(len(self.conteudo)))
+
+        revalidacao = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidacao.status_code, 304)
+        self.assertEqual(revalidacao['ETag'], response['ETag'])
+
+        revalidacao = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidacao.status_code, 304)
+
+    def test_versao_na_url(self):
+        url = MidiaUtils.versionar('/media/avatars/default.png')
+        self.assertRegex(url, r'^/media/avatars/default\.png\?v=[0-9a-f]{16}$')
+        self.assertEqual(
+            MidiaUtils.versionar(f'/media/avatars/{self.HASH}-64.webp'),
+            f'/media/avatars/{self.HASH}-64.webp')
+
+        self.assertEqual(self.client.get('/media/avatars/default.png')['Cache-Control'], 'no-cache')
+        self.assertIn('immutable', self.client.get(url)['Cache-Control'])
+
+        # Conteúdo alterado: nova versão, e a URL antiga deixa de ser imutável
+        self._gravar('avatars/default.png', self.conteudo[::-1])
+        caminho = os.path.join(self.media, 'avatars/default.png')
+        informacao = os.stat(caminho)
+        os.utime(caminho, ns=(informacao.st_atime_ns, informacao.st_mtime_ns + 10 ** 9))
+
+        self.assertNotEqual(MidiaUtils.versionar('/media/avatars/default.png'), url)
+        self.assertEqual(self.client.get(url)['Cache-Control'], 'no-cache')
+
+    def test_range(self):
+        url = f'/media/avatars/{self.HASH}-64.webp'
+        tamanho = len(self.conteudo)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-99')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 0-99/{tamanho}')
+        self.assertEqual(self._corpo(response), self.conteudo[:100])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self._corpo(response), self.conteudo[-10:])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={tamanho}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{tamanho}')
+
+        # If-Range de outra versão do arquivo: resposta completa
+        response = self.client.get(
+            url, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='"outra-versao"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._corpo(response), self.conteudo)
+
+        response = self.client.get(
+            url, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_head(self):
+        response = self.client.head(f'/media/avatars/{self.HASH}-64.webp')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(self.conteudo)))
+        self.assertEqual(response.content, b'')
+
+    def test_arquivo_inexistente_ou_fora_de_media(self):
+        self.assertEqual(self.client.get('/media/avatars/nao-existe.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/avatars').status_code, 404)
+        with self.assertLogs('django.security', 'ERROR'):
+            self.assertEqual(self.client.get('/media/../app/settings.py').status_code, 400)
+
+
+@override_settings(ALTERACOES_DONOS_MAXIMO=2)
+class DonosEmpresaTests(TestCase):
+    def setUp(self):
+        AlteracoesBuffer._donos.clear()
+        self.addCleanup(AlteracoesBuffer._donos.clear)
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresas = [
+            Empresa.objects.create(
+                user=self.user, tipo_documento='PJ', documento=f'{indice:014d}',
+                nome=f'Empresa {indice}', status='ATIVA', logradouro='Rua A',
+                numero='1', bairro='Centro', cidade='São Paulo', estado='SP',
+                cep='01001000', pais='Brasil'
+            ).id
+            for indice in range(3)
+        ]
+
+    def test_descarta_a_menos_usada(self):
+        primeira, segunda, terceira = self.empresas
+        AlteracoesBuffer.dono_da_empresa(primeira)
+        AlteracoesBuffer.dono_da_empresa(segunda)
+
+        # Leitura em memória renova a primeira
+        with self.assertNumQueries(0):
+            self.assertEqual(AlteracoesBuffer.dono_da_empresa(primeira), self.user.id)
+
+        AlteracoesBuffer.dono_da_empresa(terceira)
+        self.assertEqual(list(AlteracoesBuffer._donos), [primeira, terceira])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(AlteracoesBuffer.dono_da_empresa(segunda), self.user.id)
+        self.assertEqual(len(AlteracoesBuffer._donos), 2)
+
+
+@override_settings(ALTERACOES_INTERVALO=0.3, ALTERACOES_ESPERA_MAXIMA=3)
+class AlteracoesSocketTests(TransactionTestCase):
+    """
+    Feed de alterações pelo servidor Socket.IO do app/asgi.py
+    O cliente fala Engine.IO v4 por long-polling direto no ASGIApp
+    """
+    URL = '/socket.io/?EIO=4&transport=polling'
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.outro = User.objects.create(name='Outro', email='outro@teste.com')
+        self.empresa = Empresa.objects.create(
+            user=self.user, tipo_documento='PJ', documento='11.222.333/0001-81',
+            nome='Empresa Teste', status='ATIVA', logradouro='Rua A', numero='1',
+            bairro='Centro', cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+        )
+
+        # Ping a cada segundo: cada long-polling volta em no máximo 1s
+        for alvo, atributo, valor in (
+            (socket_app.socket_async.eio, 'ping_interval', 1),
+            (socket_app, '_envio_iniciado', False),
+            (AlteracoesBuffer, 'ativo', False),
+        ):
+            patcher = mock.patch.object(alvo, atributo, valor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(AlteracoesBuffer.retirar)
+        self.addCleanup(AlteracoesBuffer._donos.clear)
+
+    @staticmethod
+    def _token(user):
+        return str(RefreshToken.for_user(user).access_token)
+
+    async def _conectar(self, http, token):
+        response = await http.get(self.URL)
+        sid = json.loads(response.text[1:])['sid']
+        self.sessoes.append(sid)
+        await http.post(
+            f'{self.URL}&sid={sid}', content='40' + json.dumps({'token': token}))
+        response = await http.get(f'{self.URL}&sid={sid}')
+        return sid, response.text.split('\x1e')
+
+    async def _eventos(self, http, sid, duracao):
+        """Eventos recebidos durante `duracao` segundos, respondendo aos pings"""
+        eventos = []
+        fim = asyncio.get_running_loop().time() + duracao
+        while asyncio.get_running_loop().time() < fim:
+            response = await http.get(f'{self.URL}&sid={sid}')
+            for pacote in response.text.split('\x1e'):
+                if pacote == '2':
+                    await http.post(f'{self.URL}&sid={sid}', content='3')
+                elif pacote.startswith('42'):
+                    eventos.append(json.loads(pacote[2:]))
+        return eventos
+
+    async def test_um_evento_por_usuario_apos_o_commit(self):
+        tarefas = []
+        self.sessoes = []
+        iniciar = socket_app.socket_async.start_background_task
+
+        def iniciar_e_guardar(*args, **kwargs):
+            tarefa = iniciar(*args, **kwargs)
+            tarefas.append(tarefa)
+            return tarefa
+
+        transporte = httpx.ASGITransport(app=socketio.ASGIApp(socket_app.socket_async))
+        with mock.patch.object(
+                socket_app.socket_async, 'start_background_task', iniciar_e_guardar):
+            async with httpx.AsyncClient(
+                    transport=transporte, base_url='http://testserver') as http:
+                try:
+                    # Sem token válido a conexão é recusada
+                    _, pacotes = await self._conectar(http, 'invalido')
+                    self.assertTrue(pacotes[0].startswith('44'))
+
+                    sid, pacotes = await self._conectar(http, self._token(self.user))
+                    self.assertTrue(pacotes[0].startswith('40'))
+                    sid_outro, _ = await self._conectar(http, self._token(self.outro))
+                    self.assertEqual(len(tarefas), 1)
+
+                    # Alterações seguidas (cada uma com seu commit) e uma desfeita
+                    self.empresa.nome = 'Empresa Alterada'
+                    await sync_to_async(self.empresa.save)()
+                    socio = await Socio.objects.acreate(
+                        empresa=self.empresa, nome='Sócio', cpf='123.456.789-09',
+                        funcao='Administrador', data_entrada='2020-01-01')
+                    await sync_to_async(self._salvar_e_desfazer)()
+
+                    eventos, eventos_outro = await asyncio.gather(
+                        self._eventos(http, sid, 2),
+                        self._eventos(http, sid_outro, 2))
+                finally:
+                    # Pacote close do Engine.IO encerra cada sessão
+                    for sessao in self.sessoes:
+                        await http.post(f'{self.URL}&sid={sessao}', content='1')
+                    for tarefa in tarefas:
+                        tarefa.cancel()
+
+        self.assertEqual(eventos_outro, [])
+        self.assertEqual(len(eventos), 1)
+
+        nome, dados = eventos[0]
+        self.assertEqual(nome, socket_app.EVENTO_ALTERACOES)
+        self.assertEqual(
+            sorted(dados['alteracoes'], key=lambda item: item['modelo']),
+            [
+                {'modelo': 'empresa', 'acao': AlteracoesBuffer.SALVO,
+                 'total': 1, 'ids': [self.empresa.id]},
+                {'modelo': 'socio', 'acao': AlteracoesBuffer.SALVO,
+                 'total': 1, 'ids': [socio.id]},
+            ])
+
+    def _salvar_e_desfazer(self):
+        class Desfeito(Exception):
+            pass
+
+        try:
+            with transaction.atomic():
+                Atividade.objects.create(empresa=self.empresa, descricao='Desfeita')
+                raise Desfeito
+        except Desfeito:
+            pass
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from app.views import DocumentoValidacaoAPIView, MidiaView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/accounts/', include('accounts.urls')),
     path('api/v1/', include('empresa.urls')),
     path('api/v1/', include('planoDeContas.urls')),
     path('api/v1/', include('fornecedores.urls')),
+    path('api/v1/documentos/validar', DocumentoValidacaoAPIView.as_view()),
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:caminho>", MidiaView.as_view()),
 ]
@@ -0,0 +1,142 @@
+# utils/alteracoes_utils.py
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+
+class AlteracoesBuffer:
+    """
+    Acumula as alterações de empresas, sócios, atividades, fornecedores e
+    plano de contas por usuário, para o feed em tempo real (Socket.IO)
+    O envio espera ALTERACOES_INTERVALO segundos sem novas alterações
+    (no máximo ALTERACOES_ESPERA_MAXIMA): uma operação em lote gera uma
+    única mensagem por usuário
+    """
+    _lock = threading.Lock()
+    # user_id -> (modelo, acao) -> ids
+    _pendentes = defaultdict(lambda: defaultdict(set))
+    # Dono de cada empresa, para não consultar o banco a cada alteração
+    # LRU limitado a ALTERACOES_DONOS_MAXIMO empresas
+    _donos = OrderedDict()
+    # Somente processos com o servidor Socket.IO ativo acumulam alterações
+    ativo = False
+    _primeira = _ultima = 0.0
+
+    SALVO = 'salvo'
+    EXCLUIDO = 'excluido'
+
+    @classmethod
+    def registrar(cls, modelo, acao, ids, user_id=None, empresa_id=None):
+        """
+        Registra alterações após o commit (alterações desfeitas não são enviadas)
+        Informe o usuário dono ou a empresa dos registros
+        ids=None indica registros sem ids conhecidos (ex: COPY): recarregar a lista
+        """
+        if not cls.ativo:
+            return
+
+        ids = [None] if ids is None else list(ids)
+        if not ids:
+            return
+
+        if user_id is None:
+            user_id = cls.dono_da_empresa(empresa_id)
+            if user_id is None:
+                return
+
+        transaction.on_commit(
+            lambda: cls._adicionar(user_id, modelo, acao, ids))
+
+    @classmethod
+    def registrar_objetos(cls, objetos, acao):
+        """
+        Registra a alteração de objetos do mesmo modelo e da mesma empresa
+        (signals post_save/post_delete, bulk_create e bulk_update)
+        """
+        if not cls.ativo or not objetos:
+            return
+
+        primeiro = objetos[0]
+        ids = [obj.pk for obj in objetos]
+        if None in ids:
+            # bulk_create sem retorno dos ids
+            ids = None
+
+        if hasattr(primeiro, 'user_id'):
+            cls.registrar(primeiro._meta.model_name, acao, ids,
+                          user_id=primeiro.user_id)
+        else:
+            cls.registrar(primeiro._meta.model_name, acao, ids,
+                          empresa_id=primeiro.empresa_id)
+
+    @classmethod
+    def dono_da_empresa(cls, empresa_id):
+        if empresa_id is None:
+            return None
+
+        with cls._lock:
+            user_id = cls._donos.get(empresa_id)
+            if user_id is not None:
+                cls._donos.move_to_end(empresa_id)
+                return user_id
+
+        from empresa.models import Empresa
+
+        user_id = Empresa.objects.filter(
+            id=empresa_id).values_list('user_id', flat=True).first()
+        if user_id is not None:
+            with cls._lock:
+                cls._donos[empresa_id] = user_id
+                cls._donos.move_to_end(empresa_id)
+                while len(cls._donos) > settings.ALTERACOES_DONOS_MAXIMO:
+                    cls._donos.popitem(last=False)
+        return user_id
+
+    @classmethod
+    def retirar(cls):
+        """
+        Retorna e limpa as mensagens prontas para envio: {user_id: [alterações]}
+        Enquanto chegam novas alterações o envio é adiado (debounce)
+        Grupos com muitos ids são enviados só com o total (recarregar a lista)
+        """
+        agora = time.monotonic()
+        with cls._lock:
+            if not cls._pendentes:
+                return {}
+
+            if (agora - cls._ultima < settings.ALTERACOES_INTERVALO
+                    and agora - cls._primeira < settings.ALTERACOES_ESPERA_MAXIMA):
+                return {}
+
+            pendentes, cls._pendentes = cls._pendentes, defaultdict(
+                lambda: defaultdict(set))
+
+        maximo = settings.ALTERACOES_MAX_IDS
+        mensagens = {}
+        for user_id, grupos in pendentes.items():
+            mensagens[user_id] = [
+                {
+                    'modelo': modelo,
+                    'acao': acao,
+                    'total': None if None in ids else len(ids),
+                    'ids': sorted(ids) if None not in ids and len(ids) <= maximo else None,
+                }
+                for (modelo, acao), ids in grupos.items()
+            ]
+        return mensagens
+
+    @classmethod
+    def _adicionar(cls, user_id, modelo, acao, ids):
+        with cls._lock:
+            cls._ultima = time.monotonic()
+            if not cls._pendentes:
+                cls._primeira = cls._ultima
+            cls._pendentes[user_id][(modelo, acao)].update(ids)
+
+            # Empresa excluída: o dono em cache não é mais necessário
+            if modelo == 'empresa' and acao == cls.EXCLUIDO:
+                for empresa_id in ids:
+                    cls._donos.pop(empresa_id, None)
@@ -0,0 +1,60 @@
+# utils/async_utils.py
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.settings import api_settings
+
+
+class AsyncUtils:
+    """
+    Apoio às views assíncronas (Django puro) servidas pelo app/asgi.py,
+    reproduzindo o comportamento das views do DRF
+    """
+
+    @staticmethod
+    def dados_requisicao(request):
+        # Corpo JSON ou formulário, como os parsers padrão do DRF
+        if request.content_type == 'application/json':
+            try:
+                dados = json.loads(request.body or b'{}')
+            except ValueError:
+                return {}
+            return dados if isinstance(dados, dict) else {}
+        return request.POST
+
+    @staticmethod
+    async def autenticar(request):
+        """
+        Autentica com as classes padrão do DRF (JWT com cache de usuário)
+        Lança NotAuthenticated/AuthenticationFailed como as views do DRF
+        """
+        for classe in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            resultado = await sync_to_async(classe().authenticate)(request)
+            if resultado is not None:
+                request.user, request.auth = resultado
+                return request.user
+
+        raise NotAuthenticated()
+
+    @staticmethod
+    def resposta_erro(erro: APIException):
+        # Mesmo formato do exception handler do DRF
+        detalhe = erro.detail
+        if not isinstance(detalhe, (dict, list)):
+            detalhe = {'detail': detalhe}
+
+        response = JsonResponse(
+            detalhe, status=erro.status_code, safe=False,
+            json_dumps_params={'ensure_ascii': False})
+
+        if erro.status_code == 401:
+            response['WWW-Authenticate'] = 'Bearer realm="api"'
+        return response
+
+    @staticmethod
+    def resposta(dados, status=200):
+        return JsonResponse(
+            dados, status=status, safe=False,
+            json_dumps_params={'ensure_ascii': False})
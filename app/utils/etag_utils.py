@@ -0,0 +1,46 @@
+# utils/etag_utils.py
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils.http import quote_etag
+
+
+class ETagUtils:
+    """
+    GET condicional (If-None-Match) com ETags montadas a partir de dados
+    baratos de versão (datas de alteração, contadores), sem serializar
+    """
+
+    @staticmethod
+    def gerar(*partes):
+        """ETag fraca a partir das partes (versões, página, parâmetros)"""
+        conteudo = '|'.join(str(parte) for parte in partes)
+        return f"W/{quote_etag(hashlib.md5(conteudo.encode()).hexdigest())}"
+
+    @staticmethod
+    def confere(request, etag):
+        """True quando o If-None-Match da requisição contém a ETag (comparação fraca)"""
+        lista = request.headers.get('If-None-Match')
+        if not lista:
+            return False
+        if lista.strip() == '*':
+            return True
+
+        etag = etag.removeprefix('W/')
+        return any(
+            item.strip().removeprefix('W/') == etag
+            for item in lista.split(',')
+        )
+
+    @staticmethod
+    def nao_modificado(etag):
+        response = HttpResponseNotModified()
+        ETagUtils.aplicar(response, etag)
+        return response
+
+    @staticmethod
+    def aplicar(response, etag):
+        # Sempre revalidar: a resposta muda assim que os dados mudam
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
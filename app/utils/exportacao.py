@@ -0,0 +1,86 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+
+from app.utils.exceptions import ValidationError
+
+
+class _Eco:
+    """Pseudo-arquivo que devolve o que recebe, usado pelo csv.writer"""
+
+    def write(self, valor):
+        return valor
+
+
+class ExportacaoUtils:
+    FORMATOS = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+    # Datas e horas no mesmo formato da API (fuso local e DATETIME_FORMAT do DRF)
+    DATA_HORA = serializers.DateTimeField()
+
+    @staticmethod
+    def formato(request):
+        formato = request.query_params.get('formato', 'csv').lower()
+        if formato not in ExportacaoUtils.FORMATOS:
+            raise ValidationError(
+                f"Formato inválido. Disponíveis: {', '.join(ExportacaoUtils.FORMATOS)}")
+        return formato
+
+    @staticmethod
+    def em_blocos(iteravel, tamanho=None):
+        """Agrupa um iterável em listas de até 'tamanho' itens"""
+        tamanho = tamanho or settings.EXPORTACAO_CHUNK_SIZE
+        iterador = iter(iteravel)
+        while True:
+            bloco = list(islice(iterador, tamanho))
+            if not bloco:
+                return
+            yield bloco
+
+    @staticmethod
+    def resposta(linhas, colunas, formato, nome_arquivo):
+        """
+        Resposta em streaming: cada linha é convertida e enviada assim que
+        é lida do banco, sem montar o arquivo inteiro em memória
+        linhas: iterável de tuplas na mesma ordem de 'colunas'
+        """
+        linhas = (ExportacaoUtils._converter(linha) for linha in linhas)
+
+        if formato == 'ndjson':
+            conteudo = (
+                json.dumps(dict(zip(colunas, linha)),
+                           cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+                for linha in linhas
+            )
+        else:
+            escritor = csv.writer(_Eco())
+            conteudo = (escritor.writerow(linha) for linha in ExportacaoUtils._com_cabecalho(
+                colunas, linhas))
+
+        response = StreamingHttpResponse(
+            conteudo, content_type=ExportacaoUtils.FORMATOS[formato])
+        response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.{formato}"'
+        return response
+
+    @staticmethod
+    def _converter(linha):
+        """Valores da linha como na API, iguais nos dois formatos"""
+        return [
+            ExportacaoUtils.DATA_HORA.to_representation(valor)
+            if isinstance(valor, datetime)
+            else valor.isoformat() if hasattr(valor, 'isoformat') else valor
+            for valor in linha
+        ]
+
+    @staticmethod
+    def _com_cabecalho(colunas, linhas):
+        yield colunas
+        yield from linhas
@@ -0,0 +1,93 @@
+# utils/leitura_rapida.py
+from functools import lru_cache
+
+from rest_framework import serializers
+
+
+class LeituraRapida:
+    """
+    Caminho de leitura das listagens sem instanciar serializers por linha:
+    as linhas vêm de .values() e cada campo é convertido por uma função
+    pré-compilada a partir dos campos do próprio serializer
+    A saída é a mesma do serializer (mesmas chaves, ordem e valores);
+    gravações continuam usando os serializers com validação
+    """
+    # Campos cujo valor lido do banco já é a representação final
+    IDENTIDADE = (
+        serializers.IntegerField,
+        serializers.CharField,
+        serializers.BooleanField,
+        serializers.PrimaryKeyRelatedField,
+        serializers.ReadOnlyField,
+    )
+
+    def __init__(self, serializer, ordem=None, externos=()):
+        """
+        serializer: instância configurada (contexto, campos removidos)
+        ordem: nomes na ordem de saída, quando o serializer reordena os campos
+        externos: campos aninhados ou calculados, informados em representar()
+        """
+        campos = serializer.fields
+        modelo = serializer.Meta.model
+        nomes = ordem or [nome for nome, campo in campos.items() if not campo.write_only]
+
+        self.colunas = []
+        self._passos = []
+        for nome in nomes:
+            if nome in externos:
+                self._passos.append((nome, None, None))
+                continue
+
+            campo = campos[nome]
+            coluna = modelo._meta.get_field(campo.source).attname
+            if coluna not in self.colunas:
+                self.colunas.append(coluna)
+
+            conversor = None if isinstance(campo, self.IDENTIDADE) else campo.to_representation
+            self._passos.append((nome, coluna, conversor))
+
+    @classmethod
+    def para(cls, serializer_class, context=None, ordem=None, externos=()):
+        """
+        Leitura compilada (e guardada) para o serializer e o contexto informados
+        Listas do contexto (ex: campos de ?fields=) entram como conjuntos: o
+        serializer só testa a presença de cada nome, então a ordem e as
+        repetições enviadas pelo cliente não geram novas leituras
+        """
+        contexto = tuple(sorted(
+            (nome, frozenset(valor) if isinstance(valor, (list, tuple, set)) else valor)
+            for nome, valor in (context or {}).items()
+        ))
+        return cls._compilar(
+            serializer_class, contexto, tuple(ordem or ()), tuple(externos))
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _compilar(cls, serializer_class, contexto, ordem, externos):
+        # Limitado: cada combinação de ?fields= e ?include= é uma entrada
+        return cls(serializer_class(context=dict(contexto)), ordem or None, externos)
+
+    def representar(self, linhas, externos=None):
+        """
+        Converte as linhas (dicts de .values(*self.colunas)) na representação
+        externos: {nome: função(linha) -> valor} para os campos externos
+        """
+        externos = externos or {}
+        passos = [
+            (nome, coluna, externos[nome] if coluna is None else conversor)
+            for nome, coluna, conversor in self._passos
+        ]
+
+        resultado = []
+        for linha in linhas:
+            item = {}
+            for nome, coluna, conversor in passos:
+                if coluna is None:
+                    item[nome] = conversor(linha)
+                    continue
+
+                valor = linha[coluna]
+                # Como o serializer: None não passa pela conversão
+                item[nome] = valor if conversor is None or valor is None else conversor(valor)
+            resultado.append(item)
+        return resultado
@@ -0,0 +1,203 @@
+# utils/midia_utils.py
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from app.utils.etag_utils import ETagUtils
+
+
+class MidiaUtils:
+    """
+    Entrega dos arquivos de MEDIA_ROOT com validadores de cache
+    Arquivos nomeados pelo hash do conteúdo (ex: avatares reduzidos) e URLs
+    com ?v=<versão> nunca mudam: recebem Cache-Control immutable
+    Os demais são revalidados a cada uso (ETag/Last-Modified e 304)
+    """
+    # Nome iniciado pelo sha256 do conteúdo
+    ENDERECADO_POR_CONTEUDO = re.compile(r'^[0-9a-f]{64}(?=[.-])')
+    RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+    @staticmethod
+    def caminho(relativo):
+        """Caminho absoluto do arquivo, sem sair de MEDIA_ROOT"""
+        return safe_join(settings.MEDIA_ROOT, relativo)
+
+    @staticmethod
+    def hash_do_nome(relativo):
+        encontrado = MidiaUtils.ENDERECADO_POR_CONTEUDO.match(os.path.basename(relativo))
+        return encontrado.group(0) if encontrado else None
+
+    @staticmethod
+    def versionar(url):
+        """
+        Acrescenta ?v=<versão do conteúdo> às URLs de mídia que não são
+        endereçadas por conteúdo (ex: avatar padrão)
+        """
+        prefixo = f"/{settings.MEDIA_URL.strip('/')}/"
+        if not url or not url.startswith(prefixo) or '?' in url:
+            return url
+
+        relativo = url[len(prefixo):]
+        if MidiaUtils.hash_do_nome(relativo):
+            return url
+
+        try:
+            info = os.stat(MidiaUtils.caminho(relativo))
+        except (OSError, SuspiciousFileOperation):
+            return url
+
+        return f"{url}?v={MidiaUtils._versao(relativo, info.st_mtime_ns, info.st_size)}"
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _versao(relativo, mtime_ns, tamanho):
+        # mtime e tamanho fazem parte da chave: arquivo alterado gera nova versão
+        sha256 = hashlib.sha256()
+        with open(MidiaUtils.caminho(relativo), 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(64 * 1024), b''):
+                sha256.update(bloco)
+        return sha256.hexdigest()[:16]
+
+    @staticmethod
+    def etag(relativo, info):
+        hash_ = MidiaUtils.hash_do_nome(relativo)
+        if hash_:
+            # Mesmo nome sempre tem o mesmo conteúdo (variantes têm nomes próprios)
+            return quote_etag(f"{hash_[:16]}-{info.st_size}")
+        return quote_etag(f"{info.st_mtime_ns:x}-{info.st_size:x}")
+
+    @staticmethod
+    def responder(request, relativo, versao=None):
+        """
+        Resposta do arquivo (GET/HEAD) com ETag, Last-Modified e Cache-Control,
+        304 para validadores iguais e 206 para pedidos Range de um intervalo
+        versao: ?v= da URL, imutável somente se for a versão atual do arquivo
+        Lança FileNotFoundError quando o arquivo não existe
+        """
+        caminho = MidiaUtils.caminho(relativo)
+        info = os.stat(caminho)
+        if not os.path.isfile(caminho):
+            raise FileNotFoundError(caminho)
+
+        etag = MidiaUtils.etag(relativo, info)
+        modificado = int(info.st_mtime)
+
+        imutavel = MidiaUtils.hash_do_nome(relativo) is not None or (
+            versao is not None
+            and versao == MidiaUtils._versao(relativo, info.st_mtime_ns, info.st_size)
+        )
+        cabecalhos = {
+            'ETag': etag,
+            'Last-Modified': http_date(modificado),
+            'Cache-Control': (
+                f"public, max-age={settings.MIDIA_CACHE_MAX_AGE}, immutable"
+                if imutavel else 'no-cache'
+            ),
+            'Accept-Ranges': 'bytes',
+        }
+
+        if MidiaUtils._nao_modificado(request, etag, modificado):
+            response = HttpResponseNotModified()
+            for nome, valor in cabecalhos.items():
+                response[nome] = valor
+            return response
+
+        tipo = mimetypes.guess_type(caminho)[0] or 'application/octet-stream'
+        intervalo = MidiaUtils._intervalo(request, etag, modificado, info.st_size)
+
+        if intervalo == 'invalido':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{info.st_size}"
+            return response
+
+        inicio, fim = intervalo or (0, info.st_size - 1)
+        tamanho = max(fim - inicio + 1, 0)
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=tipo)
+        elif intervalo:
+            response = StreamingHttpResponse(
+                MidiaUtils._ler(caminho, inicio, tamanho), content_type=tipo)
+        else:
+            # Arquivo inteiro: o servidor pode usar sendfile (wsgi.file_wrapper)
+            response = FileResponse(open(caminho, 'rb'), content_type=tipo)
+
+        if intervalo:
+            response.status_code = 206
+            response['Content-Range'] = f"bytes {inicio}-{fim}/{info.st_size}"
+
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        response['Content-Length'] = str(tamanho)
+        return response
+
+    @staticmethod
+    def _nao_modificado(request, etag, modificado):
+        # If-None-Match tem prioridade sobre If-Modified-Since (RFC 9110)
+        if request.headers.get('If-None-Match'):
+            return ETagUtils.confere(request, etag)
+
+        if_modified_since = parse_http_date_safe(
+            request.headers.get('If-Modified-Since', ''))
+        return if_modified_since is not None and modificado <= if_modified_since
+
+    @staticmethod
+    def _intervalo(request, etag, modificado, tamanho):
+        """
+        (início, fim) do pedido Range, None para o arquivo inteiro
+        ou 'invalido' (416); vários intervalos são atendidos por inteiro
+        """
+        pedido = request.headers.get('Range')
+        if not pedido or request.method not in ('GET', 'HEAD'):
+            return None
+
+        # If-Range: arquivo alterado desde a primeira parte, envia inteiro
+        if_range = request.headers.get('If-Range')
+        if if_range:
+            data = parse_http_date_safe(if_range)
+            if data is None and if_range.strip() != etag:
+                return None
+            if data is not None and modificado > data:
+                return None
+
+        encontrado = MidiaUtils.RANGE.match(pedido.strip())
+        if not encontrado:
+            return None
+
+        inicio, fim = encontrado.groups()
+        if not inicio and not fim:
+            return None
+
+        if not inicio:
+            # bytes=-N: últimos N bytes
+            sufixo = int(fim)
+            if sufixo == 0:
+                return 'invalido'
+            return max(tamanho - sufixo, 0), tamanho - 1
+
+        inicio = int(inicio)
+        fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+        if inicio >= tamanho or inicio > fim:
+            return 'invalido'
+        return inicio, fim
+
+    @staticmethod
+    def _ler(caminho, inicio, tamanho, bloco=64 * 1024):
+        with open(caminho, 'rb') as arquivo:
+            arquivo.seek(inicio)
+            while tamanho > 0:
+                dados = arquivo.read(min(bloco, tamanho))
+                if not dados:
+                    break
+                tamanho -= len(dados)
+                yield dados
@@ -0,0 +1,13 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class CursorPagination(pagination.CursorPagination):
+    """
+    Paginação por cursor (keyset) com cursores opacos
+    O custo de qualquer página é o mesmo da primeira, pois a consulta usa
+    o índice (filtro, id) em vez de OFFSET
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
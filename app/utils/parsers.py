@@ -0,0 +1,27 @@
+# utils/parsers.py
+import orjson
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class OrjsonParser(JSONParser):
+    """
+    JSONParser do DRF com orjson (NaN/Infinity rejeitados, como no modo estrito)
+    Diferenças: números fora do double (ex: 1e400) são recusados e inteiros
+    acima de 64 bits chegam como float
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            dados = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                dados = dados.decode(encoding)
+            return orjson.loads(dados)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
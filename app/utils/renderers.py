@@ -0,0 +1,42 @@
+# utils/renderers.py
+import orjson
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer do DRF com orjson: mesma saída (compacta, UTF-8, datas com
+    'Z', Decimal como número), serializando dicts, listas e OrderedDict em C
+    Tipos que o orjson não conhece passam pelo encoder do DRF e inteiros
+    acima de 64 bits, que o orjson recusa, pelo JSONRenderer padrão
+    NaN/Infinity saem como null (o JSONRenderer lança ValueError)
+    """
+    OPCOES = (
+        orjson.OPT_NON_STR_KEYS
+        # Datas/horas no formato do DRF (+00:00 vira Z)
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        opcoes = self.OPCOES
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson só indenta com 2 espaços
+            opcoes |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default, option=opcoes)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Como o DRF: U+2028/U+2029 escapados para uso seguro em JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
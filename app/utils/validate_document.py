@@ -1,7 +1,17 @@
 import re
+
+import numpy as np
+
 from app.utils.exceptions import ValidationError
 
 
+def normalize_document(value):
+    """
+    Mantém somente os dígitos do CPF/CNPJ (valor gravado nas colunas normalizadas)
+    """
+    return re.sub(r"[^0-9]", "", value or "")
+
+
 def validate_cpf_cnpj(value):
     """
     Valida se o valor fornecido é um CPF ou CNPJ válido.
@@ -68,3 +78,104 @@ def is_valid_cnpj(cnpj):
         return True
 
     return False
+
+
+# Validação em lote (NumPy)
+# Cada documento recebe um status em vez de lançar exceção no primeiro erro
+STATUS_VALIDO = 0
+STATUS_TAMANHO_INVALIDO = 1
+STATUS_CPF_INVALIDO = 2
+STATUS_CNPJ_INVALIDO = 3
+
+STATUS_NOMES = {
+    STATUS_VALIDO: 'valido',
+    STATUS_TAMANHO_INVALIDO: 'tamanho_invalido',
+    STATUS_CPF_INVALIDO: 'cpf_invalido',
+    STATUS_CNPJ_INVALIDO: 'cnpj_invalido',
+}
+
+# Mesmas mensagens da validação individual
+STATUS_MENSAGENS = {
+    STATUS_TAMANHO_INVALIDO: "Invalid CPF or CNPJ.",
+    STATUS_CPF_INVALIDO: "Invalid CPF.",
+    STATUS_CNPJ_INVALIDO: "Invalid CNPJ.",
+}
+
+_PESOS_CPF_1 = np.arange(10, 1, -1)
+_PESOS_CPF_2 = np.arange(11, 1, -1)
+_PESOS_CNPJ_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+_PESOS_CNPJ_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+
+def normalize_documents(values):
+    """
+    Remove os caracteres não numéricos de vários documentos de uma vez
+    Os textos são unidos em um único buffer e filtrados com uma máscara
+    """
+    if not values:
+        return []
+
+    # \x00 separa os documentos no buffer: removido dos valores recebidos
+    buffer = '\x00'.join(
+        str(value or '').replace('\x00', '') for value in values
+    ).encode('latin-1', errors='replace')
+    bytes_ = np.frombuffer(buffer, dtype=np.uint8)
+
+    mascara = ((bytes_ >= ord('0')) & (bytes_ <= ord('9'))) | (bytes_ == 0)
+    return bytes_[mascara].tobytes().decode('ascii').split('\x00')
+
+
+def validate_cpf_cnpj_batch(values):
+    """
+    Valida vários CPFs/CNPJs de uma vez
+    Retorna (documentos normalizados, array de status) na ordem recebida
+    """
+    documentos = normalize_documents(values)
+    tamanhos = np.fromiter((len(d) for d in documentos),
+                           dtype=np.int64, count=len(documentos))
+    status = np.full(len(documentos), STATUS_TAMANHO_INVALIDO, dtype=np.int8)
+
+    for tamanho, validar, status_invalido in (
+        (11, _cpfs_validos, STATUS_CPF_INVALIDO),
+        (14, _cnpjs_validos, STATUS_CNPJ_INVALIDO),
+    ):
+        indices = np.flatnonzero(tamanhos == tamanho)
+        if not len(indices):
+            continue
+
+        digitos = _matriz_digitos([documentos[i] for i in indices], tamanho)
+        status[indices] = np.where(
+            validar(digitos), STATUS_VALIDO, status_invalido)
+
+    return documentos, status
+
+
+def _matriz_digitos(documentos, tamanho):
+    """Matriz (n, tamanho) com os dígitos de cada documento"""
+    buffer = ''.join(documentos).encode('ascii')
+    return (np.frombuffer(buffer, dtype=np.uint8) - ord('0')).reshape(-1, tamanho).astype(np.int64)
+
+
+def _repetidos(digitos):
+    # Documentos com todos os dígitos iguais (ex: 111.111.111-11)
+    return (digitos == digitos[:, :1]).all(axis=1)
+
+
+def _cpfs_validos(digitos):
+    resto = 11 - (digitos[:, :9] @ _PESOS_CPF_1) % 11
+    primeiro = np.where(resto < 10, resto, 0)
+
+    resto = 11 - (digitos[:, :10] @ _PESOS_CPF_2) % 11
+    segundo = np.where(resto < 10, resto, 0)
+
+    return (primeiro == digitos[:, 9]) & (segundo == digitos[:, 10]) & ~_repetidos(digitos)
+
+
+def _cnpjs_validos(digitos):
+    resto = (digitos[:, :12] @ _PESOS_CNPJ_1) % 11
+    primeiro = np.where(resto > 1, 11 - resto, 0)
+
+    resto = (digitos[:, :13] @ _PESOS_CNPJ_2) % 11
+    segundo = np.where(resto > 1, 11 - resto, 0)
+
+    return (primeiro == digitos[:, 12]) & (segundo == digitos[:, 13]) & ~_repetidos(digitos)
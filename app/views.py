@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.http import Http404
+from django.views import View
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from app.utils.exceptions import ValidationError
+from app.utils.midia_utils import MidiaUtils
+from app.utils.validate_document import (
+    STATUS_MENSAGENS, STATUS_NOMES, STATUS_VALIDO, validate_cpf_cnpj_batch
+)
+
+
+class DocumentoValidacaoAPIView(APIView):
+    def post(self, request):
+        """
+        Valida vários CPFs/CNPJs de uma vez ({"documentos": [...]})
+        Retorna o status de cada documento na ordem recebida
+        """
+        documentos = request.data.get('documentos')
+        if not isinstance(documentos, list):
+            raise ValidationError("Informe uma lista em 'documentos'.")
+
+        if len(documentos) > settings.DOCUMENTOS_VALIDACAO_MAXIMO:
+            raise ValidationError(
+                f"Máximo de {settings.DOCUMENTOS_VALIDACAO_MAXIMO} documentos por requisição.")
+
+        if any(not isinstance(documento, str) for documento in documentos):
+            raise ValidationError("Os documentos devem ser textos.")
+
+        normalizados, status = validate_cpf_cnpj_batch(documentos)
+
+        resultados = [
+            {
+                'documento': normalizado,
+                'status': STATUS_NOMES[codigo],
+                'valido': codigo == STATUS_VALIDO,
+                'erro': STATUS_MENSAGENS.get(codigo),
+            }
+            for normalizado, codigo in zip(normalizados, status.tolist())
+        ]
+        validos = int((status == STATUS_VALIDO).sum())
+
+        return Response({
+            'total': len(resultados),
+            'validos': validos,
+            'invalidos': len(resultados) - validos,
+            'resultados': resultados,
+        })
+
+
+class MidiaView(View):
+    http_method_names = ['get', 'head']
+
+    def get(self, request, caminho):
+        """
+        Arquivos de MEDIA_ROOT com cache de longo prazo para URLs que não
+        mudam (nome pelo hash do conteúdo ou ?v=) e 304 nas revalidações
+        """
+        # Avatares só chegam ao usuário depois de gerados: sem espera aqui,
+        # arquivo ausente (ex: imagem que falhou na redução) responde 404
+        try:
+            return MidiaUtils.responder(
+                request, caminho, versao=request.GET.get('v'))
+        except (FileNotFoundError, NotADirectoryError):
+            raise Http404
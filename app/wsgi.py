@@ -3,13 +3,17 @@ import socketio
 import eventlet
 
 from django.core.wsgi import get_wsgi_application
-from app.socket import socket
 from django.contrib.staticfiles.handlers import StaticFilesHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 # application = get_wsgi_application()
 
 application = StaticFilesHandler(get_wsgi_application())
+
+# Socket.IO (feed de alterações) montado junto com o Django
+# Importado depois do setup: app.socket lê as configurações
+from app.socket import socket  # noqa: E402
+
 application = socketio.WSGIApp(socket, application)
 
 # start server async
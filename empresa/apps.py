@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EmpresaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'empresa'
+
+    def ready(self):
+        # Registra os signals do feed de alterações
+        from empresa import signals  # noqa: F401
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from app.middleware import CompressaoMiddleware, brotli
+from app.utils.renderers import OrjsonRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o JSONRenderer padrão do DRF com o OrjsonRenderer nas maiores "
+        "listagens (tempo de renderização) e mostra os bytes enviados sem "
+        "compressão, com gzip e com brotli"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', required=True,
+                            help="Usuário usado para autenticar as requisições")
+        parser.add_argument('--rotas', nargs='+', default=[
+            '/api/v1/plano-de-contas/?page_size=500',
+            '/api/v1/empresa/?page_size=500',
+            '/api/v1/fornecedores/?page_size=500',
+        ])
+        parser.add_argument('--repeticoes', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError("Usuário não encontrado")
+
+        token = RefreshToken.for_user(user).access_token
+        cliente = Client(headers={'Authorization': f'Bearer {token}'})
+
+        for rota in options['rotas']:
+            response = cliente.get(rota)
+            if response.status_code != 200 or not hasattr(response, 'data'):
+                self.stderr.write(f"{rota}: status {response.status_code}")
+                continue
+
+            # A igualdade das saídas é coberta por app.tests.OrjsonRendererTests
+            padrao, esperado = self._medir(JSONRenderer(), response.data, options)
+            rapido, _ = self._medir(OrjsonRenderer(), response.data, options)
+
+            gzip = len(CompressaoMiddleware._comprimir(esperado, 'gzip'))
+            br = len(CompressaoMiddleware._comprimir(esperado, 'br')) if brotli else None
+
+            self.stdout.write(
+                f"{rota}: renderização padrão {padrao:.2f} ms | orjson {rapido:.2f} ms "
+                f"({padrao / rapido if rapido else 0:.1f}x) | "
+                f"{len(esperado)} bytes, gzip {gzip} ({gzip / len(esperado):.0%})"
+                + (f", brotli {br} ({br / len(esperado):.0%})" if br else ", brotli indisponível")
+            )
+
+    def _medir(self, renderer, dados, options):
+        inicio = time.perf_counter()
+        for _ in range(options['repeticoes']):
+            resultado = renderer.render(dados, 'application/json', {})
+        return (time.perf_counter() - inicio) * 1000 / options['repeticoes'], resultado
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from empresa.utils.importacao_utils import ImportacaoCnpj
+
+
+class Command(BaseCommand):
+    help = "Importa empresas (PJ) a partir de uma lista de CNPJs consultando a API CNPJA"
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="E-mail do usuário dono das empresas")
+        parser.add_argument('documentos', nargs='*', help="CNPJs a importar")
+        parser.add_argument('--arquivo', help="Arquivo com um CNPJ por linha")
+        parser.add_argument('--workers', type=int,
+                            help="Consultas simultâneas à API")
+        parser.add_argument('--por-segundo', type=float,
+                            help="Máximo de chamadas à API por segundo")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['email']).first()
+        if not user:
+            raise CommandError("Usuário não encontrado.")
+
+        documentos = list(options['documentos'])
+        if options['arquivo']:
+            with open(options['arquivo'], encoding='utf-8') as arquivo:
+                documentos += [linha.strip() for linha in arquivo if linha.strip()]
+
+        if not documentos:
+            raise CommandError("Nenhum documento informado.")
+
+        resultados = ImportacaoCnpj(
+            user,
+            workers=options['workers'],
+            por_segundo=options['por_segundo']
+        ).importar(documentos)
+
+        for resultado in resultados:
+            self.stdout.write(json.dumps(resultado, ensure_ascii=False))
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def criar_servidor(porta=0, latencia=0.0):
+    """
+    Servidor que imita a API CNPJA (GET /office/{taxId})
+    porta=0 usa uma porta livre (servidor.server_port)
+    servidor.consultas guarda os CNPJs consultados, na ordem
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            tax_id = self.path.rstrip('/').rsplit('/', 1)[-1]
+            with servidor.lock:
+                servidor.consultas.append(tax_id)
+            time.sleep(latencia)
+
+            corpo = json.dumps(office(tax_id)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), Handler)
+    servidor.daemon_threads = True
+    servidor.lock = threading.Lock()
+    servidor.consultas = []
+    return servidor
+
+
+def office(tax_id):
+    # Mesmo formato de /office/{taxId} usado pelo CompanySave
+    return {
+        "taxId": tax_id,
+        "alias": None,
+        "founded": "2020-01-01",
+        "head": True,
+        "status": {"text": "Ativa"},
+        "company": {
+            "name": f"Empresa {tax_id}",
+            "equity": 1000.5,
+            "size": {"text": "Micro Empresa"},
+            "members": [{
+                "person": {"name": "Sócio Teste", "taxId": "***123456**", "age": "31-40"},
+                "role": {"text": "Sócio-Administrador"},
+                "since": "2020-01-01"
+            }]
+        },
+        "mainActivity": {"text": "Atividade principal"},
+        "sideActivities": [{"text": "Atividade secundária"}],
+        "address": {
+            "street": "Rua Teste", "number": "1", "details": None,
+            "district": "Centro", "city": "São Paulo", "state": "SP",
+            "zip": "01000000", "country": {"name": "Brasil"}
+        },
+        "phones": [{"area": "11", "number": "99999999"}],
+        "emails": [{"address": "contato@example.com"}]
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Servidor local que imita a API CNPJA com latência artificial "
+        "(use CNPJA_API_URL=http://127.0.0.1:<porta>) para verificar quantas "
+        "consultas um worker mantém em andamento ao mesmo tempo"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--porta', type=int, default=8099)
+        parser.add_argument('--latencia', type=float, default=1.0,
+                            help="Segundos de espera antes de cada resposta")
+
+    def handle(self, *args, **options):
+        servidor = criar_servidor(options['porta'], options['latencia'])
+        self.stdout.write(
+            f"Stub CNPJA em http://127.0.0.1:{options['porta']} "
+            f"(latência {options['latencia']:.2f} s)")
+
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            servidor.server_close()
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='atividade',
+            index=models.Index(fields=['empresa', 'id'], name='atividade_empresa_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='empresa',
+            index=models.Index(fields=['user', 'id'], name='empresa_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socio',
+            index=models.Index(fields=['empresa', 'id'], name='socio_empresa_id_idx'),
+        ),
+    ]
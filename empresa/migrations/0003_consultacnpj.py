@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaCNPJ',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tax_id', models.CharField(max_length=14, unique=True, verbose_name='CNPJ (somente dígitos)')),
+                ('resposta', models.JSONField(verbose_name='Resposta da API')),
+                ('consultado_em', models.DateTimeField(auto_now=True, verbose_name='Consultado em')),
+            ],
+            options={
+                'verbose_name': 'Consulta CNPJ',
+                'verbose_name_plural': 'Consultas CNPJ',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+from app.utils.validate_document import normalize_document
+
+
+def preencher_documento_normalizado(apps, schema_editor):
+    """Preenche o documento só com dígitos das empresas já cadastradas"""
+    Empresa = apps.get_model('empresa', 'Empresa')
+
+    empresas = []
+    vistos = {}
+    for empresa in Empresa.objects.only('id', 'documento').iterator(chunk_size=2000):
+        empresa.documento_normalizado = normalize_document(empresa.documento)
+
+        # O índice único não pode ser criado com documentos repetidos
+        if empresa.documento_normalizado in vistos:
+            raise RuntimeError(
+                f"Empresas {vistos[empresa.documento_normalizado]} e {empresa.id} "
+                f"têm o mesmo documento ({empresa.documento_normalizado}).")
+        vistos[empresa.documento_normalizado] = empresa.id
+
+        empresas.append(empresa)
+
+    Empresa.objects.bulk_update(
+        empresas, ['documento_normalizado'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0003_consultacnpj'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresa',
+            name='documento_normalizado',
+            field=models.CharField(editable=False, max_length=14, null=True),
+        ),
+        migrations.RunPython(preencher_documento_normalizado,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='empresa',
+            name='documento_normalizado',
+            field=models.CharField(editable=False, max_length=14, null=True, unique=True),
+        ),
+    ]
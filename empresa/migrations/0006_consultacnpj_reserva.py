@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0005_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultacnpj',
+            name='reservado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reservado em'),
+        ),
+        migrations.AlterField(
+            model_name='consultacnpj',
+            name='resposta',
+            field=models.JSONField(null=True, verbose_name='Resposta da API'),
+        ),
+    ]
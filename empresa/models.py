@@ -1,6 +1,7 @@
 from django.db import models
 
 from accounts.models import User
+from app.utils.validate_document import normalize_document
 
 
 class Empresa(models.Model):
@@ -16,6 +17,9 @@ class Empresa(models.Model):
         max_length=2, choices=TIPO_DOCUMENTO_CHOICES, verbose_name="Tipo de Documento")
     documento = models.CharField(
         max_length=18, unique=True, verbose_name="CPF/CNPJ")
+    # Somente dígitos, usado em todas as buscas por documento
+    documento_normalizado = models.CharField(
+        max_length=14, unique=True, null=True, editable=False)
     nome = models.CharField(
         max_length=255, verbose_name="Nome/Razão Social")
     nome_fantasia = models.CharField(
@@ -50,13 +54,33 @@ class Empresa(models.Model):
         max_length=20, null=True, blank=True, verbose_name="Telefone")
     email = models.EmailField(null=True, blank=True, verbose_name="E-mail")
 
+    atualizado_em = models.DateTimeField(
+        auto_now=True, verbose_name="Atualizado em")
+
     class Meta:
         verbose_name = "Empresa ou Pessoa Física"
         verbose_name_plural = "Empresas e Pessoas Físicas"
+        indexes = [
+            # Paginação por cursor dentro do usuário
+            models.Index(fields=['user', 'id'], name='empresa_user_id_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        self.documento_normalizado = normalize_document(self.documento)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = [
+                *update_fields,
+                *(campo for campo in ('documento_normalizado', 'atualizado_em')
+                  if campo not in update_fields)
+            ]
+
+        super().save(*args, **kwargs)
+
 
 class Socio(models.Model):
     empresa = models.ForeignKey(
@@ -68,10 +92,15 @@ class Socio(models.Model):
     data_entrada = models.DateField(verbose_name="Data de Entrada")
     faixa_etaria = models.CharField(
         max_length=20, null=True, blank=True, verbose_name="Faixa Etária")
+    atualizado_em = models.DateTimeField(
+        auto_now=True, verbose_name="Atualizado em")
 
     class Meta:
         verbose_name = "Sócio"
         verbose_name_plural = "Sócios"
+        indexes = [
+            models.Index(fields=['empresa', 'id'], name='socio_empresa_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.nome} - {self.funcao}'
@@ -84,10 +113,36 @@ class Atividade(models.Model):
     descricao = models.CharField(max_length=255, verbose_name="Descrição")
     principal = models.BooleanField(
         default=False, verbose_name="Atividade Principal")
+    atualizado_em = models.DateTimeField(
+        auto_now=True, verbose_name="Atualizado em")
 
     class Meta:
         verbose_name = "Atividade Econômica"
         verbose_name_plural = "Atividades Econômicas"
+        indexes = [
+            models.Index(fields=['empresa', 'id'],
+                         name='atividade_empresa_id_idx'),
+        ]
 
     def __str__(self):
         return self.descricao
+
+
+class ConsultaCNPJ(models.Model):
+    """Respostas da API CNPJA guardadas para evitar consultas repetidas"""
+    tax_id = models.CharField(
+        max_length=14, unique=True, verbose_name="CNPJ (somente dígitos)")
+    # Nula enquanto a primeira consulta do CNPJ está em andamento
+    resposta = models.JSONField(null=True, verbose_name="Resposta da API")
+    consultado_em = models.DateTimeField(
+        auto_now=True, verbose_name="Consultado em")
+    # Consulta à API em andamento em algum processo (demais aguardam a resposta)
+    reservado_em = models.DateTimeField(
+        null=True, blank=True, verbose_name="Reservado em")
+
+    class Meta:
+        verbose_name = "Consulta CNPJ"
+        verbose_name_plural = "Consultas CNPJ"
+
+    def __str__(self):
+        return self.tax_id
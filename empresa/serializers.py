@@ -1,8 +1,9 @@
 from rest_framework import serializers
 
-from app.utils.validate_document import validate_cpf_cnpj
+from app.utils.validate_document import normalize_document, validate_cpf_cnpj
 
 from .models import Empresa, Socio, Atividade
+from .utils.campos_utils import CamposUtils
 from accounts.serializers import UserModelSerializer
 
 
@@ -26,7 +27,7 @@ class EmpresaSerializerModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Empresa
-        fields = '__all__'
+        exclude = ['documento_normalizado']
         extra_kwargs = {
             'user': {'read_only': True, 'default': serializers.CurrentUserDefault()},
             'nome': {'required': False},
@@ -49,6 +50,23 @@ class EmpresaSerializerModelSerializer(serializers.ModelSerializer):
             'email': {'required': False},
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Campos e relacionamentos pedidos via ?fields= e ?include=
+        campos = self.context.get('campos')
+        includes = self.context.get('includes')
+
+        if campos is not None:
+            for nome in list(self.fields):
+                if nome not in campos and nome not in CamposUtils.RELACIONAMENTOS:
+                    self.fields.pop(nome)
+
+        if includes is not None:
+            for nome in CamposUtils.RELACIONAMENTOS:
+                if nome not in includes:
+                    self.fields.pop(nome)
+
     def create(self, validated_data):
         # Garante que o user seja definido automaticamente
         validated_data['user'] = self.context['request'].user
@@ -57,6 +75,11 @@ class EmpresaSerializerModelSerializer(serializers.ModelSerializer):
     def validate_documento(self, value):
         # Validação de CPF/CNPJ
         validate_cpf_cnpj(value)
+
+        # Mesmo documento com outra formatação
+        if Empresa.objects.filter(documento_normalizado=normalize_document(value)).exists():
+            raise serializers.ValidationError("Documento já cadastrado.")
+
         return value
 
     def validate(self, data):
@@ -106,7 +129,7 @@ class EmpresaUpdateModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Empresa
-        fields = '__all__'
+        exclude = ['documento_normalizado']
 
         # Todos os campos são opcionais no update
         # user, tipo_documento, documento, capital_social não pode ser alterado
@@ -188,3 +211,45 @@ class AtividadeModelSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'empresa': {'read_only': True}  # Agora não precisa enviar no POST
         }
+
+
+class AtividadeLoteAtualizacaoSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    descricao = serializers.CharField(max_length=255, required=False)
+    principal = serializers.BooleanField(required=False)
+
+
+class AtividadeLoteSerializer(serializers.Serializer):
+    """
+    Alterações em lote das atividades de uma empresa
+    {"criar": [...], "atualizar": [{"id": 1, ...}], "excluir": [2, 3]}
+    """
+    criar = AtividadeModelSerializer(many=True, required=False)
+    atualizar = AtividadeLoteAtualizacaoSerializer(many=True, required=False)
+    excluir = serializers.ListField(
+        child=serializers.IntegerField(), required=False)
+
+    def validate(self, data):
+        criar = data.get('criar', [])
+        atualizar = data.get('atualizar', [])
+        excluir = data.get('excluir', [])
+
+        if not criar and not atualizar and not excluir:
+            raise serializers.ValidationError(
+                "Informe ao menos uma atividade para criar, atualizar ou excluir.")
+
+        ids_atualizar = [item['id'] for item in atualizar]
+        if len(ids_atualizar) != len(set(ids_atualizar)):
+            raise serializers.ValidationError(
+                {'atualizar': "Atividade repetida na lista."})
+
+        if set(ids_atualizar) & set(excluir):
+            raise serializers.ValidationError(
+                "A mesma atividade não pode ser atualizada e excluída.")
+
+        principais = [item for item in [*criar, *atualizar] if item.get('principal')]
+        if len(principais) > 1:
+            raise serializers.ValidationError(
+                "Somente uma atividade pode ser a principal.")
+
+        return data
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from empresa.models import Atividade, Empresa, Socio
+
+
+@receiver(post_save, sender=Empresa)
+@receiver(post_save, sender=Socio)
+@receiver(post_save, sender=Atividade)
+def registrar_alteracao(sender, instance, **kwargs):
+    # Feed de alterações em tempo real (Socket.IO)
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.SALVO)
+
+
+@receiver(post_delete, sender=Empresa)
+@receiver(post_delete, sender=Socio)
+@receiver(post_delete, sender=Atividade)
+def registrar_exclusao(sender, instance, **kwargs):
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.EXCLUIDO)
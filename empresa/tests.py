@@ -1,3 +1,471 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.utils.timezone import now
+
+from empresa.management.commands.stub_cnpja import criar_servidor, office
+from accounts.models import User
+from empresa.models import Atividade, ConsultaCNPJ, Empresa, Socio
+from empresa.utils.atividade_utils import AtividadeUtils
+from empresa.utils.cnpja_utils import CnpjaUtils
+from empresa.views import AsyncEmpresaAPIView
+
+
+class StubCnpjaMixin:
+    """Sobe o stub da API CNPJA em uma porta livre durante cada teste"""
+
+    def setUp(self):
+        self.servidor = criar_servidor(latencia=0.2)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+
+        configuracao = override_settings(
+            CNPJA_API_URL=f'http://127.0.0.1:{self.servidor.server_port}')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+
+class CnpjaUtilsTests(StubCnpjaMixin, TransactionTestCase):
+    CNPJ = '11222333000181'
+
+    def test_consultas_simultaneas_fazem_uma_chamada(self):
+        respostas = []
+        erros = []
+        largada = threading.Barrier(8)
+        reservar = CnpjaUtils._reservar
+
+        def reservar_depois_das_leituras(*args):
+            # SQLite em memória não aceita leituras durante uma escrita:
+            # a reserva espera as demais threads lerem o cache
+            time.sleep(0.3)
+            return reservar(*args)
+
+        def buscar():
+            try:
+                largada.wait()
+                respostas.append(CnpjaUtils.buscar(self.CNPJ))
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=buscar) for _ in range(8)]
+        with mock.patch.object(CnpjaUtils, '_reservar', reservar_depois_das_leituras):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertEqual(self.servidor.consultas, [self.CNPJ])
+        self.assertEqual(respostas, [office(self.CNPJ)] * 8)
+
+    def test_consulta_salva_serve_as_proximas(self):
+        CnpjaUtils.buscar('11.222.333/0001-81')
+        CnpjaUtils.buscar(self.CNPJ)
+        self.assertEqual(len(self.servidor.consultas), 1)
+
+        CnpjaUtils.buscar(self.CNPJ, atualizar=True)
+        self.assertEqual(len(self.servidor.consultas), 2)
+
+        consulta = ConsultaCNPJ.objects.get(tax_id=self.CNPJ)
+        self.assertEqual(consulta.resposta, office(self.CNPJ))
+        self.assertIsNone(consulta.reservado_em)
+
+    def test_api_consultada_fora_de_transacao(self):
+        consultar_api = CnpjaUtils._consultar_api
+        em_transacao = []
+
+        def consultar(tax_id):
+            em_transacao.append(connection.in_atomic_block)
+            return consultar_api(tax_id)
+
+        with mock.patch.object(CnpjaUtils, '_consultar_api', consultar):
+            CnpjaUtils.buscar(self.CNPJ)
+
+        self.assertEqual(em_transacao, [False])
+
+    def test_aguarda_reserva_de_outro_processo(self):
+        ConsultaCNPJ.objects.create(tax_id=self.CNPJ, resposta=None, reservado_em=now())
+
+        def outro_processo_responde(segundos):
+            ConsultaCNPJ.objects.filter(tax_id=self.CNPJ).update(
+                resposta={'taxId': self.CNPJ}, consultado_em=now(), reservado_em=None)
+
+        with mock.patch('empresa.utils.cnpja_utils.time.sleep', outro_processo_responde):
+            resposta = CnpjaUtils.buscar(self.CNPJ)
+
+        self.assertEqual(resposta, {'taxId': self.CNPJ})
+        self.assertEqual(self.servidor.consultas, [])
+
+    def test_reserva_expirada_e_assumida(self):
+        ConsultaCNPJ.objects.create(
+            tax_id=self.CNPJ, resposta=None, reservado_em=now() - timedelta(minutes=5))
+
+        self.assertEqual(CnpjaUtils.buscar(self.CNPJ), office(self.CNPJ))
+        self.assertEqual(self.servidor.consultas, [self.CNPJ])
+
+
+class EmpresaImportacaoTests(StubCnpjaMixin, TransactionTestCase):
+    URL = '/api/v1/empresa/importar/'
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_importa_com_status_por_documento(self):
+        response = self.client.post(self.URL, {'documentos': [
+            '11.222.333/0001-81', '11222333000181', '123', '529.982.247-25'
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [resultado['status'] for resultado in response.json()['resultados']],
+            ['criada', 'duplicado', 'invalido', 'invalido'])
+        self.assertEqual(self.servidor.consultas, ['11222333000181'])
+        self.assertTrue(Empresa.objects.filter(
+            documento_normalizado='11222333000181', user=self.user).exists())
+
+    @override_settings(CNPJA_IMPORT_MAXIMO=2)
+    def test_limite_de_documentos_por_requisicao(self):
+        response = self.client.post(self.URL, {'documentos': [
+            '11.222.333/0001-81', '11.444.777/0001-61', '45.723.174/0001-10'
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.servidor.consultas, [])
+
+
+class AsyncEmpresaTests(StubCnpjaMixin, TransactionTestCase):
+    """Cadastro de PJ pela view assíncrona (servidor ASGI)"""
+    CNPJ = '11222333000181'
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+
+    async def _post(self, dados, user=None):
+        cabecalhos = {}
+        if user:
+            cabecalhos['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+        request = self.factory.post(
+            '/api/v1/empresa/', json.dumps(dados), content_type='application/json',
+            headers=cabecalhos)
+        response = await AsyncEmpresaAPIView.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    @classmethod
+    def _sem_ids(cls, dados):
+        # ids e datas de gravação mudam a cada cadastro
+        volateis = ('id', 'empresa', 'atualizado_em')
+        if isinstance(dados, list):
+            return [cls._sem_ids(item) for item in dados]
+        if isinstance(dados, dict):
+            return {
+                chave: cls._sem_ids(valor) for chave, valor in dados.items()
+                if chave not in volateis
+            }
+        return dados
+
+    async def test_cadastro_igual_ao_da_view_sincrona(self):
+        dados = {'documento': '11.222.333/0001-81', 'tipo_documento': 'PJ'}
+
+        status, corpo = await self._post(dados, self.user)
+        self.assertEqual(status, 201)
+        self.assertTrue(await Empresa.objects.filter(
+            documento_normalizado=self.CNPJ, user=self.user).aexists())
+
+        # O mesmo cadastro pela view síncrona, com a consulta já em cache
+        await Empresa.objects.filter(documento_normalizado=self.CNPJ).adelete()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        sincrona = await asyncio.to_thread(client.post, '/api/v1/empresa/', dados, format='json')
+
+        self.assertEqual(sincrona.status_code, 201)
+        self.assertEqual(self._sem_ids(corpo), self._sem_ids(sincrona.json()))
+        self.assertEqual(self.servidor.consultas, [self.CNPJ])
+
+    async def test_consultas_simultaneas_no_event_loop_fazem_uma_chamada(self):
+        respostas = await asyncio.gather(
+            *(CnpjaUtils.abuscar(self.CNPJ) for _ in range(8)))
+
+        self.assertEqual(self.servidor.consultas, [self.CNPJ])
+        self.assertEqual(respostas, [office(self.CNPJ)] * 8)
+
+    async def test_sem_autenticacao(self):
+        status, _ = await self._post({'documento': self.CNPJ, 'tipo_documento': 'PJ'})
+
+        self.assertEqual(status, 401)
+        self.assertEqual(self.servidor.consultas, [])
+
+    async def test_documento_obrigatorio(self):
+        status, corpo = await self._post({'tipo_documento': 'PJ'}, self.user)
+
+        self.assertEqual(status, 400)
+        self.assertEqual(self.servidor.consultas, [])
+
+
+class ConsultasPorListagemEmpresaTests(TestCase):
+    """A listagem faz o mesmo número de consultas com qualquer quantidade de empresas"""
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _criar_empresas(self, quantidade):
+        for indice in range(Empresa.objects.count(), quantidade):
+            empresa = Empresa.objects.create(
+                user=self.user, tipo_documento='PJ', documento=f'{indice:014d}',
+                nome=f'Empresa {indice}', status='ATIVA', logradouro='Rua A',
+                numero='1', bairro='Centro', cidade='São Paulo', estado='SP',
+                cep='01001000', pais='Brasil'
+            )
+            Socio.objects.create(
+                empresa=empresa, nome='Sócio', cpf='123.456.789-09',
+                funcao='Administrador', data_entrada='2020-01-01')
+            Atividade.objects.create(empresa=empresa, descricao='Comércio', principal=True)
+            Atividade.objects.create(empresa=empresa, descricao='Serviços')
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response.json()
+
+    def test_duas_e_seis_empresas(self):
+        for leitura_rapida in (True, False):
+            for url in ('/api/v1/empresa/',
+                        '/api/v1/empresa/?include=socios,atividades,user',
+                        '/api/v1/empresa/?fields=nome,documento&include=socios'):
+                with self.subTest(leitura_rapida=leitura_rapida, url=url), \
+                        override_settings(LEITURA_RAPIDA=leitura_rapida):
+                    Empresa.objects.all().delete()
+                    self._criar_empresas(2)
+                    consultas_duas, dados = self._consultas(url)
+                    self.assertEqual(len(dados['results']), 2)
+
+                    self._criar_empresas(6)
+                    consultas_seis, dados = self._consultas(url)
+                    self.assertEqual(len(dados['results']), 6)
+                    self.assertEqual(consultas_duas, consultas_seis)
+
+    def test_fields_limita_as_colunas(self):
+        self._criar_empresas(1)
+        for leitura_rapida in (True, False):
+            with self.subTest(leitura_rapida=leitura_rapida), \
+                    override_settings(LEITURA_RAPIDA=leitura_rapida):
+                with CaptureQueriesContext(connection) as consultas:
+                    response = self.client.get('/api/v1/empresa/?fields=nome&include=')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(consultas), 1)
+                self.assertNotIn('capital_social', consultas[0]['sql'])
+
+
+class AtividadeLoteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = self._criar_empresa(self.user, '11.222.333/0001-81')
+        self.principal = Atividade.objects.create(
+            empresa=self.empresa, descricao='Comércio', principal=True)
+        self.secundaria = Atividade.objects.create(
+            empresa=self.empresa, descricao='Serviços')
+        self.excluida = Atividade.objects.create(
+            empresa=self.empresa, descricao='Transporte')
+        AtividadeUtils.recalcular(self.empresa)
+
+        self.url = f'/api/v1/empresa/{self.empresa.documento_normalizado}/atividades/lote/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def _criar_empresa(user, documento):
+        return Empresa.objects.create(
+            user=user, tipo_documento='PJ', documento=documento, nome='Empresa Teste',
+            status='ATIVA', logradouro='Rua A', numero='1', bairro='Centro',
+            cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+        )
+
+    def _post(self, dados):
+        with mock.patch.object(
+                AtividadeUtils, 'recalcular', wraps=AtividadeUtils.recalcular) as recalcular:
+            response = self.client.post(self.url, dados, format='json')
+        return response, recalcular
+
+    def _estado(self):
+        self.empresa.refresh_from_db()
+        return (
+            list(Atividade.objects.order_by('id').values_list(
+                'id', 'descricao', 'principal')),
+            self.empresa.atividade_principal,
+            self.empresa.atividades_secundarias,
+        )
+
+    def test_criar_atualizar_e_excluir(self):
+        response, recalcular = self._post({
+            'criar': [{'descricao': 'Indústria'}],
+            'atualizar': [{'id': self.secundaria.id, 'descricao': 'Consultoria'}],
+            'excluir': [self.excluida.id],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(recalcular.call_count, 1)
+
+        self.assertEqual(
+            sorted((item['descricao'], item['principal']) for item in response.json()),
+            [('Comércio', True), ('Consultoria', False), ('Indústria', False)])
+        self.assertFalse(Atividade.objects.filter(id=self.excluida.id).exists())
+
+        self.empresa.refresh_from_db()
+        self.assertEqual(self.empresa.atividade_principal, 'Comércio')
+        self.assertEqual(self.empresa.atividades_secundarias, 'Consultoria, Indústria')
+
+    def test_nova_principal_substitui_a_atual(self):
+        response, recalcular = self._post({
+            'criar': [{'descricao': 'Indústria', 'principal': True}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(recalcular.call_count, 1)
+
+        self.principal.refresh_from_db()
+        self.assertFalse(self.principal.principal)
+        self.assertEqual(
+            list(Atividade.objects.filter(principal=True).values_list('descricao', flat=True)),
+            ['Indústria'])
+
+        self.empresa.refresh_from_db()
+        self.assertEqual(self.empresa.atividade_principal, 'Indústria')
+        self.assertEqual(
+            self.empresa.atividades_secundarias, 'Comércio, Serviços, Transporte')
+
+    def test_atualizacao_promove_a_principal(self):
+        response, recalcular = self._post({
+            'atualizar': [{'id': self.secundaria.id, 'principal': True}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(recalcular.call_count, 1)
+
+        self.principal.refresh_from_db()
+        self.assertFalse(self.principal.principal)
+        self.empresa.refresh_from_db()
+        self.assertEqual(self.empresa.atividade_principal, 'Serviços')
+        self.assertEqual(self.empresa.atividades_secundarias, 'Comércio, Transporte')
+
+    def test_ids_desconhecidos_ou_de_outra_empresa(self):
+        outra = self._criar_empresa(
+            User.objects.create(name='Outro', email='outro@teste.com'), '11.444.777/0001-61')
+        alheia = Atividade.objects.create(empresa=outra, descricao='Alheia')
+        antes = self._estado()
+
+        for dados in (
+            {'criar': [{'descricao': 'Indústria', 'principal': True}],
+             'excluir': [self.excluida.id, 999999]},
+            {'criar': [{'descricao': 'Indústria', 'principal': True}],
+             'atualizar': [{'id': alheia.id, 'descricao': 'Invadida'}]},
+        ):
+            with self.subTest(dados=dados):
+                response, recalcular = self._post(dados)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Atividades não encontradas', response.content.decode())
+                recalcular.assert_not_called()
+                self.assertEqual(self._estado(), antes)
+
+        alheia.refresh_from_db()
+        self.assertEqual(alheia.descricao, 'Alheia')
+
+    def test_validacoes_do_serializer(self):
+        antes = self._estado()
+        casos = (
+            ({}, 'Informe ao menos uma atividade'),
+            ({'atualizar': [{'id': self.secundaria.id}, {'id': self.secundaria.id}]},
+             'Atividade repetida na lista'),
+            ({'atualizar': [{'id': self.secundaria.id}], 'excluir': [self.secundaria.id]},
+             'não pode ser atualizada e excluída'),
+            ({'criar': [{'descricao': 'Indústria', 'principal': True}],
+              'atualizar': [{'id': self.secundaria.id, 'principal': True}]},
+             'Somente uma atividade pode ser a principal'),
+        )
+        for dados, mensagem in casos:
+            with self.subTest(mensagem=mensagem):
+                response, recalcular = self._post(dados)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(mensagem, response.content.decode())
+                recalcular.assert_not_called()
+                self.assertEqual(self._estado(), antes)
+
+
+class EmpresaETagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = AtividadeLoteTests._criar_empresa(self.user, '11.222.333/0001-81')
+        agora = now()
+        self.socio_antigo = Socio.objects.create(
+            empresa=self.empresa, nome='Sócio Antigo', cpf='123.456.789-09',
+            funcao='Administrador', data_entrada='2020-01-01')
+        self.socio = Socio.objects.create(
+            empresa=self.empresa, nome='Sócio', cpf='987.654.321-00',
+            funcao='Sócio', data_entrada='2021-01-01')
+        self.atividade = Atividade.objects.create(
+            empresa=self.empresa, descricao='Comércio', principal=True)
+        # Datas distintas: a exclusão do sócio antigo não muda a maior data
+        Socio.objects.filter(pk=self.socio_antigo.pk).update(
+            atualizado_em=agora - timedelta(days=1))
+
+        self.url = f'/api/v1/empresa/{self.empresa.documento_normalizado}/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _get(self, etag=None):
+        cabecalhos = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(self.url, **cabecalhos)
+
+    def test_etag_igual_responde_304(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self._get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_alteracao_dos_filhos_muda_a_etag(self):
+        etag = self._get()['ETag']
+
+        alteracoes = (
+            ('atividade alterada', lambda: self.atividade.save()),
+            # Somente o total de sócios muda
+            ('sócio antigo excluído', lambda: self.socio_antigo.delete()),
+            ('atividade excluída', lambda: self.atividade.delete()),
+            ('sócio criado', lambda: Socio.objects.create(
+                empresa=self.empresa, nome='Novo', cpf='111.444.777-35',
+                funcao='Sócio', data_entrada='2022-01-01')),
+        )
+        for descricao, alterar in alteracoes:
+            with self.subTest(descricao):
+                alterar()
+                response = self._get(etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+                etag = response['ETag']
+                self.assertEqual(self._get(etag).status_code, 304)
+
+    def test_campos_diferentes_geram_outra_etag(self):
+        etag = self._get()['ETag']
+        response = self.client.get(f'{self.url}?fields=nome', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
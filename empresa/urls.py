@@ -1,18 +1,29 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from .views import (
-    EmpresaAPIView, EmpresaRetrieveUpdateDestroyAPIView,
-    AtividadeListCreateAPIView, AtividadeRetrieveUpdateDestroyAPIView,
+    AsyncEmpresaAPIView, EmpresaAPIView, EmpresaImportacaoAPIView, EmpresaSincronizarAPIView,
+    EmpresaRetrieveUpdateDestroyAPIView,
+    AtividadeListCreateAPIView, AtividadeRetrieveUpdateDestroyAPIView, AtividadeLoteAPIView,
     SocioListCreateAPIView, SocioRetrieveUpdateDestroyAPIView
 )
 
+# No servidor ASGI (app/asgi.py) o cadastro de PJ usa a view assíncrona
+empresa_view = AsyncEmpresaAPIView if settings.SERVIDOR_ASGI else EmpresaAPIView
+
 urlpatterns = [
-    path('empresa/', EmpresaAPIView.as_view(), name='empresa-list-create'),
+    path('empresa/', empresa_view.as_view(), name='empresa-list-create'),
+    path('empresa/importar/', EmpresaImportacaoAPIView.as_view(),
+         name='empresa-importar'),
     path('empresa/<str:documento>/',
          EmpresaRetrieveUpdateDestroyAPIView.as_view(), name='empresa-update-delete'),
+    path('empresa/<str:documento>/sincronizar/',
+         EmpresaSincronizarAPIView.as_view(), name='empresa-sincronizar'),
 
     path('empresa/<str:documento>/atividades/', AtividadeListCreateAPIView.as_view(),
          name='empresa-list-create'),
+    path('empresa/<str:documento>/atividades/lote/', AtividadeLoteAPIView.as_view(),
+         name='empresa-atividades-lote'),
     path('empresa/<str:documento>/atividades/<int:pk>/',
          AtividadeRetrieveUpdateDestroyAPIView.as_view(),
          name='empresa-atividades-detail'),
@@ -1,30 +1,60 @@
 # utils/atividade_utils.py
+from django.utils import timezone
+
+from app.utils.alteracoes_utils import AlteracoesBuffer
 from empresa.models import Empresa, Atividade
 
 
 class AtividadeUtils:
     @staticmethod
-    def atualizar_atividade_principal(empresa, nova_principal):
-        # 1. Remove principal das outras atividades
-        Atividade.objects.filter(empresa=empresa, principal=True).exclude(
-            id=nova_principal.id
-        ).update(principal=False)
+    def bloquear_empresa(empresa_id):
+        """
+        Bloqueia a linha da empresa até o fim da transação, para que duas
+        trocas de atividade principal da mesma empresa não se intercalem
+        """
+        return Empresa.objects.select_for_update().only('id').get(pk=empresa_id)
+
+    @staticmethod
+    def recalcular(empresa, nova_principal=None, principal_removida=False):
+        """
+        Recalcula atividade_principal e atividades_secundarias da empresa
+        com uma consulta às atividades e um único UPDATE das duas colunas
+        Deve ser chamado dentro da transação que bloqueou a empresa
+        """
+        # 1. Somente uma atividade principal por empresa
+        if nova_principal is not None:
+            Atividade.objects.filter(empresa_id=empresa.pk, principal=True).exclude(
+                id=nova_principal.id
+            ).update(principal=False, atualizado_em=timezone.now())
 
-        # 2. Atualiza o campo atividade_principal na empresa
-        empresa.atividade_principal = nova_principal.descricao
-        empresa.save()
+        # 2. Atividades da empresa em uma única consulta
+        atividades = Atividade.objects.filter(
+            empresa_id=empresa.pk
+        ).order_by('id').values_list('descricao', 'principal')
 
-        # 3. Atualiza atividades_secundarias na empresa
-        AtividadeUtils.atualizar_atividades_secundarias(empresa)
+        principal = None
+        secundarias = []
+        for descricao, is_principal in atividades:
+            if is_principal:
+                principal = descricao
+            else:
+                secundarias.append(descricao)
 
-    @staticmethod
-    def atualizar_atividades_secundarias(empresa):
-        # Pega todas as atividades não-principais
-        secundarias = Atividade.objects.filter(
-            empresa=empresa,
-            principal=False
-        ).values_list('descricao', flat=True)
-
-        # Atualiza o campo na empresa
-        empresa.atividades_secundarias = ", ".join(secundarias)
-        empresa.save()
+        campos = {
+            'atividades_secundarias': ", ".join(secundarias),
+            # update() não aplica o auto_now
+            'atualizado_em': timezone.now(),
+        }
+
+        # Sem atividade principal cadastrada, mantém o valor atual
+        # a não ser que a principal tenha acabado de ser removida
+        if principal is not None or principal_removida:
+            campos['atividade_principal'] = principal
+
+        # 3. Atualiza somente as colunas desnormalizadas
+        Empresa.objects.filter(pk=empresa.pk).update(**campos)
+        AlteracoesBuffer.registrar(
+            'empresa', AlteracoesBuffer.SALVO, [empresa.pk], empresa_id=empresa.pk)
+
+        for campo, valor in campos.items():
+            setattr(empresa, campo, valor)
@@ -0,0 +1,90 @@
+# utils/campos_utils.py
+from django.db.models import Prefetch
+
+from app.utils.exceptions import ValidationError
+from empresa.models import Empresa, Socio, Atividade
+
+
+class CamposUtils:
+    # Relacionamentos aninhados que podem ser incluídos via ?include=
+    RELACIONAMENTOS = ('user', 'socios', 'atividades')
+
+    @staticmethod
+    def campos_disponiveis():
+        return [
+            field.name for field in Empresa._meta.concrete_fields
+            if field.name not in ('user', 'documento_normalizado')
+        ]
+
+    @staticmethod
+    def parse_campos(request):
+        """
+        Lê ?fields=id,nome,documento
+        Retorna None quando o parâmetro não foi enviado (todos os campos)
+        """
+        valor = request.query_params.get('fields', None)
+        if valor is None:
+            return None
+
+        campos = [campo.strip() for campo in valor.split(',') if campo.strip()]
+        disponiveis = CamposUtils.campos_disponiveis()
+
+        invalidos = [campo for campo in campos if campo not in disponiveis]
+        if invalidos:
+            raise ValidationError(
+                f"Campos inválidos em 'fields': {', '.join(invalidos)}. "
+                f"Disponíveis: {', '.join(disponiveis)}")
+
+        # O id é sempre retornado para identificar o registro
+        if 'id' not in campos:
+            campos.insert(0, 'id')
+
+        return campos
+
+    @staticmethod
+    def parse_includes(request):
+        """
+        Lê ?include=socios,atividades,user
+        Sem o parâmetro, todos os relacionamentos são incluídos (compatibilidade)
+        """
+        valor = request.query_params.get('include', None)
+        if valor is None:
+            return list(CamposUtils.RELACIONAMENTOS)
+
+        includes = [item.strip() for item in valor.split(',') if item.strip()]
+
+        invalidos = [
+            item for item in includes if item not in CamposUtils.RELACIONAMENTOS
+        ]
+        if invalidos:
+            raise ValidationError(
+                f"Valores inválidos em 'include': {', '.join(invalidos)}. "
+                f"Disponíveis: {', '.join(CamposUtils.RELACIONAMENTOS)}")
+
+        return includes
+
+    @staticmethod
+    def otimizar_queryset(queryset, campos, includes):
+        """
+        Reduz as colunas do SELECT e carrega somente os relacionamentos pedidos,
+        mantendo um número constante de consultas independente da quantidade de empresas
+        """
+        if campos is not None:
+            colunas = list(campos)
+            if 'user' in includes:
+                # Necessário para o select_related do usuário
+                colunas.append('user')
+            queryset = queryset.only(*colunas)
+
+        if 'user' in includes:
+            queryset = queryset.select_related('user')
+
+        # Filhos em ordem de id (a mesma da leitura rápida)
+        if 'socios' in includes:
+            queryset = queryset.prefetch_related(
+                Prefetch('socios', queryset=Socio.objects.order_by('id')))
+        if 'atividades' in includes:
+            queryset = queryset.prefetch_related(
+                Prefetch('atividades', queryset=Atividade.objects.order_by('id')))
+
+        return queryset
@@ -0,0 +1,316 @@
+# utils/cnpja_utils.py
+import asyncio
+import re
+import threading
+import time
+import weakref
+import zlib
+from datetime import timedelta
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils.timezone import now
+
+from empresa.models import ConsultaCNPJ
+
+
+class CnpjaError(Exception):
+    """Erro retornado pela API CNPJA"""
+
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _Consulta:
+    """Consulta em andamento compartilhada pelas requisições do mesmo CNPJ"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resposta = None
+        self.erro = None
+
+
+class LimitadorTaxa:
+    """Limita a quantidade de chamadas por segundo entre várias threads"""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self.proxima = time.monotonic()
+        self.lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+
+        with self.lock:
+            agora = time.monotonic()
+            espera = self.proxima - agora
+            self.proxima = max(agora, self.proxima) + self.intervalo
+
+        if espera > 0:
+            time.sleep(espera)
+
+
+class CnpjaUtils:
+    # Segundos entre as conferências enquanto outro processo consulta o CNPJ
+    ESPERA_INTERVALO = 0.2
+
+    _lock = threading.Lock()
+    _em_andamento = {}
+    _sessao = None
+    # Versão assíncrona: consultas em andamento e cliente HTTP por event loop
+    _em_andamento_async = {}
+    _clientes_async = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def normalizar(documento):
+        return re.sub(r"[^0-9]", "", documento or '')
+
+    @staticmethod
+    def buscar(documento, limitador=None, atualizar=False):
+        """
+        Retorna os dados do CNPJ, usando o cache do banco enquanto for válido
+        Requisições simultâneas do mesmo CNPJ compartilham uma única chamada à API
+        O limitador (opcional) é aplicado somente às chamadas reais à API
+        Com atualizar=True o cache é ignorado e a resposta nova é salva nele
+        """
+        tax_id = CnpjaUtils.normalizar(documento)
+
+        if not atualizar:
+            resposta = CnpjaUtils._do_cache(tax_id)
+            if resposta is not None:
+                return resposta
+
+        with CnpjaUtils._lock:
+            consulta = CnpjaUtils._em_andamento.get(tax_id)
+            responsavel = consulta is None
+            if responsavel:
+                consulta = CnpjaUtils._em_andamento[tax_id] = _Consulta()
+
+        if not responsavel:
+            # Aguarda a consulta que já está em andamento neste processo
+            consulta.evento.wait()
+            if consulta.erro is not None:
+                raise consulta.erro
+            return consulta.resposta
+
+        try:
+            consulta.resposta = CnpjaUtils._consultar_e_salvar(
+                tax_id, limitador, atualizar)
+            return consulta.resposta
+        except Exception as e:
+            consulta.erro = e
+            raise
+        finally:
+            with CnpjaUtils._lock:
+                CnpjaUtils._em_andamento.pop(tax_id, None)
+            consulta.evento.set()
+
+    @staticmethod
+    def _do_cache(tax_id, desde=None):
+        """Resposta salva após `desde` (padrão: dentro da validade) ou None"""
+        validade = desde or now() - timedelta(seconds=settings.CNPJA_CACHE_TTL)
+        return ConsultaCNPJ.objects.filter(
+            tax_id=tax_id,
+            consultado_em__gte=validade
+        ).values_list('resposta', flat=True).first()
+
+    @staticmethod
+    def _consultar_e_salvar(tax_id, limitador=None, atualizar=False):
+        """
+        Consulta a API fora de qualquer transação: uma reserva na tabela de
+        consultas (ConsultaCNPJ.reservado_em) faz os outros processos
+        aguardarem a resposta em vez de repetirem a chamada
+        """
+        if limitador is not None:
+            limitador.aguardar()
+
+        inicio = now()
+        while True:
+            resposta, reservado = CnpjaUtils._reservar(
+                tax_id, inicio if atualizar else None)
+            if resposta is not None:
+                return resposta
+            if reservado:
+                break
+            # Outro processo está consultando: aguarda a resposta ou o fim da reserva
+            time.sleep(CnpjaUtils.ESPERA_INTERVALO)
+
+        try:
+            resposta = CnpjaUtils._consultar_api(tax_id)
+        except Exception:
+            # Libera a reserva: o próximo pedido tenta novamente
+            ConsultaCNPJ.objects.filter(tax_id=tax_id).update(reservado_em=None)
+            raise
+
+        # Transação curta somente para gravar a resposta
+        ConsultaCNPJ.objects.update_or_create(
+            tax_id=tax_id,
+            defaults={'resposta': resposta, 'reservado_em': None}
+        )
+        return resposta
+
+    @staticmethod
+    def _reservar(tax_id, desde=None):
+        """
+        Transação curta que confere o cache e reserva a consulta do CNPJ
+        Retorna (resposta, False) quando já existe resposta, (None, True) quando
+        a reserva foi obtida e (None, False) quando outro processo tem a reserva
+        """
+        agora = now()
+        expiracao = agora - timedelta(
+            seconds=settings.CNPJA_CONNECT_TIMEOUT + settings.CNPJA_TIMEOUT)
+
+        try:
+            with transaction.atomic():
+                if connection.vendor == 'postgresql':
+                    # Serializa a reserva entre processos; liberado no commit
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            'SELECT pg_advisory_xact_lock(%s)',
+                            [zlib.crc32(f'cnpja:{tax_id}'.encode())]
+                        )
+
+                resposta = CnpjaUtils._do_cache(tax_id, desde)
+                if resposta is not None:
+                    return resposta, False
+
+                consultas = ConsultaCNPJ.objects.filter(tax_id=tax_id)
+                if consultas.filter(reservado_em__gte=expiracao).exists():
+                    return None, False
+
+                # update() não altera consultado_em (auto_now)
+                if not consultas.update(reservado_em=agora):
+                    ConsultaCNPJ.objects.create(
+                        tax_id=tax_id, resposta=None, reservado_em=agora)
+                return None, True
+
+        except IntegrityError:
+            # Outro processo criou a reserva ao mesmo tempo (sem advisory lock)
+            return None, False
+
+    @staticmethod
+    def _consultar_api(tax_id):
+        url = f'{settings.CNPJA_API_URL}/office/{tax_id}'
+        headers = {
+            "Authorization": settings.CNPJA_API_TOKEN,
+            "Accept": "application/json"
+        }
+
+        try:
+            response = CnpjaUtils._get_sessao().get(
+                url, headers=headers,
+                timeout=(settings.CNPJA_CONNECT_TIMEOUT, settings.CNPJA_TIMEOUT))
+        except requests.Timeout:
+            raise CnpjaError("Tempo esgotado ao consultar a API externa.", 504)
+
+        if response.status_code != 200:
+            raise CnpjaError(
+                "Erro ao buscar dados na API externa.", response.status_code)
+
+        return response.json()
+
+    @staticmethod
+    def _get_sessao():
+        """Sessão HTTP compartilhada, reaproveitando as conexões com a API"""
+        if CnpjaUtils._sessao is None:
+            with CnpjaUtils._lock:
+                if CnpjaUtils._sessao is None:
+                    sessao = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=settings.CNPJA_IMPORT_WORKERS
+                    )
+                    sessao.mount('http://', adapter)
+                    sessao.mount('https://', adapter)
+                    CnpjaUtils._sessao = sessao
+        return CnpjaUtils._sessao
+
+    @staticmethod
+    async def abuscar(documento):
+        """
+        Versão assíncrona de buscar, para as views servidas pelo ASGI
+        A espera pela API não ocupa uma thread: o mesmo worker atende várias
+        consultas ao mesmo tempo. Consultas simultâneas do mesmo CNPJ no
+        mesmo event loop compartilham uma única chamada à API
+        """
+        tax_id = CnpjaUtils.normalizar(documento)
+
+        resposta = await CnpjaUtils._ado_cache(tax_id)
+        if resposta is not None:
+            return resposta
+
+        chave = (asyncio.get_running_loop(), tax_id)
+        tarefa = CnpjaUtils._em_andamento_async.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(
+                CnpjaUtils._aconsultar_e_salvar(tax_id))
+            CnpjaUtils._em_andamento_async[chave] = tarefa
+            tarefa.add_done_callback(
+                lambda _: CnpjaUtils._em_andamento_async.pop(chave, None))
+
+        # shield: o cancelamento de uma requisição não cancela as demais
+        return await asyncio.shield(tarefa)
+
+    @staticmethod
+    async def _ado_cache(tax_id):
+        validade = now() - timedelta(seconds=settings.CNPJA_CACHE_TTL)
+        return await ConsultaCNPJ.objects.filter(
+            tax_id=tax_id,
+            consultado_em__gte=validade
+        ).values_list('resposta', flat=True).afirst()
+
+    @staticmethod
+    async def _aconsultar_e_salvar(tax_id):
+        resposta = await CnpjaUtils._aconsultar_api(tax_id)
+
+        await ConsultaCNPJ.objects.aupdate_or_create(
+            tax_id=tax_id,
+            defaults={'resposta': resposta}
+        )
+
+        return resposta
+
+    @staticmethod
+    async def _aconsultar_api(tax_id):
+        try:
+            response = await CnpjaUtils._get_cliente_async().get(
+                f'/office/{tax_id}')
+        except httpx.TimeoutException:
+            raise CnpjaError("Tempo esgotado ao consultar a API externa.", 504)
+        except httpx.HTTPError:
+            raise CnpjaError("Erro ao buscar dados na API externa.", 502)
+
+        if response.status_code != 200:
+            raise CnpjaError(
+                "Erro ao buscar dados na API externa.", response.status_code)
+
+        return response.json()
+
+    @staticmethod
+    def _get_cliente_async():
+        """
+        Cliente HTTP assíncrono compartilhado pelas requisições do event loop,
+        com tempos limite separados para conexão e leitura
+        """
+        loop = asyncio.get_running_loop()
+        cliente = CnpjaUtils._clientes_async.get(loop)
+        if cliente is None:
+            cliente = CnpjaUtils._clientes_async[loop] = httpx.AsyncClient(
+                base_url=settings.CNPJA_API_URL,
+                headers={
+                    "Authorization": settings.CNPJA_API_TOKEN or '',
+                    "Accept": "application/json"
+                },
+                timeout=httpx.Timeout(
+                    settings.CNPJA_TIMEOUT,
+                    connect=settings.CNPJA_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.CNPJA_ASYNC_MAX_CONEXOES)
+            )
+        return cliente
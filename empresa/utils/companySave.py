@@ -1,10 +1,20 @@
+from collections import defaultdict
 from decimal import Decimal
 from django.db import transaction
+from django.utils import timezone
 from empresa.models import Empresa, Socio, Atividade
 from datetime import datetime
 
+from app.utils.alteracoes_utils import AlteracoesBuffer
+
 
 class CompanySave:
+    # Campos dos filhos comparados no resync (a chave identifica o registro)
+    CHAVE_SOCIO = ('nome', 'cpf')
+    CAMPOS_SOCIO = ('funcao', 'data_entrada', 'faixa_etaria')
+    CHAVE_ATIVIDADE = ('descricao',)
+    CAMPOS_ATIVIDADE = ('principal',)
+
     def __init__(self, responseApi, requestData, user):
         self.requestData = requestData
         self.responseApi = responseApi
@@ -17,13 +27,33 @@ class CompanySave:
             self._salvar_atividades(empresa)
             return empresa
 
-    def _salvar_empresa(self):
+    def resync(self, empresa):
+        """
+        Atualiza uma empresa existente com a resposta da API, gravando somente
+        os campos e os sócios/atividades que mudaram
+        Sem diferenças, nenhuma escrita é feita no banco
+        """
+        with transaction.atomic():
+            self._sincronizar_empresa(empresa)
+
+            self._sincronizar_filhos(
+                Socio, empresa.socios.all(), self._montar_socios(empresa),
+                self.CHAVE_SOCIO, self.CAMPOS_SOCIO)
+
+            self._sincronizar_filhos(
+                Atividade, empresa.atividades.all(), self._montar_atividades(empresa),
+                self.CHAVE_ATIVIDADE, self.CAMPOS_ATIVIDADE)
+
+            return empresa
+
+    def _dados_empresa(self):
         # Converte equity para Decimal
         equity = self.responseApi.get('company', {}).get('equity')
         if equity is not None:
             try:
-                capital_social = Decimal(str(equity))
-            except (ValueError, TypeError):
+                # Mesma precisão do banco, para o resync comparar corretamente
+                capital_social = Decimal(str(equity)).quantize(Decimal('0.01'))
+            except (ValueError, TypeError, ArithmeticError):
                 capital_social = None
         else:
             capital_social = None
@@ -38,63 +68,154 @@ class CompanySave:
                     return default
             return current
 
+        # Dados da empresa com base na API CNPJ
+        return {
+            'documento': get_nested(self.responseApi, ['taxId'], ''),
+            'nome': get_nested(self.responseApi, ['company', 'name'], ''),
+            'nome_fantasia': get_nested(self.responseApi, ['alias']),
+            'data_abertura': self._parse_date(
+                get_nested(self.responseApi, ['founded'])),
+            'matriz': get_nested(self.responseApi, ['head'], False),
+            'status': get_nested(self.responseApi, ['status', 'text'], ''),
+            'capital_social': capital_social,
+            'atividade_principal': get_nested(
+                self.responseApi, ['mainActivity', 'text']),
+            'atividades_secundarias': ", ".join(
+                [activity.get('text', '') for activity in self.responseApi.get('sideActivities', [])]),
+            'porte': get_nested(self.responseApi, [
+                'company', 'size', 'text'], ''),  # Corrigido aqui
+            'logradouro': get_nested(self.responseApi, ['address', 'street']),
+            'numero': get_nested(self.responseApi, ['address', 'number']),
+            'complemento': get_nested(self.responseApi, ['address', 'details']),
+            'bairro': get_nested(self.responseApi, ['address', 'district']),
+            'cidade': get_nested(self.responseApi, ['address', 'city']),
+            'estado': get_nested(self.responseApi, ['address', 'state']),
+            'cep': get_nested(self.responseApi, ['address', 'zip']),
+            'pais': get_nested(self.responseApi, ['address', 'country', 'name']),
+            'telefone': self._get_phone(),
+            'email': self._get_email(),
+        }
+
+    def _salvar_empresa(self):
         # Salvando empresa com dados da API CNPJ
         return Empresa.objects.create(
             user=self.user,
             tipo_documento='PJ',
-            documento=get_nested(self.responseApi, ['taxId'], ''),
-            nome=get_nested(self.responseApi, ['company', 'name'], ''),
-            nome_fantasia=get_nested(self.responseApi, ['alias']),
-            data_abertura=get_nested(self.responseApi, ['founded']),
-            matriz=get_nested(self.responseApi, ['head'], False),
-            status=get_nested(self.responseApi, ['status', 'text'], ''),
-            capital_social=capital_social,
-            atividade_principal=get_nested(
-                self.responseApi, ['mainActivity', 'text']),
-            atividades_secundarias=", ".join(
-                [activity.get('text', '') for activity in self.responseApi.get('sideActivities', [])]),
-            porte=get_nested(self.responseApi, [
-                             'company', 'size', 'text'], ''),  # Corrigido aqui
-            logradouro=get_nested(self.responseApi, ['address', 'street']),
-            numero=get_nested(self.responseApi, ['address', 'number']),
-            complemento=get_nested(self.responseApi, ['address', 'details']),
-            bairro=get_nested(self.responseApi, ['address', 'district']),
-            cidade=get_nested(self.responseApi, ['address', 'city']),
-            estado=get_nested(self.responseApi, ['address', 'state']),
-            cep=get_nested(self.responseApi, ['address', 'zip']),
-            pais=get_nested(self.responseApi, ['address', 'country', 'name']),
-            telefone=self._get_phone(),
-            email=self._get_email(),
+            **self._dados_empresa()
         )
 
-    def _salvar_socios(self, empresa):
+    def _sincronizar_empresa(self, empresa):
+        dados = self._dados_empresa()
+        dados.pop('documento')  # O documento não é alterado
+
+        alterados = []
+        for campo, valor in dados.items():
+            if getattr(empresa, campo) != valor:
+                setattr(empresa, campo, valor)
+                alterados.append(campo)
+
+        if alterados:
+            empresa.save(update_fields=alterados)
+
+    def _sincronizar_filhos(self, model, atuais, novos, chave, campos):
+        """
+        Compara os registros atuais com os da API pela chave:
+        - novos são inseridos em lote
+        - os que sumiram são excluídos em um único DELETE
+        - os que mudaram são atualizados em lote, somente nos campos alterados
+        """
+        def chave_de(obj):
+            return tuple(getattr(obj, campo) for campo in chave)
+
+        # Agrupa por chave para tratar registros repetidos
+        existentes = defaultdict(list)
+        for obj in atuais:
+            existentes[chave_de(obj)].append(obj)
+
+        inserir = []
+        atualizar = []
+        campos_alterados = set()
+
+        for novo in novos:
+            candidatos = existentes.get(chave_de(novo))
+            if not candidatos:
+                inserir.append(novo)
+                continue
+
+            atual = candidatos.pop(0)
+            alterado = False
+            for campo in campos:
+                valor = getattr(novo, campo)
+                if getattr(atual, campo) != valor:
+                    setattr(atual, campo, valor)
+                    campos_alterados.add(campo)
+                    alterado = True
+
+            if alterado:
+                atualizar.append(atual)
+
+        excluir = [obj.id for restantes in existentes.values()
+                   for obj in restantes]
+
+        if excluir:
+            model.objects.filter(id__in=excluir).delete()
+        if atualizar:
+            # bulk_update não aplica o auto_now
+            agora = timezone.now()
+            for obj in atualizar:
+                obj.atualizado_em = agora
+            model.objects.bulk_update(
+                atualizar, [*sorted(campos_alterados), 'atualizado_em'])
+        if inserir:
+            model.objects.bulk_create(inserir)
+
+        # bulk_update/bulk_create não disparam signals: uma única notificação
+        AlteracoesBuffer.registrar_objetos(
+            [*atualizar, *inserir], AlteracoesBuffer.SALVO)
+
+    def _montar_socios(self, empresa):
         membros = self.responseApi.get('company', {}).get('members', [])
+        socios = []
         for membro in membros:
             pessoa = membro.get('person', {})
-            Socio.objects.create(
+            socios.append(Socio(
                 empresa=empresa,
                 nome=pessoa.get('name'),
                 cpf=pessoa.get('taxId', '').replace('*', ''),
                 funcao=membro.get('role', {}).get('text'),
                 data_entrada=self._parse_date(membro.get('since')),
                 faixa_etaria=pessoa.get('age')
-            )
+            ))
+        return socios
+
+    def _salvar_socios(self, empresa):
+        socios = Socio.objects.bulk_create(self._montar_socios(empresa))
+        AlteracoesBuffer.registrar_objetos(socios, AlteracoesBuffer.SALVO)
+
+    def _montar_atividades(self, empresa):
+        atividades = []
 
-    def _salvar_atividades(self, empresa):
         main_activity = self.responseApi.get('mainActivity')
         if main_activity:
-            Atividade.objects.create(
+            atividades.append(Atividade(
                 empresa=empresa,
                 descricao=main_activity.get('text', ''),
                 principal=True
-            )
+            ))
 
         for sec in self.responseApi.get('sideActivities', []):
-            Atividade.objects.create(
+            atividades.append(Atividade(
                 empresa=empresa,
                 descricao=sec.get('text', ''),
                 principal=False
-            )
+            ))
+
+        return atividades
+
+    def _salvar_atividades(self, empresa):
+        atividades = Atividade.objects.bulk_create(
+            self._montar_atividades(empresa))
+        AlteracoesBuffer.registrar_objetos(atividades, AlteracoesBuffer.SALVO)
 
     def _parse_date(self, value):
         if value:
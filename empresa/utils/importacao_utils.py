@@ -0,0 +1,89 @@
+# utils/importacao_utils.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import IntegrityError, connections
+
+from app.utils.exceptions import ValidationError
+from app.utils.validate_document import validate_cpf_cnpj
+from empresa.models import Empresa
+from empresa.utils.cnpja_utils import CnpjaUtils, LimitadorTaxa
+from empresa.utils.companySave import CompanySave
+
+
+class ImportacaoCnpj:
+    """
+    Cadastra várias empresas (PJ) a partir de uma lista de CNPJs
+    As consultas à API são feitas em paralelo, com limite de threads e de
+    chamadas por segundo, e a gravação segue pelo CompanySave
+    """
+
+    def __init__(self, user, workers=None, por_segundo=None):
+        self.user = user
+        self.workers = workers or settings.CNPJA_IMPORT_WORKERS
+        self.limitador = LimitadorTaxa(
+            por_segundo if por_segundo is not None else settings.CNPJA_IMPORT_POR_SEGUNDO)
+
+    def importar(self, documentos):
+        """Retorna o resultado de cada documento, na ordem recebida"""
+        resultados = []
+        pendentes = {}
+
+        for documento in documentos:
+            resultado = {'documento': documento}
+            resultados.append(resultado)
+
+            tax_id = CnpjaUtils.normalizar(str(documento))
+            try:
+                validate_cpf_cnpj(tax_id)
+                if len(tax_id) != 14:
+                    raise ValidationError("Somente CNPJ pode ser importado.")
+            except ValidationError as e:
+                resultado.update(status='invalido', mensagem=str(e.detail))
+                continue
+
+            if tax_id in pendentes:
+                resultado.update(status='duplicado',
+                                 mensagem="Documento repetido na lista.")
+                continue
+
+            pendentes[tax_id] = resultado
+
+        # Uma única consulta para descobrir os CNPJs já cadastrados
+        existentes = set(Empresa.objects.filter(
+            documento_normalizado__in=list(pendentes)
+        ).values_list('documento_normalizado', flat=True))
+
+        for tax_id in existentes:
+            pendentes.pop(tax_id).update(
+                status='existente', mensagem="Empresa já cadastrada.")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            consultas = {
+                executor.submit(self._consultar, tax_id): tax_id
+                for tax_id in pendentes
+            }
+
+            # Grava conforme as consultas terminam
+            for consulta in as_completed(consultas):
+                tax_id = consultas[consulta]
+                self._salvar(pendentes[tax_id], consulta)
+
+        return resultados
+
+    def _consultar(self, tax_id):
+        try:
+            return CnpjaUtils.buscar(tax_id, self.limitador)
+        finally:
+            # Cada thread abre a sua própria conexão com o banco
+            connections.close_all()
+
+    def _salvar(self, resultado, consulta):
+        try:
+            empresa = CompanySave(consulta.result(), {}, self.user).processar()
+            resultado.update(status='criada', id=empresa.id)
+        except IntegrityError:
+            resultado.update(status='existente',
+                             mensagem="Empresa já cadastrada.")
+        except Exception as e:
+            resultado.update(status='erro', mensagem=str(e))
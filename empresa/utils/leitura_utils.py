@@ -0,0 +1,73 @@
+# utils/leitura_utils.py
+from accounts.models import User
+from accounts.serializers import UserModelSerializer
+from app.utils.leitura_rapida import LeituraRapida
+from empresa.models import Socio, Atividade
+from empresa.serializers import (
+    AtividadeModelSerializer, EmpresaSerializerModelSerializer, SocioModelSerializer
+)
+from empresa.utils.campos_utils import CamposUtils
+
+
+class EmpresaLeitura:
+    """
+    Leitura rápida da listagem de empresas: mesma saída do
+    EmpresaSerializerModelSerializer (com ?fields= e ?include=), montada
+    a partir de .values() com uma consulta por relacionamento incluído
+    """
+
+    @staticmethod
+    def _leitura(campos, includes):
+        return LeituraRapida.para(
+            EmpresaSerializerModelSerializer,
+            context={'campos': campos, 'includes': includes},
+            externos=CamposUtils.RELACIONAMENTOS
+        )
+
+    @staticmethod
+    def colunas(campos, includes):
+        """Colunas do .values() das empresas"""
+        colunas = list(EmpresaLeitura._leitura(campos, includes).colunas)
+        if 'user' in includes:
+            colunas.append('user_id')
+        return colunas
+
+    @staticmethod
+    def representar(linhas, campos, includes):
+        leitura = EmpresaLeitura._leitura(campos, includes)
+        ids = [linha['id'] for linha in linhas]
+
+        externos = {}
+        if 'user' in includes:
+            usuarios = {
+                user.id: UserModelSerializer(user).data
+                for user in User.objects.filter(id__in={linha['user_id'] for linha in linhas})
+            }
+            externos['user'] = lambda linha: usuarios[linha['user_id']]
+
+        if 'socios' in includes:
+            socios = EmpresaLeitura._filhos(Socio, SocioModelSerializer, ids)
+            externos['socios'] = lambda linha: socios.get(linha['id'], [])
+
+        if 'atividades' in includes:
+            atividades = EmpresaLeitura._filhos(Atividade, AtividadeModelSerializer, ids)
+            externos['atividades'] = lambda linha: atividades.get(linha['id'], [])
+
+        return leitura.representar(linhas, externos)
+
+    @staticmethod
+    def _filhos(model, serializer_class, empresas_ids):
+        """Filhos das empresas em uma consulta, agrupados: {empresa_id: [...]}"""
+        if not empresas_ids:
+            return {}
+
+        leitura = LeituraRapida.para(serializer_class)
+        # Mesma ordem do prefetch de CamposUtils.otimizar_queryset
+        linhas = list(model.objects.filter(
+            empresa_id__in=empresas_ids
+        ).order_by('id').values(*leitura.colunas))
+
+        agrupados = {}
+        for linha, item in zip(linhas, leitura.representar(linhas)):
+            agrupados.setdefault(linha['empresa_id'], []).append(item)
+        return agrupados
@@ -0,0 +1,40 @@
+# utils/versao_utils.py
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from empresa.models import Empresa, Socio, Atividade
+
+
+class VersaoUtils:
+    @staticmethod
+    def _resumo(model, campo):
+        # Subconsulta por empresa: usa o índice (empresa, id) dos filhos
+        return Subquery(
+            model.objects.filter(empresa=OuterRef('pk'))
+            .order_by()
+            .values('empresa')
+            .annotate(resumo=campo)
+            .values('resumo')
+        )
+
+    @staticmethod
+    def empresa(documento_normalizado):
+        """
+        Versão da empresa e de tudo o que o detalhe retorna (usuário, sócios e
+        atividades) em uma única consulta, sem carregar os registros
+        A quantidade de filhos identifica exclusões; a maior data, alterações
+        Retorna None quando a empresa não existe
+        """
+        return Empresa.objects.filter(
+            documento_normalizado=documento_normalizado
+        ).annotate(
+            socios_alterados=VersaoUtils._resumo(Socio, Max('atualizado_em')),
+            socios_total=VersaoUtils._resumo(Socio, Count('id')),
+            atividades_alteradas=VersaoUtils._resumo(Atividade, Max('atualizado_em')),
+            atividades_total=VersaoUtils._resumo(Atividade, Count('id')),
+        ).values_list(
+            'id', 'atualizado_em',
+            'socios_alterados', 'socios_total',
+            'atividades_alteradas', 'atividades_total',
+            'user__name', 'user__email', 'user__avatar', 'user__avatar_hash',
+            'user__last_access',
+        ).first()
@@ -1,24 +1,61 @@
-import requests
+from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.conf import settings
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 
 from .models import Empresa, Socio, Atividade
 from .utils.atividade_utils import AtividadeUtils
+from .utils.campos_utils import CamposUtils
+from .utils.cnpja_utils import CnpjaUtils, CnpjaError
 from .utils.companySave import CompanySave
-from .serializers import EmpresaSerializerModelSerializer, EmpresaUpdateModelSerializer, AtividadeModelSerializer, SocioModelSerializer
+from .utils.importacao_utils import ImportacaoCnpj
+from .utils.leitura_utils import EmpresaLeitura
+from .utils.versao_utils import VersaoUtils
+from .serializers import EmpresaSerializerModelSerializer, EmpresaUpdateModelSerializer, AtividadeModelSerializer, SocioModelSerializer, AtividadeLoteSerializer
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from app.utils.async_utils import AsyncUtils
+from app.utils.etag_utils import ETagUtils
 from app.utils.exceptions import ValidationError
+from app.utils.pagination import CursorPagination
+from app.utils.validate_document import normalize_document
 
 
 class EmpresaAPIView(APIView):
     def get(self, request):
-        empresas = Empresa.objects.filter(user_id=request.user.id)
-        serializer = EmpresaSerializerModelSerializer(empresas, many=True)
-        return Response(serializer.data)
+        campos = CamposUtils.parse_campos(request)
+        includes = CamposUtils.parse_includes(request)
+
+        paginator = CursorPagination()
+
+        if settings.LEITURA_RAPIDA:
+            # Leitura rápida: .values() e conversores pré-compilados do serializer
+            pagina = paginator.paginate_queryset(
+                Empresa.objects.filter(user_id=request.user.id).values(
+                    *EmpresaLeitura.colunas(campos, includes)),
+                request, view=self
+            )
+            return paginator.get_paginated_response(
+                EmpresaLeitura.representar(pagina, campos, includes))
+
+        empresas = CamposUtils.otimizar_queryset(
+            Empresa.objects.filter(user_id=request.user.id), campos, includes)
+        pagina = paginator.paginate_queryset(empresas, request, view=self)
+
+        serializer = EmpresaSerializerModelSerializer(
+            pagina,
+            many=True,
+            context={'campos': campos, 'includes': includes}
+        )
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         documento = request.data.get('documento')
@@ -31,23 +68,10 @@ class EmpresaAPIView(APIView):
         if not tipo_documento:
             raise ValidationError("Tipo de documento é obrigatório")
 
-        # Quando for PJ, busca dados da API
+        # Quando for PJ, busca dados da API (ou do cache de consultas)
         if tipo_documento == 'PJ':
-            url = f'https://api.cnpja.com/office/{documento}'
-            headers = {
-                "Authorization": settings.CNPJA_API_TOKEN,
-                "Accept": "application/json"
-            }
-
             try:
-                response = requests.get(url, headers=headers)
-                if response.status_code != 200:
-                    return Response(
-                        {"erro": "Erro ao buscar dados na API externa."},
-                        status=response.status_code
-                    )
-
-                data_cnpja = response.json()
+                data_cnpja = CnpjaUtils.buscar(documento)
 
                 # Preenche os dados com a API
                 empresa = CompanySave(
@@ -58,6 +82,9 @@ class EmpresaAPIView(APIView):
                     status=status.HTTP_201_CREATED
                 )
 
+            except CnpjaError as e:
+                return Response({"erro": str(e)}, status=e.status_code)
+
             except Exception as e:
                 return Response(
                     {"erro": f"Erro ao processar dados da API: {str(e)}"},
@@ -85,9 +112,148 @@ class EmpresaAPIView(APIView):
         )
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncEmpresaAPIView(View):
+    """
+    EmpresaAPIView para o servidor ASGI
+    O cadastro de PJ consulta a API CNPJA sem bloquear o worker e grava
+    com o CompanySave em uma thread; as demais operações usam a view síncrona
+    """
+    view_sync = staticmethod(EmpresaAPIView.as_view())
+
+    async def get(self, request):
+        return await sync_to_async(self.view_sync)(request)
+
+    async def post(self, request):
+        # Somente o corpo JSON de PJ segue pelo fluxo assíncrono
+        if request.content_type != 'application/json':
+            return await sync_to_async(self.view_sync)(request)
+
+        dados = AsyncUtils.dados_requisicao(request)
+        if dados.get('tipo_documento') != 'PJ':
+            return await sync_to_async(self.view_sync)(request)
+
+        try:
+            user = await AsyncUtils.autenticar(request)
+
+            if not dados.get('documento'):
+                raise ValidationError("Documento é obrigatório.")
+        except APIException as e:
+            return AsyncUtils.resposta_erro(e)
+
+        try:
+            data_cnpja = await CnpjaUtils.abuscar(dados['documento'])
+
+            empresa = await sync_to_async(self._salvar)(data_cnpja, dados, user)
+
+            return AsyncUtils.resposta(empresa, status=status.HTTP_201_CREATED)
+
+        except CnpjaError as e:
+            return AsyncUtils.resposta({"erro": str(e)}, status=e.status_code)
+
+        except Exception as e:
+            return AsyncUtils.resposta(
+                {"erro": f"Erro ao processar dados da API: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @staticmethod
+    def _salvar(data_cnpja, dados, user):
+        # Gravação e serialização (consultas ao banco) fora do event loop
+        empresa = CompanySave(data_cnpja, dados, user).processar()
+        return EmpresaSerializerModelSerializer(empresa).data
+
+
+class EmpresaImportacaoAPIView(APIView):
+    def post(self, request):
+        """
+        Importa várias empresas (PJ) de uma vez
+        Body: {"documentos": ["00.000.000/0001-00", ...]}
+        """
+        documentos = request.data.get('documentos')
+
+        if not isinstance(documentos, list) or not documentos:
+            raise ValidationError("Informe a lista de documentos.")
+
+        if len(documentos) > settings.CNPJA_IMPORT_MAXIMO:
+            raise ValidationError(
+                f"Máximo de {settings.CNPJA_IMPORT_MAXIMO} documentos por importação.")
+
+        resultados = ImportacaoCnpj(request.user).importar(documentos)
+
+        return Response({"resultados": resultados})
+
+
+class EmpresaSincronizarAPIView(APIView):
+    def post(self, request, documento):
+        """Atualiza a empresa (PJ) com os dados atuais da API CNPJA"""
+        try:
+            empresa = Empresa.objects.get(
+                documento_normalizado=normalize_document(documento),
+                user=request.user,
+                tipo_documento='PJ'
+            )
+        except Empresa.DoesNotExist:
+            raise ValidationError("Empresa não encontrada")
+
+        try:
+            data_cnpja = CnpjaUtils.buscar(empresa.documento, atualizar=True)
+        except CnpjaError as e:
+            return Response({"erro": str(e)}, status=e.status_code)
+
+        empresa = CompanySave(data_cnpja, request.data,
+                              request.user).resync(empresa)
+
+        return Response(EmpresaSerializerModelSerializer(empresa).data)
+
+
 class EmpresaRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Empresa.objects.all()
-    lookup_field = 'documento'  # Para usar CNPJ/CPF em vez de ID
+    # Usa o CNPJ/CPF (formatado ou não) em vez do ID
+    lookup_field = 'documento_normalizado'
+    lookup_url_kwarg = 'documento'
+
+    def get_object(self):
+        self.kwargs['documento'] = normalize_document(self.kwargs['documento'])
+        return super().get_object()
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        GET condicional: a ETag vem da versão da empresa (datas de alteração e
+        totais dos filhos) e uma ETag igual responde 304 sem serializar
+        """
+        versao = VersaoUtils.empresa(normalize_document(self.kwargs['documento']))
+        if versao is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        # A URL inclui ?fields= e ?include=, que mudam o conteúdo
+        etag = ETagUtils.gerar(*versao, request.get_full_path())
+        if ETagUtils.confere(request, etag):
+            return ETagUtils.nao_modificado(etag)
+
+        response = super().retrieve(request, *args, **kwargs)
+        return ETagUtils.aplicar(response, etag)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.request.method == 'GET':
+            queryset = CamposUtils.otimizar_queryset(
+                queryset,
+                CamposUtils.parse_campos(self.request),
+                CamposUtils.parse_includes(self.request)
+            )
+
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+
+        if self.request.method == 'GET':
+            context['campos'] = CamposUtils.parse_campos(self.request)
+            context['includes'] = CamposUtils.parse_includes(self.request)
+
+        return context
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -101,7 +267,7 @@ class AtividadeListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         documento = self.kwargs['documento']
         return Atividade.objects.filter(
-            empresa__documento=documento,
+            empresa__documento_normalizado=normalize_document(documento),
             empresa__user=self.request.user
         ).order_by('-id')
 
@@ -109,18 +275,18 @@ class AtividadeListCreateAPIView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         documento = self.kwargs['documento']
         try:
-            empresa = Empresa.objects.get(
-                documento=documento,
+            # Busca e bloqueia a empresa na mesma consulta
+            empresa = Empresa.objects.select_for_update().get(
+                documento_normalizado=normalize_document(documento),
                 user=self.request.user
             )
 
             atividade = serializer.save(empresa=empresa)
 
-            if atividade.principal:
-                AtividadeUtils.atualizar_atividade_principal(
-                    empresa, atividade)
-            else:
-                AtividadeUtils.atualizar_atividades_secundarias(empresa)
+            AtividadeUtils.recalcular(
+                empresa,
+                nova_principal=atividade if atividade.principal else None
+            )
 
         except Empresa.DoesNotExist:
             raise ValidationError("Empresa não encontrada")
@@ -132,60 +298,118 @@ class AtividadeRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIVie
     def get_queryset(self):
         documento = self.kwargs['documento']
         return Atividade.objects.filter(
-            empresa__documento=documento,
+            empresa__documento_normalizado=normalize_document(documento),
             empresa__user=self.request.user
         )
 
     @transaction.atomic
     def perform_update(self, serializer):
-        atividade = self.get_object()
+        atividade = serializer.instance
         old_principal = atividade.principal
-        empresa = atividade.empresa
 
-        updated_atividade = serializer.save()
-
-        if updated_atividade.principal or (old_principal and updated_atividade.principal):
-            AtividadeUtils.atualizar_atividade_principal(
-                empresa, updated_atividade)
-        else:
-            AtividadeUtils.atualizar_atividades_secundarias(empresa)
-
-        if old_principal and not updated_atividade.principal:
-            nova_principal = Atividade.objects.filter(
-                empresa=empresa,
-                principal=True
-            ).first()
+        empresa = AtividadeUtils.bloquear_empresa(atividade.empresa_id)
 
-            if nova_principal:
-                empresa.atividade_principal = nova_principal.descricao
-            else:
-                empresa.atividade_principal = None
+        updated_atividade = serializer.save()
 
-            empresa.save()
-            AtividadeUtils.atualizar_atividades_secundarias(empresa)
+        AtividadeUtils.recalcular(
+            empresa,
+            nova_principal=updated_atividade if updated_atividade.principal else None,
+            principal_removida=old_principal and not updated_atividade.principal
+        )
 
     @transaction.atomic
     def perform_destroy(self, instance):
-        empresa = instance.empresa
         was_principal = instance.principal
 
+        empresa = AtividadeUtils.bloquear_empresa(instance.empresa_id)
+
         instance.delete()
 
-        if was_principal:
-            nova_principal = Atividade.objects.filter(
-                empresa=empresa,
-                principal=True
-            ).first()
+        AtividadeUtils.recalcular(empresa, principal_removida=was_principal)
 
-            if nova_principal:
-                empresa.atividade_principal = nova_principal.descricao
-            else:
-                empresa.atividade_principal = None
 
-            AtividadeUtils.atualizar_atividades_secundarias(empresa)
-            empresa.save()
-        else:
-            AtividadeUtils.atualizar_atividades_secundarias(empresa)
+class AtividadeLoteAPIView(APIView):
+    @transaction.atomic
+    def post(self, request, documento):
+        """
+        Cria, atualiza e exclui várias atividades em uma única transação,
+        recalculando os campos da empresa uma única vez no final
+        """
+        serializer = AtividadeLoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"erro": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            empresa = Empresa.objects.select_for_update().get(
+                documento_normalizado=normalize_document(documento),
+                user=request.user
+            )
+        except Empresa.DoesNotExist:
+            raise ValidationError("Empresa não encontrada")
+
+        criar = serializer.validated_data.get('criar', [])
+        atualizar = serializer.validated_data.get('atualizar', [])
+        excluir = serializer.validated_data.get('excluir', [])
+
+        # Atividades atualizadas/excluídas em uma única consulta
+        ids = [item['id'] for item in atualizar] + excluir
+        atuais = Atividade.objects.filter(empresa=empresa, id__in=ids).in_bulk()
+
+        nao_encontradas = [id for id in ids if id not in atuais]
+        if nao_encontradas:
+            raise ValidationError(
+                f"Atividades não encontradas: {', '.join(map(str, nao_encontradas))}")
+
+        nova_principal = any(
+            item.get('principal') for item in [*criar, *atualizar])
+        principal_removida = nova_principal or any(
+            atuais[id].principal for id in excluir
+        ) or any(
+            atuais[item['id']].principal and item.get('principal') is False
+            for item in atualizar
+        )
+
+        if excluir:
+            Atividade.objects.filter(id__in=excluir).delete()
+
+        # A nova principal substitui a atual
+        if nova_principal:
+            Atividade.objects.filter(
+                empresa=empresa, principal=True).update(
+                    principal=False, atualizado_em=timezone.now())
+
+        if atualizar:
+            agora = timezone.now()
+            atividades = []
+            for item in atualizar:
+                atividade = atuais[item['id']]
+                atividade.descricao = item.get('descricao', atividade.descricao)
+                # Principais antigas já foram desmarcadas acima
+                atividade.principal = item.get(
+                    'principal', atividade.principal and not nova_principal)
+                # bulk_update não aplica o auto_now
+                atividade.atualizado_em = agora
+                atividades.append(atividade)
+
+            Atividade.objects.bulk_update(
+                atividades, ['descricao', 'principal', 'atualizado_em'])
+            AlteracoesBuffer.registrar_objetos(
+                atividades, AlteracoesBuffer.SALVO)
+
+        if criar:
+            criadas = Atividade.objects.bulk_create([
+                Atividade(empresa=empresa, **item) for item in criar
+            ])
+            AlteracoesBuffer.registrar_objetos(criadas, AlteracoesBuffer.SALVO)
+
+        AtividadeUtils.recalcular(
+            empresa, principal_removida=principal_removida)
+
+        atividades = Atividade.objects.filter(empresa=empresa).order_by('-id')
+        return Response(AtividadeModelSerializer(atividades, many=True).data)
 
 
 class SocioListCreateAPIView(generics.ListCreateAPIView):
@@ -194,7 +418,7 @@ class SocioListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         documento = self.kwargs['documento']
         return Socio.objects.filter(
-            empresa__documento=documento,
+            empresa__documento_normalizado=normalize_document(documento),
             empresa__user=self.request.user
         ).order_by('-id')
 
@@ -204,7 +428,7 @@ class SocioListCreateAPIView(generics.ListCreateAPIView):
         try:
             # Busca a Empresa pelo documento
             empresa = Empresa.objects.get(
-                documento=documento,
+                documento_normalizado=normalize_document(documento),
                 user=self.request.user
             )
 
@@ -216,5 +440,11 @@ class SocioListCreateAPIView(generics.ListCreateAPIView):
 
 
 class SocioRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Socio.objects.all()
     serializer_class = SocioModelSerializer
+
+    def get_queryset(self):
+        documento = self.kwargs['documento']
+        return Socio.objects.filter(
+            empresa__documento_normalizado=normalize_document(documento),
+            empresa__user=self.request.user
+        )
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FornecedoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fornecedores'
+
+    def ready(self):
+        # Registra os signals do texto de pesquisa e do feed de alterações
+        from fornecedores import signals  # noqa: F401
@@ -1,29 +1,33 @@
 import django_filters
 
-from django.db.models import Q
-
+from app.utils.validate_document import normalize_document
 from .models import Fornecedores
+from .utils.busca_utils import BuscaUtils
 
 
 class FornecedorFilter(django_filters.FilterSet):
     q = django_filters.CharFilter(method='filter_by_q', label="Pesquisar")
 
+    # Documento exato, formatado ou não (?documento=00.000.000/0001-00)
+    documento = django_filters.CharFilter(
+        method='filter_by_documento', label="CPF/CNPJ")
+
+    # Intervalos de datas (?data_criacao_after=2025-01-01&data_criacao_before=2025-01-31)
+    data_criacao = django_filters.DateFromToRangeFilter(
+        label="Data de Criação")
+    data_atualizacao = django_filters.DateFromToRangeFilter(
+        label="Data de Atualização")
+
     class Meta:
         model = Fornecedores
         fields = []
 
+    def filter_by_documento(self, queryset, name, value):
+        return queryset.filter(documento_normalizado=normalize_document(value))
+
     def filter_by_q(self, queryset, name, value):
         if not value:
             return queryset
 
-        # Filtra os campos com base no valor de 'q'
-        return queryset.filter(
-            Q(nome__icontains=value) |
-            Q(documento__icontains=value) |
-            Q(logradouro__icontains=value) |
-            Q(cidade__icontains=value) |
-            Q(empresa__documento__icontains=value) |
-            Q(empresa__nome__icontains=value) |
-            Q(data_criacao__icontains=value) |
-            Q(data_atualizacao__icontains=value)
-        )
+        # Pesquisa indexada em nome, documento, logradouro, cidade e empresa
+        return BuscaUtils.filtrar(queryset, value)
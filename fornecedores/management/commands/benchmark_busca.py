@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from fornecedores.models import Fornecedores
+from fornecedores.utils.busca_utils import BuscaUtils
+
+
+class Command(BaseCommand):
+    help = "Compara o tempo da pesquisa indexada de fornecedores com o filtro icontains antigo"
+
+    def add_arguments(self, parser):
+        parser.add_argument('termos', nargs='+', help="Termos pesquisados")
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--limite', type=int, default=50,
+                            help="Quantidade de linhas lidas por pesquisa (uma página)")
+
+    def handle(self, *args, **options):
+        for termo in options['termos']:
+            antigo = self._medir(
+                lambda: self._filtro_antigo(termo), options)
+            novo = self._medir(
+                lambda: BuscaUtils.filtrar(Fornecedores.objects.all(), termo), options)
+
+            self.stdout.write(
+                f"'{termo}': icontains {antigo:.2f} ms | indexada {novo:.2f} ms "
+                f"({antigo / novo if novo else 0:.1f}x)"
+            )
+
+    def _medir(self, montar_queryset, options):
+        inicio = time.perf_counter()
+        for _ in range(options['repeticoes']):
+            list(montar_queryset()[:options['limite']])
+        return (time.perf_counter() - inicio) * 1000 / options['repeticoes']
+
+    def _filtro_antigo(self, value):
+        # Filtro anterior do FornecedorFilter, mantido aqui como referência
+        return Fornecedores.objects.filter(
+            Q(nome__icontains=value) |
+            Q(documento__icontains=value) |
+            Q(logradouro__icontains=value) |
+            Q(cidade__icontains=value) |
+            Q(empresa__documento__icontains=value) |
+            Q(empresa__nome__icontains=value) |
+            Q(data_criacao__icontains=value) |
+            Q(data_atualizacao__icontains=value)
+        ).order_by('-id')
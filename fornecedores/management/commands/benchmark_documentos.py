@@ -0,0 +1,59 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.utils.validate_document import (
+    is_valid_cnpj, is_valid_cpf, validate_cpf_cnpj_batch
+)
+
+
+class Command(BaseCommand):
+    help = "Compara a validação de CPF/CNPJ um a um com a validação em lote (NumPy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+',
+                            default=[100, 1000, 10000, 100000])
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--semente', type=int, default=42)
+
+    def handle(self, *args, **options):
+        gerador = random.Random(options['semente'])
+
+        for tamanho in options['tamanhos']:
+            documentos = [self._documento(gerador) for _ in range(tamanho)]
+
+            # A igualdade dos resultados é coberta por app.tests.ValidacaoDocumentosTests
+            individual = self._medir(
+                lambda: [self._individual(d) for d in documentos], options)
+            lote = self._medir(
+                lambda: validate_cpf_cnpj_batch(documentos), options)
+
+            self.stdout.write(
+                f"{tamanho} documentos: individual {individual:.2f} ms | "
+                f"lote {lote:.2f} ms ({individual / lote if lote else 0:.1f}x)"
+            )
+
+    def _medir(self, executar, options):
+        inicio = time.perf_counter()
+        for _ in range(options['repeticoes']):
+            executar()
+        return (time.perf_counter() - inicio) * 1000 / options['repeticoes']
+
+    def _individual(self, documento):
+        # Mesmo fluxo de validate_cpf_cnpj
+        documento = re.sub(r"[^0-9]", "", documento)
+        if len(documento) == 11:
+            return is_valid_cpf(documento)
+        if len(documento) == 14:
+            return is_valid_cnpj(documento)
+        return False
+
+    def _documento(self, gerador):
+        # CPFs e CNPJs formatados com dígitos aleatórios (em sua maioria inválidos)
+        tamanho = gerador.choice((11, 14))
+        digitos = ''.join(gerador.choice('0123456789') for _ in range(tamanho))
+        if tamanho == 11:
+            return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+        return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:12]}-{digitos[12:]}"
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from empresa.models import Empresa
+from fornecedores.utils.importacao_utils import ImportacaoFornecedores
+
+
+class Command(BaseCommand):
+    help = "Importa fornecedores de um arquivo CSV para uma empresa"
+
+    def add_arguments(self, parser):
+        parser.add_argument('empresa', type=int, help="Id da empresa")
+        parser.add_argument('arquivo', help="Caminho do arquivo CSV")
+        parser.add_argument('--lote', type=int,
+                            help="Quantidade de linhas por lote")
+
+    def handle(self, *args, **options):
+        empresa = Empresa.objects.filter(id=options['empresa']).first()
+        if not empresa:
+            raise CommandError("Empresa não encontrada.")
+
+        with open(options['arquivo'], 'rb') as arquivo:
+            resultado = ImportacaoFornecedores(
+                empresa, tamanho_lote=options['lote']).importar(arquivo)
+
+        self.stdout.write(json.dumps(resultado, ensure_ascii=False, indent=2))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_indices_paginacao'),
+        ('fornecedores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fornecedores',
+            index=models.Index(fields=['empresa', 'id'], name='fornecedor_empresa_id_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+from fornecedores.utils.busca_utils import BuscaUtils
+
+
+def preencher_busca(apps, schema_editor):
+    """Monta o texto de pesquisa dos fornecedores já cadastrados"""
+    Fornecedores = apps.get_model('fornecedores', 'Fornecedores')
+
+    fornecedores = []
+    for fornecedor in Fornecedores.objects.select_related('empresa').iterator(chunk_size=2000):
+        fornecedor.busca = BuscaUtils.montar_busca(fornecedor)
+        fornecedores.append(fornecedor)
+
+    Fornecedores.objects.bulk_update(fornecedores, ['busca'], batch_size=2000)
+
+
+def criar_indices(apps, schema_editor):
+    # Índices GIN (trigram e full-text) existem somente no PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS fornecedor_busca_trgm_idx '
+        'ON fornecedores_fornecedores USING gin (busca gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS fornecedor_busca_fts_idx '
+        'ON fornecedores_fornecedores USING gin '
+        "(to_tsvector('simple'::regconfig, COALESCE(busca, '')))"
+    )
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS fornecedor_busca_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS fornecedor_busca_fts_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_indices_paginacao'),
+        ('fornecedores', '0002_fornecedores_empresa_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fornecedores',
+            name='busca',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
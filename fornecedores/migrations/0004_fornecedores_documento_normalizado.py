@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+from app.utils.validate_document import normalize_document
+
+
+def preencher_documento_normalizado(apps, schema_editor):
+    """Preenche o documento só com dígitos dos fornecedores já cadastrados"""
+    Fornecedores = apps.get_model('fornecedores', 'Fornecedores')
+
+    fornecedores = []
+    vistos = {}
+    for fornecedor in Fornecedores.objects.only('id', 'documento').iterator(chunk_size=2000):
+        fornecedor.documento_normalizado = normalize_document(fornecedor.documento)
+
+        # O índice único não pode ser criado com documentos repetidos
+        if fornecedor.documento_normalizado in vistos:
+            raise RuntimeError(
+                f"Fornecedores {vistos[fornecedor.documento_normalizado]} e {fornecedor.id} "
+                f"têm o mesmo documento ({fornecedor.documento_normalizado}).")
+        vistos[fornecedor.documento_normalizado] = fornecedor.id
+
+        fornecedores.append(fornecedor)
+
+    Fornecedores.objects.bulk_update(
+        fornecedores, ['documento_normalizado'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fornecedores', '0003_fornecedores_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fornecedores',
+            name='documento_normalizado',
+            field=models.CharField(editable=False, max_length=14, null=True),
+        ),
+        migrations.RunPython(preencher_documento_normalizado,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='fornecedores',
+            name='documento_normalizado',
+            field=models.CharField(editable=False, max_length=14, null=True, unique=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 
+from app.utils.validate_document import normalize_document
 from empresa.models import Empresa
+from fornecedores.utils.busca_utils import BuscaUtils
 
 
 class Fornecedores(models.Model):
@@ -10,6 +12,9 @@ class Fornecedores(models.Model):
     nome = models.CharField(max_length=255, verbose_name="Nome")
     documento = models.CharField(
         max_length=20, unique=True, verbose_name="CPF/CNPJ")
+    # Somente dígitos, usado em todas as buscas por documento
+    documento_normalizado = models.CharField(
+        max_length=14, unique=True, null=True, editable=False)
 
     # Endereço
     logradouro = models.CharField(max_length=255, verbose_name="Rua/Avenida")
@@ -33,5 +38,29 @@ class Fornecedores(models.Model):
     data_atualizacao = models.DateTimeField(
         auto_now=True, verbose_name="Data de Atualização")
 
+    # Texto normalizado para pesquisa (índices trigram e full-text no PostgreSQL)
+    busca = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # Paginação por cursor dentro da empresa
+            models.Index(fields=['empresa', 'id'],
+                         name='fornecedor_empresa_id_idx'),
+        ]
+
     def __str__(self):
         return f'{self.nome} - {self.documento}'
+
+    def save(self, *args, **kwargs):
+        self.busca = BuscaUtils.montar_busca(self)
+        self.documento_normalizado = normalize_document(self.documento)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = [
+                *update_fields,
+                *(campo for campo in ('busca', 'documento_normalizado')
+                  if campo not in update_fields)
+            ]
+
+        super().save(*args, **kwargs)
@@ -1,15 +1,31 @@
 from rest_framework import serializers
 
-from app.utils.validate_document import validate_cpf_cnpj
+from app.utils.validate_document import normalize_document, validate_cpf_cnpj
 from fornecedores.models import Fornecedores
 
 
 class FornecedorModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Fornecedores
-        fields = '__all__'
+        exclude = ['busca', 'documento_normalizado']
 
     def validate_documento(self, value):
         # Validação de CPF/CNPJ
         validate_cpf_cnpj(value)
+
+        # Mesmo documento com outra formatação
+        existentes = Fornecedores.objects.filter(
+            documento_normalizado=normalize_document(value))
+        if self.instance:
+            existentes = existentes.exclude(pk=self.instance.pk)
+        if existentes.exists():
+            raise serializers.ValidationError("Documento já cadastrado.")
+
+        return value
+
+    def validate_empresa(self, value):
+        # Só permite vincular fornecedores às empresas do próprio usuário
+        request = self.context.get('request')
+        if request and value.user_id != request.user.id:
+            raise serializers.ValidationError("Empresa não encontrada.")
         return value
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from empresa.models import Empresa
+from fornecedores.models import Fornecedores
+from fornecedores.utils.busca_utils import BuscaUtils
+
+
+@receiver(pre_save, sender=Empresa)
+def guardar_nome_anterior(sender, instance, update_fields=None, **kwargs):
+    # Nome antes da gravação, comparado no post_save
+    if instance.pk and (update_fields is None or 'nome' in update_fields):
+        instance._nome_anterior = Empresa.objects.filter(
+            pk=instance.pk
+        ).values_list('nome', flat=True).first()
+
+
+@receiver(post_save, sender=Empresa)
+def atualizar_busca_fornecedores(sender, instance, created, **kwargs):
+    """
+    O nome da empresa faz parte do texto de pesquisa dos fornecedores
+    Os fornecedores só são regravados quando o nome da empresa muda
+    """
+    anterior = instance.__dict__.pop('_nome_anterior', None)
+    if created or anterior is None or anterior == instance.nome:
+        return
+
+    fornecedores = []
+    for fornecedor in Fornecedores.objects.filter(
+        empresa=instance
+    ).iterator(chunk_size=1000):
+        fornecedor.busca = BuscaUtils.montar_busca(
+            fornecedor, instance.nome)
+        fornecedores.append(fornecedor)
+
+    Fornecedores.objects.bulk_update(fornecedores, ['busca'], batch_size=1000)
+
+
+@receiver(post_save, sender=Fornecedores)
+def registrar_alteracao(sender, instance, **kwargs):
+    # Feed de alterações em tempo real (Socket.IO)
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.SALVO)
+
+
+@receiver(post_delete, sender=Fornecedores)
+def registrar_exclusao(sender, instance, **kwargs):
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.EXCLUIDO)
@@ -1,3 +1,187 @@
+import csv
+import io
+import json
+
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from empresa.models import Empresa
+from fornecedores.models import Fornecedores
+from fornecedores.utils.busca_utils import BuscaUtils
+
+
+def criar_empresa(user, nome='Empresa Teste LTDA', documento='11.222.333/0001-81'):
+    return Empresa.objects.create(
+        user=user, tipo_documento='PJ', documento=documento, nome=nome,
+        status='ATIVA', logradouro='Rua A', numero='1', bairro='Centro',
+        cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+    )
+
+
+class ImportacaoFornecedoresTests(TestCase):
+    URL = '/api/v1/fornecedores/importar/'
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = criar_empresa(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _importar(self, conteudo):
+        arquivo = SimpleUploadedFile(
+            'fornecedores.csv', conteudo.encode('utf-8'), content_type='text/csv')
+        return self.client.post(
+            self.URL, {'arquivo': arquivo, 'empresa': self.empresa.id}, format='multipart')
+
+    def test_cabecalho_sem_colunas_obrigatorias(self):
+        response = self._importar("nome;documento\nFornecedor;529.982.247-25\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('logradouro', response.json()['detail'])
+        self.assertFalse(Fornecedores.objects.exists())
+
+    def test_importa_linhas_validas_e_retorna_erros(self):
+        response = self._importar(
+            "nome;documento;logradouro;numero;bairro;cidade;estado;cep;pais\n"
+            "Fornecedor A;529.982.247-25;Rua B;10;Centro;Campinas;SP;13010000;Brasil\n"
+            "Fornecedor B;111.111.111-11;Rua C;20;Centro;Campinas;SP;13010000;Brasil\n"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['importados'], 1)
+        self.assertEqual(response.json()['total_erros'], 1)
+        self.assertEqual(response.json()['erros'][0]['linha'], 3)
+        self.assertEqual(
+            list(Fornecedores.objects.values_list('nome', flat=True)), ['Fornecedor A'])
+
+
+def criar_fornecedor(empresa, nome, documento, cidade='Campinas'):
+    return Fornecedores.objects.create(
+        empresa=empresa, nome=nome, documento=documento, logradouro='Rua B',
+        numero='10', bairro='Centro', cidade=cidade, estado='SP',
+        cep='13010000', pais='Brasil'
+    )
+
+
+class BuscaFornecedoresTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = criar_empresa(self.user, nome='ACME LTDA')
+        self.fornecedor = criar_fornecedor(
+            self.empresa, 'Papelaria São João', '529.982.247-25')
+        criar_fornecedor(self.empresa, 'Mercado Central', '11.444.777/0001-61', 'Sorocaba')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _buscar(self, termo):
+        response = self.client.get('/api/v1/fornecedores/', {'q': termo})
+        self.assertEqual(response.status_code, 200)
+        return [item['nome'] for item in response.json()['results']]
+
+    def test_busca_sem_acento_documento_e_cidade(self):
+        # SQLite: substring no texto normalizado
+        self.assertEqual(self._buscar('sao joao'), ['Papelaria São João'])
+        self.assertEqual(self._buscar('52998224725'), ['Papelaria São João'])
+        self.assertEqual(self._buscar('SOROCABA'), ['Mercado Central'])
+        self.assertEqual(self._buscar('inexistente'), [])
+
+    def test_encontra_o_que_o_filtro_icontains_encontrava(self):
+        # Campos do filtro antigo que continuam na busca (ver benchmark_busca)
+        outra = criar_empresa(self.user, nome='Distribuidora Ômega', documento='11.444.777/0002-42')
+        criar_fornecedor(outra, 'Ótica Visão', '45.723.174/0001-10', 'São Paulo')
+
+        for termo in ('papel', 'são', 'SAO PAULO', '529.982', '11444777', 'ômega', 'rua b', 'x'):
+            with self.subTest(termo=termo):
+                antigo = set(Fornecedores.objects.filter(
+                    Q(nome__icontains=termo) |
+                    Q(documento__icontains=termo) |
+                    Q(logradouro__icontains=termo) |
+                    Q(cidade__icontains=termo) |
+                    Q(empresa__nome__icontains=termo)
+                ).values_list('id', flat=True))
+
+                novo = set(BuscaUtils.filtrar(
+                    Fornecedores.objects.all(), termo).values_list('id', flat=True))
+                self.assertLessEqual(antigo, novo)
+
+    def test_renomear_empresa_atualiza_busca(self):
+        # O nome novo está contido no antigo: todos precisam ser regravados
+        self.empresa.nome = 'ACME'
+        self.empresa.save()
+
+        self.fornecedor.refresh_from_db()
+        self.assertNotIn('ltda', self.fornecedor.busca)
+        self.assertEqual(len(self._buscar('acme')), 2)
+        self.assertEqual(self._buscar('ltda'), [])
+
+    def test_salvar_sem_renomear_nao_regrava_fornecedores(self):
+        self.empresa.telefone = '11999999999'
+        # select do nome anterior e update da empresa
+        with self.assertNumQueries(2):
+            self.empresa.save()
+
+        with self.assertNumQueries(1):
+            self.empresa.save(update_fields=['telefone'])
+
+
+@skipUnless(connection.vendor == 'postgresql', "Busca por relevância (full-text e trigram) só no PostgreSQL")
+class BuscaRelevanciaTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        empresa = criar_empresa(self.user)
+        # Muitas relevâncias iguais e algumas próximas
+        for numero in range(30):
+            nome = 'Papelaria Central' if numero % 3 else f'Papelaria {numero} Central Norte'
+            criar_fornecedor(empresa, nome, f'529.982.247-{numero:02d}')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_paginas_sem_repeticao_nem_salto(self):
+        esperado = list(BuscaUtils.filtrar(
+            Fornecedores.objects.all(), 'papelaria central').values_list('id', flat=True))
+        self.assertEqual(len(esperado), 30)
+
+        ids = []
+        url = '/api/v1/fornecedores/?q=papelaria%20central&page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.json()['results']]
+            url = response.json()['next']
+
+        self.assertEqual(ids, esperado)
+
+
+class ExportacaoFornecedoresTests(TestCase):
+    URL = '/api/v1/fornecedores/exportar/'
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.fornecedor = criar_fornecedor(
+            criar_empresa(self.user), 'Papelaria São João', '529.982.247-25')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _exportar(self, formato):
+        response = self.client.get(self.URL, {'formato': formato})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_datas_iguais_a_api_nos_dois_formatos(self):
+        api = self.client.get(f'/api/v1/fornecedores/{self.fornecedor.id}/').json()
+
+        linhas = list(csv.DictReader(io.StringIO(self._exportar('csv'))))
+        ndjson = [json.loads(linha) for linha in self._exportar('ndjson').splitlines()]
 
-# Create your tests here.
+        for campo in ('data_criacao', 'data_atualizacao'):
+            self.assertEqual(linhas[0][campo], api[campo])
+            self.assertEqual(ndjson[0][campo], api[campo])
+        self.assertEqual(linhas[0]['nome'], ndjson[0]['nome'])
@@ -1,10 +1,14 @@
 from django.urls import path
 
-from fornecedores.views import FornecedorListCreateAPIView, FornecedorRetrieveUpdateDestroyAPIView
+from fornecedores.views import FornecedorListCreateAPIView, FornecedorRetrieveUpdateDestroyAPIView, FornecedorImportacaoAPIView, FornecedorExportacaoAPIView
 
 urlpatterns = [
     path('fornecedores/', FornecedorListCreateAPIView.as_view(),
          name='fornecedor-list-create'),
+    path('fornecedores/importar/', FornecedorImportacaoAPIView.as_view(),
+         name='fornecedor-importar'),
+    path('fornecedores/exportar/', FornecedorExportacaoAPIView.as_view(),
+         name='fornecedor-exportar'),
     path('fornecedores/<int:pk>/', FornecedorRetrieveUpdateDestroyAPIView.as_view(),
          name='fornecedor-detail')
 ]
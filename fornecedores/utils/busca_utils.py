@@ -0,0 +1,76 @@
+# utils/busca_utils.py
+import re
+import unicodedata
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+)
+from django.db import connections
+from django.db.models import IntegerField, Q
+from django.db.models.functions import Cast, Round
+
+
+class BuscaUtils:
+    # Configuração do full-text sem stemming (nomes, documentos e endereços)
+    CONFIG = 'simple'
+    # Casas decimais da relevância mantidas no inteiro usado pelo cursor
+    ESCALA_RELEVANCIA = 10000
+
+    @staticmethod
+    def normalizar(texto):
+        """Minúsculas, sem acentos e com espaços simples"""
+        if not texto:
+            return ''
+        texto = unicodedata.normalize('NFKD', str(texto))
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return ' '.join(texto.lower().split())
+
+    @staticmethod
+    def montar_busca(fornecedor, nome_empresa=None):
+        """
+        Texto indexado do fornecedor: nome, documento (formatado e só dígitos),
+        logradouro, cidade e nome da empresa
+        """
+        if nome_empresa is None:
+            nome_empresa = fornecedor.empresa.nome
+
+        partes = [
+            fornecedor.nome,
+            fornecedor.documento,
+            re.sub(r"[^0-9]", "", fornecedor.documento or ''),
+            fornecedor.logradouro,
+            fornecedor.cidade,
+            nome_empresa,
+        ]
+        return BuscaUtils.normalizar(' '.join(p for p in partes if p))
+
+    @staticmethod
+    def filtrar(queryset, valor):
+        """
+        PostgreSQL: full-text + trigram (índices GIN) ordenado por relevância
+        Demais bancos (SQLite nos testes): substring na coluna normalizada
+        """
+        termo = BuscaUtils.normalizar(valor)
+        if not termo:
+            return queryset
+
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.filter(busca__contains=termo).order_by('-id')
+
+        vetor = SearchVector('busca', config=BuscaUtils.CONFIG)
+        consulta = SearchQuery(
+            termo, config=BuscaUtils.CONFIG, search_type='websearch')
+
+        # Relevância inteira: o cursor compara o valor exato da última linha
+        # (um float4 convertido em texto e de volta perde precisão)
+        relevancia = (
+            SearchRank(vetor, consulta) + TrigramWordSimilarity(termo, 'busca')
+        ) * BuscaUtils.ESCALA_RELEVANCIA
+
+        return queryset.annotate(
+            vetor_busca=vetor,
+            relevancia=Cast(Round(relevancia), IntegerField()),
+        ).filter(
+            # contains usa o índice gin_trgm_ops, vetor_busca o índice de full-text
+            Q(busca__contains=termo) | Q(vetor_busca=consulta)
+        ).order_by('-relevancia', '-id')
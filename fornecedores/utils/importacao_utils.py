@@ -0,0 +1,246 @@
+# utils/importacao_utils.py
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from app.utils.exceptions import ValidationError
+from app.utils.validate_document import (
+    STATUS_MENSAGENS, STATUS_VALIDO, validate_cpf_cnpj_batch
+)
+from fornecedores.models import Fornecedores
+from fornecedores.utils.busca_utils import BuscaUtils
+
+
+class ImportacaoFornecedores:
+    """
+    Importa fornecedores de um CSV em lotes, sem carregar o arquivo inteiro
+    Cada lote é validado, tem a unicidade conferida com uma única consulta
+    e é gravado com COPY (PostgreSQL) ou bulk_create (demais bancos)
+    """
+    OBRIGATORIOS = ('nome', 'documento', 'logradouro', 'numero',
+                    'bairro', 'cidade', 'estado', 'cep', 'pais')
+    OPCIONAIS = ('complemento', 'telefone', 'celular', 'email')
+
+    # Colunas gravadas no COPY, na ordem
+    COLUNAS = ('empresa_id', *OBRIGATORIOS, *OPCIONAIS, 'documento_normalizado',
+               'busca', 'data_criacao', 'data_atualizacao')
+
+    def __init__(self, empresa, tamanho_lote=None):
+        self.empresa = empresa
+        self.tamanho_lote = tamanho_lote or settings.FORNECEDORES_IMPORT_LOTE
+        self.max_erros = settings.FORNECEDORES_IMPORT_MAX_ERROS
+
+    def importar(self, arquivo):
+        """
+        arquivo: arquivo binário (upload ou aberto com 'rb')
+        Retorna o total importado e os erros por linha do CSV
+        """
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+        cabecalho = texto.readline()
+        delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+
+        colunas = [coluna.strip().lower() for coluna in next(
+            csv.reader([cabecalho], delimiter=delimitador), [])]
+        faltando = [c for c in self.OBRIGATORIOS if c not in colunas]
+        if faltando:
+            raise ValidationError(
+                f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+
+        linhas = csv.DictReader(
+            texto, fieldnames=colunas, delimiter=delimitador)
+
+        self.importados = 0
+        self.total_erros = 0
+        self.erros = []
+
+        # Linha 1 é o cabeçalho
+        numero_linha = 2
+        while True:
+            lote = list(islice(linhas, self.tamanho_lote))
+            if not lote:
+                break
+
+            self._processar_lote(lote, numero_linha)
+            numero_linha += len(lote)
+
+        return {
+            'importados': self.importados,
+            'total_erros': self.total_erros,
+            'erros': self.erros,
+        }
+
+    def _processar_lote(self, lote, primeira_linha):
+        validos = []
+        documentos = set()
+        emails = set()
+
+        linhas = [
+            {
+                campo: (linha.get(campo) or '').strip()
+                for campo in (*self.OBRIGATORIOS, *self.OPCIONAIS)
+            }
+            for linha in lote
+        ]
+
+        # Documentos do lote validados de uma só vez
+        normalizados, status_documentos = validate_cpf_cnpj_batch(
+            [dados['documento'] for dados in linhas])
+
+        for indice, dados in enumerate(linhas):
+            numero = primeira_linha + indice
+            normalizado = normalizados[indice]
+            erros = self._validar(dados, int(status_documentos[indice]))
+
+            # Repetidos dentro do próprio lote (formatados ou não)
+            if normalizado in documentos:
+                erros.append("Documento repetido no arquivo.")
+            if dados['email'] and dados['email'] in emails:
+                erros.append("E-mail repetido no arquivo.")
+
+            if erros:
+                self._registrar_erro(numero, dados['documento'], erros)
+                continue
+
+            documentos.add(normalizado)
+            if dados['email']:
+                emails.add(dados['email'])
+            validos.append((numero, normalizado, dados))
+
+        if not validos:
+            return
+
+        # Unicidade de documento e e-mail com uma única consulta por lote
+        existentes = Fornecedores.objects.filter(
+            Q(documento_normalizado__in=documentos) | Q(email__in=emails)
+        ).values_list('documento_normalizado', 'email')
+
+        documentos_existentes = set()
+        emails_existentes = set()
+        for documento, email in existentes:
+            documentos_existentes.add(documento)
+            emails_existentes.add(email)
+
+        fornecedores = []
+        for numero, normalizado, dados in validos:
+            erros = []
+            if normalizado in documentos_existentes:
+                erros.append("Documento já cadastrado.")
+            if dados['email'] and dados['email'] in emails_existentes:
+                erros.append("E-mail já cadastrado.")
+
+            if erros:
+                self._registrar_erro(numero, dados['documento'], erros)
+                continue
+
+            fornecedores.append((numero, self._montar(dados, normalizado)))
+
+        self._gravar(fornecedores)
+
+    def _validar(self, dados, status_documento):
+        erros = []
+
+        for campo in self.OBRIGATORIOS:
+            if not dados[campo]:
+                erros.append(f"Campo '{campo}' é obrigatório.")
+
+        for campo, valor in dados.items():
+            limite = Fornecedores._meta.get_field(campo).max_length
+            if limite and len(valor) > limite:
+                erros.append(
+                    f"Campo '{campo}' excede {limite} caracteres.")
+
+        if dados['documento'] and status_documento != STATUS_VALIDO:
+            erros.append(STATUS_MENSAGENS[status_documento])
+
+        if dados['email']:
+            try:
+                validate_email(dados['email'])
+            except DjangoValidationError:
+                erros.append("E-mail inválido.")
+
+        return erros
+
+    def _montar(self, dados, normalizado):
+        fornecedor = Fornecedores(
+            empresa=self.empresa,
+            documento_normalizado=normalizado,
+            **{campo: valor or None if campo in self.OPCIONAIS else valor
+               for campo, valor in dados.items()}
+        )
+        fornecedor.busca = BuscaUtils.montar_busca(
+            fornecedor, self.empresa.nome)
+        fornecedor.data_criacao = fornecedor.data_atualizacao = now()
+        return fornecedor
+
+    def _gravar(self, fornecedores):
+        if not fornecedores:
+            return
+
+        try:
+            with transaction.atomic():
+                if connection.vendor == 'postgresql':
+                    self._copy([f for _, f in fornecedores])
+                else:
+                    Fornecedores.objects.bulk_create(
+                        [f for _, f in fornecedores])
+
+                # COPY/bulk_create não disparam signals: uma notificação por lote
+                AlteracoesBuffer.registrar_objetos(
+                    [f for _, f in fornecedores], AlteracoesBuffer.SALVO)
+            self.importados += len(fornecedores)
+
+        except IntegrityError:
+            # Outro cadastro simultâneo: grava linha a linha para apontar o conflito
+            for numero, fornecedor in fornecedores:
+                try:
+                    with transaction.atomic():
+                        Fornecedores.objects.bulk_create([fornecedor])
+                        AlteracoesBuffer.registrar_objetos(
+                            [fornecedor], AlteracoesBuffer.SALVO)
+                    self.importados += 1
+                except IntegrityError:
+                    self._registrar_erro(numero, fornecedor.documento, [
+                        "Documento ou e-mail já cadastrado."])
+
+    def _copy(self, fornecedores):
+        buffer = io.StringIO()
+        for fornecedor in fornecedores:
+            buffer.write(','.join(
+                self._valor_copy(getattr(fornecedor, coluna))
+                for coluna in self.COLUNAS
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {Fornecedores._meta.db_table} ({', '.join(self.COLUNAS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+
+    @staticmethod
+    def _valor_copy(valor):
+        # No formato CSV do COPY, vazio sem aspas é NULL
+        if valor is None:
+            return ''
+        if hasattr(valor, 'isoformat'):
+            valor = valor.isoformat()
+        return '"' + str(valor).replace('"', '""') + '"'
+
+    def _registrar_erro(self, linha, documento, erros):
+        self.total_erros += 1
+        if len(self.erros) < self.max_erros:
+            self.erros.append({
+                'linha': linha,
+                'documento': documento,
+                'erros': erros,
+            })
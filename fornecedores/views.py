@@ -1,19 +1,112 @@
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import generics
+from rest_framework.views import APIView
+from rest_framework.response import Response
 
 from fornecedores.models import Fornecedores
 from fornecedores.serializers import FornecedorModelSerializer
 from .filters import FornecedorFilter
+from .utils.importacao_utils import ImportacaoFornecedores
+from empresa.models import Empresa
+from app.utils.exceptions import ValidationError
+from app.utils.exportacao import ExportacaoUtils
+from app.utils.leitura_rapida import LeituraRapida
+from app.utils.pagination import CursorPagination
+
+
+class FornecedorPagination(CursorPagination):
+    def get_ordering(self, request, queryset, view):
+        # Pesquisa no PostgreSQL é paginada pela relevância (inteira, com
+        # empates na ordem do id)
+        if 'relevancia' in queryset.query.annotations:
+            return ('-relevancia', '-id')
+        return super().get_ordering(request, queryset, view)
 
 
 class FornecedorListCreateAPIView(generics.ListCreateAPIView):
-    queryset = Fornecedores.objects.all()
     serializer_class = FornecedorModelSerializer
+    pagination_class = FornecedorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = FornecedorFilter
 
+    def get_queryset(self):
+        # Somente fornecedores das empresas do usuário autenticado
+        return Fornecedores.objects.filter(empresa__user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.LEITURA_RAPIDA:
+            return super().list(request, *args, **kwargs)
+
+        # Leitura rápida: .values() e conversores pré-compilados do serializer
+        queryset = self.filter_queryset(self.get_queryset())
+        leitura = LeituraRapida.para(FornecedorModelSerializer)
+
+        colunas = list(leitura.colunas)
+        if 'relevancia' in queryset.query.annotations:
+            # Necessária para o cursor da pesquisa
+            colunas.append('relevancia')
+
+        pagina = self.paginate_queryset(queryset.values(*colunas))
+        return self.get_paginated_response(leitura.representar(pagina))
+
 
 class FornecedorRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Fornecedores.objects.all()
     serializer_class = FornecedorModelSerializer
+
+    def get_queryset(self):
+        return Fornecedores.objects.filter(empresa__user=self.request.user)
+
+
+class FornecedorImportacaoAPIView(APIView):
+    def post(self, request):
+        """
+        Importa fornecedores de um arquivo CSV (multipart: arquivo, empresa)
+        Colunas: nome, documento, logradouro, numero, bairro, cidade, estado,
+        cep, pais e opcionalmente complemento, telefone, celular, email
+        """
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            raise ValidationError("Arquivo CSV é obrigatório.")
+
+        empresa_id = str(request.data.get('empresa', ''))
+        empresa = Empresa.objects.filter(
+            id=empresa_id,
+            user=request.user
+        ).first() if empresa_id.isdigit() else None
+
+        if not empresa:
+            raise ValidationError("Empresa não encontrada.")
+
+        resultado = ImportacaoFornecedores(empresa).importar(arquivo.file)
+
+        return Response(resultado)
+
+
+class FornecedorExportacaoAPIView(APIView):
+    def get(self, request):
+        """
+        Exporta os fornecedores em CSV ou NDJSON (?formato=csv|ndjson)
+        Aceita os mesmos filtros da listagem (q, data_criacao_after, ...)
+        """
+        formato = ExportacaoUtils.formato(request)
+
+        filtro = FornecedorFilter(
+            request.query_params,
+            queryset=Fornecedores.objects.filter(empresa__user=request.user),
+            request=request
+        )
+        if not filtro.is_valid():
+            raise ValidationError(filtro.errors)
+
+        colunas = [
+            field.attname for field in Fornecedores._meta.concrete_fields
+            if field.name not in ('busca', 'documento_normalizado')
+        ]
+
+        # iterator() lê em blocos (cursor no servidor no PostgreSQL)
+        linhas = filtro.qs.order_by('id').values_list(*colunas).iterator(
+            chunk_size=settings.EXPORTACAO_CHUNK_SIZE)
+
+        return ExportacaoUtils.resposta(linhas, colunas, formato, 'fornecedores')
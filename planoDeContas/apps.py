@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PlanodecontasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'planoDeContas'
+
+    def ready(self):
+        # Registra os signals do cache da árvore e do feed de alterações
+        from planoDeContas import signals  # noqa: F401
@@ -2,12 +2,18 @@ import django_filters
 
 from django.db.models import Q
 
+from app.utils.validate_document import normalize_document
 from .models import PlanoAccount
 
 
 class PlanoDeContasFilter(django_filters.FilterSet):
     q = django_filters.CharFilter(method='filter_by_q', label="Pesquisar")
 
+    # Pesquisa por prefixo do código (?codigo=2.1.), usa o índice varchar_pattern_ops
+    # (_like) que o Django cria no PostgreSQL para o codigo único
+    codigo = django_filters.CharFilter(
+        field_name='codigo', lookup_expr='startswith', label="Código (prefixo)")
+
     class Meta:
         model = PlanoAccount
         fields = []
@@ -17,14 +23,20 @@ class PlanoDeContasFilter(django_filters.FilterSet):
             return queryset
 
         # Filtra os campos com base no valor de 'q'
-        return queryset.filter(
+        filtro = (
             Q(nome__icontains=value) |
             Q(codigo__icontains=value) |
             Q(tipo__icontains=value) |
             Q(descricao__icontains=value) |
-            Q(empresa__documento__icontains=value) |
             Q(empresa__nome__icontains=value) |
             Q(vinculo__codigo__icontains=value) |
             Q(cadastrado_em__icontains=value) |
             Q(atualizado_em__icontains=value)
         )
+
+        # Documento da empresa pela coluna normalizada (índice único)
+        documento = normalize_document(value)
+        if documento:
+            filtro |= Q(empresa__documento_normalizado=documento)
+
+        return queryset.filter(filtro)
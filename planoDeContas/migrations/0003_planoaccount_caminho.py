@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+def preencher_caminho(apps, schema_editor):
+    """Calcula o caminho materializado das contas já existentes"""
+    PlanoAccount = apps.get_model('planoDeContas', 'PlanoAccount')
+
+    vinculos = dict(PlanoAccount.objects.values_list('id', 'vinculo_id'))
+    caminhos = {}
+
+    def montar(conta_id):
+        # Sobe pelos vínculos até encontrar um caminho já calculado
+        pendentes = []
+        atual = conta_id
+        while atual is not None and atual not in caminhos:
+            pendentes.append(atual)
+            atual = vinculos.get(atual)
+
+        prefixo = caminhos.get(atual, '')
+        for pendente in reversed(pendentes):
+            prefixo = f'{prefixo}{pendente}/'
+            caminhos[pendente] = prefixo
+
+        return caminhos[conta_id]
+
+    contas = []
+    for conta in PlanoAccount.objects.only('id').iterator(chunk_size=2000):
+        conta.caminho = montar(conta.id)
+        contas.append(conta)
+
+    PlanoAccount.objects.bulk_update(contas, ['caminho'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planoDeContas', '0002_alter_planoaccount_empresa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planoaccount',
+            name='caminho',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.RunPython(preencher_caminho, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='planoaccount',
+            index=models.Index(fields=['caminho'], name='plano_caminho_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_indices_paginacao'),
+        ('planoDeContas', '0003_planoaccount_caminho'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='planoaccount',
+            index=models.Index(fields=['empresa', 'id'], name='plano_empresa_id_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+from planoDeContas.utils.codigo_utils import CodigoUtils
+
+
+def preencher_ordem_codigo(apps, schema_editor):
+    """Calcula a chave de ordenação natural das contas já existentes"""
+    PlanoAccount = apps.get_model('planoDeContas', 'PlanoAccount')
+
+    contas = []
+    for conta in PlanoAccount.objects.only('id', 'codigo').iterator(chunk_size=2000):
+        conta.ordem_codigo = CodigoUtils.chave_ordenacao(conta.codigo)
+        contas.append(conta)
+
+    PlanoAccount.objects.bulk_update(contas, ['ordem_codigo'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_indices_paginacao'),
+        ('planoDeContas', '0004_plano_empresa_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planoaccount',
+            name='ordem_codigo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(preencher_ordem_codigo, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='planoaccount',
+            index=models.Index(fields=['ordem_codigo'], name='plano_ordem_codigo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='planoaccount',
+            index=models.Index(fields=['empresa', 'ordem_codigo'], name='plano_empresa_ordem_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 
 from empresa.models import Empresa
+from planoDeContas.utils.codigo_utils import CodigoUtils
 
 
 class PlanoAccount(models.Model):
@@ -13,12 +16,76 @@ class PlanoAccount(models.Model):
         Empresa, related_name='planos_contas', on_delete=models.CASCADE)
     nome = models.CharField(max_length=100)
     codigo = models.CharField(max_length=20, unique=True)
+    # Chave de ordenação natural do código ("1.2" antes de "1.10")
+    ordem_codigo = models.CharField(
+        max_length=200, blank=True, default='', editable=False)
     tipo = models.CharField(max_length=1, choices=TIPO_CHOICES)
     descricao = models.TextField()
     vinculo = models.ForeignKey(
         'self', blank=True, null=True, related_name='subcontas', on_delete=models.CASCADE)
+    # Caminho materializado com os ids dos ancestros (ex: "1/5/23/")
+    caminho = models.CharField(
+        max_length=500, blank=True, default='', editable=False)
     cadastrado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # varchar_pattern_ops permite usar o índice no startswith (PostgreSQL)
+            models.Index(fields=['caminho'], name='plano_caminho_idx',
+                         opclasses=['varchar_pattern_ops']),
+            # Paginação por cursor dentro da empresa
+            models.Index(fields=['empresa', 'id'],
+                         name='plano_empresa_id_idx'),
+            # Listagem em ordem natural do código
+            models.Index(fields=['ordem_codigo'], name='plano_ordem_codigo_idx'),
+            models.Index(fields=['empresa', 'ordem_codigo'],
+                         name='plano_empresa_ordem_idx'),
+        ]
+
     def __str__(self):
         return f'{self.codigo} - {self.nome}'
+
+    def save(self, *args, **kwargs):
+        self.ordem_codigo = CodigoUtils.chave_ordenacao(self.codigo)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'ordem_codigo' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'ordem_codigo']
+
+        # Conta e caminho na mesma transação: a invalidação da árvore
+        # (signals, após o commit) só ocorre com o caminho já gravado
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            self.atualizar_caminho()
+
+    def atualizar_caminho(self):
+        """
+        Recalcula o caminho da conta a partir do vínculo e, caso tenha mudado,
+        reescreve o prefixo de todas as subcontas em um único UPDATE
+        """
+        prefixo = ''
+        if self.vinculo_id:
+            prefixo = PlanoAccount.objects.filter(
+                pk=self.vinculo_id
+            ).values_list('caminho', flat=True).first() or ''
+
+        novo_caminho = f'{prefixo}{self.pk}/'
+        caminho_antigo = self.caminho
+
+        if novo_caminho == caminho_antigo:
+            return
+
+        if caminho_antigo:
+            # Move a conta junto com toda a sua subárvore
+            PlanoAccount.objects.filter(
+                caminho__startswith=caminho_antigo
+            ).update(caminho=Concat(
+                Value(novo_caminho),
+                Substr('caminho', len(caminho_antigo) + 1),
+                output_field=models.CharField()
+            ))
+        else:
+            PlanoAccount.objects.filter(pk=self.pk).update(caminho=novo_caminho)
+
+        self.caminho = novo_caminho
@@ -9,6 +9,9 @@ class PlanoAccountRecursivoSerializer(serializers.ModelSerializer):
     """
     subcontas = serializers.SerializerMethodField()
 
+    # Ordem dos campos na resposta (também usada pela leitura rápida da árvore)
+    ORDEM_CAMPOS = ['id', 'nome', 'codigo', 'tipo', 'descricao', 'subcontas']
+
     class Meta:
         model = PlanoAccount
         fields = ['id', 'nome', 'codigo', 'tipo', 'descricao', 'subcontas']
@@ -21,12 +24,8 @@ class PlanoAccountRecursivoSerializer(serializers.ModelSerializer):
 
         # ORDEM ESPECÍFICA DOS CAMPOS
         ordered_representation = OrderedDict()
-        ordered_representation['id'] = representation.get('id')
-        ordered_representation['nome'] = representation.get('nome')
-        ordered_representation['codigo'] = representation.get('codigo')
-        ordered_representation['tipo'] = representation.get('tipo')
-        ordered_representation['descricao'] = representation.get('descricao')
-        ordered_representation['subcontas'] = representation.get('subcontas')
+        for campo in self.ORDEM_CAMPOS:
+            ordered_representation[campo] = representation.get(campo)
 
         return ordered_representation
 
@@ -34,6 +33,15 @@ class PlanoAccountRecursivoSerializer(serializers.ModelSerializer):
         """
         Método recursivo para construir a hierarquia de subcontas
         """
+        # Árvore já carregada em memória pela view (sem limite de profundidade)
+        mapa_subcontas = self.context.get('subcontas')
+        if mapa_subcontas is not None:
+            return PlanoAccountRecursivoSerializer(
+                mapa_subcontas.get(obj.id, []),
+                many=True,
+                context=self.context
+            ).data
+
         depth = self.context.get('depth', 0)
         max_depth = self.context.get('max_depth', 5)
 
@@ -78,6 +86,13 @@ class PlanoDeContasModelSerializer(serializers.ModelSerializer):
     # Para leitura: mostra a hierarquia de subcontas simplificada
     subcontas = serializers.SerializerMethodField()
 
+    # Campos principais primeiro, demais campos após
+    # (também usada pela leitura rápida da árvore)
+    ORDEM_CAMPOS = [
+        'id', 'nome', 'codigo', 'tipo', 'descricao',
+        'vinculo', 'empresa', 'cadastrado_em', 'atualizado_em', 'subcontas',
+    ]
+
     class Meta:
         model = PlanoAccount
         fields = '__all__'
@@ -91,22 +106,8 @@ class PlanoDeContasModelSerializer(serializers.ModelSerializer):
 
         # ORDEM ESPECÍFICA DOS CAMPOS (FÁCIL DE ENTENDER E MANTER)
         ordered_representation = OrderedDict()
-
-        # Campos principais primeiro
-        ordered_representation['id'] = representation.get('id')
-        ordered_representation['nome'] = representation.get('nome')
-        ordered_representation['codigo'] = representation.get('codigo')
-        ordered_representation['tipo'] = representation.get('tipo')
-        ordered_representation['descricao'] = representation.get('descricao')
-
-        # Demais campos após
-        ordered_representation['vinculo'] = representation.get('vinculo')
-        ordered_representation['empresa'] = representation.get('empresa')
-        ordered_representation['cadastrado_em'] = representation.get(
-            'cadastrado_em')
-        ordered_representation['atualizado_em'] = representation.get(
-            'atualizado_em')
-        ordered_representation['subcontas'] = representation.get('subcontas')
+        for campo in self.ORDEM_CAMPOS:
+            ordered_representation[campo] = representation.get(campo)
 
         return ordered_representation
 
@@ -114,6 +115,15 @@ class PlanoDeContasModelSerializer(serializers.ModelSerializer):
         """
         Retorna a hierarquia de subcontas usando serializer recursivo
         """
+        # Árvore já carregada em memória pela view (sem limite de profundidade)
+        mapa_subcontas = self.context.get('subcontas')
+        if mapa_subcontas is not None:
+            return PlanoAccountRecursivoSerializer(
+                mapa_subcontas.get(obj.id, []),
+                many=True,
+                context=self.context
+            ).data
+
         depth = self.context.get('depth', 0)
         max_depth = self.context.get('max_depth', 5)
 
@@ -138,4 +148,12 @@ class PlanoDeContasModelSerializer(serializers.ModelSerializer):
 class PlanoDeContasRetrieveUpdateModel(serializers.ModelSerializer):
     class Meta:
         model = PlanoAccount
-        fields = '__all__'
+        exclude = ['caminho', 'ordem_codigo']
+
+    def validate_vinculo(self, value):
+        # Impede vincular a conta a ela mesma ou a uma de suas subcontas
+        if value and self.instance and self.instance.caminho and \
+                value.caminho.startswith(self.instance.caminho):
+            raise serializers.ValidationError(
+                "Não é permitido vincular a conta a ela mesma ou a uma de suas subcontas.")
+        return value
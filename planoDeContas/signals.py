@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.utils.alteracoes_utils import AlteracoesBuffer
+from planoDeContas.models import PlanoAccount
+from planoDeContas.utils.cache_utils import ArvoreCache
+
+
+@receiver(pre_save, sender=PlanoAccount)
+def guardar_empresa_anterior(sender, instance, **kwargs):
+    # Caso a conta troque de empresa, a árvore antiga também precisa ser invalidada
+    if instance.pk:
+        instance._empresa_anterior_id = PlanoAccount.objects.filter(
+            pk=instance.pk
+        ).values_list('empresa_id', flat=True).first()
+
+
+@receiver(post_save, sender=PlanoAccount)
+def invalidar_arvore_ao_salvar(sender, instance, **kwargs):
+    empresas = {instance.empresa_id}
+    anterior = getattr(instance, '_empresa_anterior_id', None)
+    if anterior:
+        empresas.add(anterior)
+    # Após o commit do save() (que inclui o caminho da conta e das subcontas),
+    # para que outra requisição não salve a árvore antiga com a versão nova
+    transaction.on_commit(lambda: ArvoreCache.invalidar(*empresas))
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.SALVO)
+
+
+@receiver(post_delete, sender=PlanoAccount)
+def invalidar_arvore_ao_excluir(sender, instance, **kwargs):
+    empresa_id = instance.empresa_id
+    transaction.on_commit(lambda: ArvoreCache.invalidar(empresa_id))
+    AlteracoesBuffer.registrar_objetos([instance], AlteracoesBuffer.EXCLUIDO)
@@ -1,3 +1,309 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from empresa.models import Empresa
+from planoDeContas.models import PlanoAccount
+from planoDeContas.utils.arvore_utils import ArvoreUtils
+from planoDeContas.utils.cache_utils import ArvoreCache
+from planoDeContas.views import PlanoDeContasAPIView
+
+
+def criar_empresa(user, documento='11.222.333/0001-81'):
+    return Empresa.objects.create(
+        user=user, tipo_documento='PJ', documento=documento, nome='Empresa Teste LTDA',
+        status='ATIVA', logradouro='Rua A', numero='1', bairro='Centro',
+        cidade='São Paulo', estado='SP', cep='01001000', pais='Brasil'
+    )
+
+
+def criar_conta(empresa, codigo, vinculo=None, tipo='S'):
+    return PlanoAccount.objects.create(
+        empresa=empresa, codigo=codigo, nome=f'Conta {codigo}', tipo=tipo,
+        descricao=f'Descrição {codigo}', vinculo=vinculo
+    )
+
+
+class ArvoreCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = criar_empresa(self.user)
+        raiz = criar_conta(self.empresa, '1')
+        criar_conta(self.empresa, '1.1', vinculo=raiz, tipo='A')
+
+        self.url = f'/api/v1/plano-de-contas/?empresa={self.empresa.id}'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_segunda_leitura_vem_do_cache(self):
+        primeira = self.client.get(self.url)
+        segunda = self.client.get(self.url)
+
+        self.assertEqual(primeira['X-Cache'], 'MISS')
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(primeira.content, segunda.content)
+
+    def test_alteracao_invalida_arvore_e_etag(self):
+        primeira = self.client.get(self.url)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=primeira['ETag']).status_code, 304)
+
+        criar_conta(self.empresa, '2')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_alteracao_em_outro_worker(self):
+        # Outro processo grava: o contador do cache local deste não muda
+        primeira = self.client.get(self.url)
+        with mock.patch.object(ArvoreCache, 'invalidar'):
+            criar_conta(self.empresa, '2')
+            conta = PlanoAccount.objects.get(codigo='1.1')
+            conta.nome = 'Renomeada'
+            conta.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], primeira['ETag'])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertEqual(
+            response.json()['results'][0]['subcontas'][0]['nome'], 'Renomeada')
+
+        # Exclusão não altera a maior data: a quantidade muda a ETag
+        with mock.patch.object(ArvoreCache, 'invalidar'):
+            PlanoAccount.objects.get(codigo='2').delete()
+
+        excluida = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(excluida.status_code, 200)
+        self.assertEqual(len(excluida.json()['results']), 1)
+
+    def test_invalidacao_apos_commit_com_caminho_gravado(self):
+        raiz = PlanoAccount.objects.get(codigo='1')
+        filha = PlanoAccount.objects.get(codigo='1.1')
+        caminhos = []
+
+        def invalidar(*empresas):
+            # Caminhos que uma requisição concorrente leria neste momento
+            caminhos.append(dict(PlanoAccount.objects.values_list('codigo', 'caminho')))
+
+        with mock.patch.object(ArvoreCache, 'invalidar', invalidar):
+            with self.captureOnCommitCallbacks(execute=True):
+                neta = criar_conta(self.empresa, '1.1.1', vinculo=filha, tipo='A')
+                self.assertEqual(caminhos, [])
+
+            self.assertEqual(caminhos[-1]['1.1.1'], f'{raiz.pk}/{filha.pk}/{neta.pk}/')
+
+            # Subárvore movida para uma nova raiz
+            nova_raiz = criar_conta(self.empresa, '2')
+            with self.captureOnCommitCallbacks(execute=True):
+                filha.vinculo = nova_raiz
+                filha.save()
+                self.assertEqual(len(caminhos), 1)
+
+        self.assertEqual(caminhos[-1]['1.1'], f'{nova_raiz.pk}/{filha.pk}/')
+        self.assertEqual(caminhos[-1]['1.1.1'], f'{nova_raiz.pk}/{filha.pk}/{neta.pk}/')
+
+    def test_invalidacao_durante_montagem_nao_fica_em_cache(self):
+        arvore = PlanoDeContasAPIView._arvore
+
+        def invalidar_durante(view, queryset):
+            # Outra requisição altera as contas enquanto a árvore é montada
+            dados = arvore(view, queryset)
+            ArvoreCache.invalidar(self.empresa.id)
+            return dados
+
+        with mock.patch.object(PlanoDeContasAPIView, '_arvore', invalidar_durante):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+        # A árvore montada antes da invalidação não é servida
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+
+class PaginacaoPlanoDeContasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = criar_empresa(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _codigos(self, url):
+        codigos = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            codigos += [conta['codigo'] for conta in response.json()['results']]
+            url = response.json()['next']
+        return codigos
+
+    def test_ordem_natural_com_chaves_repetidas(self):
+        # "1", "01" e "001" têm a mesma chave de ordenação
+        for codigo in ('1.10', '001', '2', '1', '1.2', '01'):
+            criar_conta(self.empresa, codigo)
+
+        codigos = self._codigos(
+            f'/api/v1/plano-de-contas/?empresa={self.empresa.id}&page_size=2')
+
+        # Chaves iguais em ordem de id, sem contas puladas ou repetidas
+        self.assertEqual(codigos, ['001', '1', '01', '1.2', '1.10', '2'])
+
+
+class ArvorePlanoDeContasTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.empresa = criar_empresa(self.user)
+        # 1 > 1.1 > 1.1.1 > 1.1.1.1, 1.1 > 1.1.2 e a raiz 2
+        self.contas = {'1': criar_conta(self.empresa, '1')}
+        for codigo in ('1.1', '1.1.1', '1.1.1.1', '1.1.2'):
+            self.contas[codigo] = criar_conta(
+                self.empresa, codigo, vinculo=self.contas[codigo.rsplit('.', 1)[0]])
+        self.contas['2'] = criar_conta(self.empresa, '2')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _caminhos(self):
+        return dict(PlanoAccount.objects.values_list('codigo', 'caminho'))
+
+    def _esperado(self, *codigos):
+        return ''.join(f'{self.contas[codigo].pk}/' for codigo in codigos)
+
+    def test_mover_subarvore_reescreve_descendentes(self):
+        conta = self.contas['1.1']
+        response = self.client.patch(
+            f'/api/v1/plano-de-contas/{conta.pk}/', {'vinculo': self.contas['2'].pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        caminhos = self._caminhos()
+        self.assertEqual(caminhos['1'], self._esperado('1'))
+        self.assertEqual(caminhos['1.1'], self._esperado('2', '1.1'))
+        self.assertEqual(caminhos['1.1.1'], self._esperado('2', '1.1', '1.1.1'))
+        self.assertEqual(caminhos['1.1.1.1'], self._esperado('2', '1.1', '1.1.1', '1.1.1.1'))
+        self.assertEqual(caminhos['1.1.2'], self._esperado('2', '1.1', '1.1.2'))
+
+        # De volta para a raiz
+        response = self.client.patch(
+            f'/api/v1/plano-de-contas/{conta.pk}/', {'vinculo': None}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._caminhos()['1.1.1.1'], self._esperado('1.1', '1.1.1', '1.1.1.1'))
+
+    def test_vinculo_com_subconta_rejeitado(self):
+        antes = self._caminhos()
+        raiz = self.contas['1']
+
+        for vinculo in ('1', '1.1.1', '1.1.1.1'):
+            with self.subTest(vinculo=vinculo):
+                response = self.client.patch(
+                    f'/api/v1/plano-de-contas/{raiz.pk}/',
+                    {'vinculo': self.contas[vinculo].pk}, format='json')
+                self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self._caminhos(), antes)
+        raiz.refresh_from_db()
+        self.assertIsNone(raiz.vinculo_id)
+
+    def test_arvore_carregada_em_uma_consulta(self):
+        raizes = list(PlanoAccount.objects.filter(
+            vinculo__isnull=True).order_by('ordem_codigo').values(*ArvoreUtils.colunas_raizes()))
+
+        with self.assertNumQueries(1):
+            arvore = ArvoreUtils.representar_arvore(raizes)
+
+        self.assertEqual([conta['codigo'] for conta in arvore], ['1', '2'])
+        nivel = arvore[0]
+        for codigo in ('1.1', '1.1.1', '1.1.1.1'):
+            nivel = nivel['subcontas'][0]
+            self.assertEqual(nivel['codigo'], codigo)
+        self.assertEqual(
+            [conta['codigo'] for conta in arvore[0]['subcontas'][0]['subcontas']],
+            ['1.1.1', '1.1.2'])
+
+        raizes = list(PlanoAccount.objects.filter(vinculo__isnull=True))
+        with self.assertNumQueries(1):
+            subcontas = ArvoreUtils.carregar_descendentes(raizes)
+        self.assertEqual(len(subcontas[self.contas['1.1'].pk]), 2)
+
+
+class ConsultasPorListagemTests(TestCase):
+    """A listagem faz o mesmo número de consultas com qualquer profundidade"""
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _consultas(self, profundidade, documento):
+        # Três raízes, cada uma com uma cadeia de `profundidade` níveis
+        empresa = criar_empresa(self.user, documento)
+        for raiz in (1, 2, 3):
+            codigo = f'{profundidade}{raiz}'
+            conta = criar_conta(empresa, codigo)
+            for nivel in range(1, profundidade):
+                codigo = f'{codigo}.{nivel}'
+                conta = criar_conta(empresa, codigo, vinculo=conta)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(f'/api/v1/plano-de-contas/?empresa={empresa.id}')
+        self.assertEqual(response.status_code, 200)
+        return len(consultas)
+
+    def test_profundidade_2_e_6(self):
+        for leitura_rapida in (True, False):
+            with self.subTest(leitura_rapida=leitura_rapida), \
+                    override_settings(LEITURA_RAPIDA=leitura_rapida):
+                Empresa.objects.all().delete()
+                self.assertEqual(
+                    self._consultas(2, '11.222.333/0001-81'),
+                    self._consultas(6, '11.444.777/0001-61'))
+
+
+class ExportacaoPlanoDeContasTests(TestCase):
+    URL = '/api/v1/plano-de-contas/exportar/'
+
+    def setUp(self):
+        self.user = User.objects.create(name='Teste', email='teste@teste.com')
+        self.outro = User.objects.create(name='Outro', email='outro@teste.com')
+        self.empresa = criar_empresa(self.user)
+        self.empresa_outro = criar_empresa(self.outro, '11.444.777/0001-61')
+
+        raiz = criar_conta(self.empresa, '1')
+        criar_conta(self.empresa, '1.1', vinculo=raiz, tipo='A')
+        criar_conta(self.empresa_outro, '2')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _codigos(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        linhas = b''.join(response.streaming_content).decode().splitlines()
+        return [json.loads(linha)['codigo'] for linha in linhas]
+
+    def test_somente_contas_do_usuario(self):
+        self.assertEqual(self._codigos(f'{self.URL}?formato=ndjson'), ['1', '1.1'])
+        self.assertEqual(
+            self._codigos(f'{self.URL}?formato=ndjson&empresa={self.empresa.id}'),
+            ['1', '1.1'])
+
+    def test_empresa_de_outro_usuario(self):
+        response = self.client.get(f'{self.URL}?empresa={self.empresa_outro.id}')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(f'{self.URL}?empresa=abc')
+        self.assertEqual(response.status_code, 400)
+
+    def test_filtros_sobre_as_contas_do_usuario(self):
+        self.assertEqual(self._codigos(f'{self.URL}?formato=ndjson&q=Conta'), ['1', '1.1'])
+        self.assertEqual(self._codigos(f'{self.URL}?formato=ndjson&codigo=2'), [])
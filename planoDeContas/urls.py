@@ -1,10 +1,12 @@
 from django.urls import path
 
-from planoDeContas.views import PlanoDeContasAPIView, PlanoDeContasRetrieveUpdateDestroyAPIView
+from planoDeContas.views import PlanoDeContasAPIView, PlanoDeContasRetrieveUpdateDestroyAPIView, PlanoDeContasExportacaoAPIView
 
 urlpatterns = [
     path('plano-de-contas/', PlanoDeContasAPIView.as_view(),
          name='plano-de-contas-list-create'),
+    path('plano-de-contas/exportar/', PlanoDeContasExportacaoAPIView.as_view(),
+         name='plano-de-contas-exportar'),
     path('plano-de-contas/<int:pk>/', PlanoDeContasRetrieveUpdateDestroyAPIView.as_view(),
          name='plano-de-contas-detail')
 ]
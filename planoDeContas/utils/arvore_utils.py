@@ -0,0 +1,128 @@
+# utils/arvore_utils.py
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db.models import Q
+
+from app.utils.leitura_rapida import LeituraRapida
+from planoDeContas.models import PlanoAccount
+from planoDeContas.serializers import PlanoAccountRecursivoSerializer, PlanoDeContasModelSerializer
+
+
+class ArvoreUtils:
+    @staticmethod
+    def agrupar_subcontas(contas):
+        """
+        Agrupa as contas pelo vínculo em uma única passada
+        Retorna um dicionário {id_da_conta_pai: [subcontas]}
+        """
+        subcontas = {}
+        for conta in contas:
+            if conta.vinculo_id is not None:
+                subcontas.setdefault(conta.vinculo_id, []).append(conta)
+        return subcontas
+
+    @staticmethod
+    def carregar_descendentes(raizes):
+        """
+        Carrega as subcontas (em qualquer nível) das contas informadas
+        em uma única consulta usando o caminho materializado
+        """
+        if not raizes:
+            return {}
+
+        filtro = reduce(or_, [
+            Q(caminho__startswith=raiz.caminho) for raiz in raizes
+        ])
+        descendentes = PlanoAccount.objects.filter(
+            filtro).order_by('ordem_codigo', 'id')
+
+        return ArvoreUtils.agrupar_subcontas(descendentes)
+
+    @staticmethod
+    def _leituras():
+        principal = LeituraRapida.para(
+            PlanoDeContasModelSerializer,
+            ordem=PlanoDeContasModelSerializer.ORDEM_CAMPOS,
+            externos=('subcontas',)
+        )
+        recursiva = LeituraRapida.para(
+            PlanoAccountRecursivoSerializer,
+            ordem=PlanoAccountRecursivoSerializer.ORDEM_CAMPOS,
+            externos=('subcontas',)
+        )
+        return principal, recursiva
+
+    @staticmethod
+    def colunas_raizes():
+        """Colunas do .values() das contas raiz (inclui caminho e ordenação)"""
+        principal, _ = ArvoreUtils._leituras()
+        return [*principal.colunas, 'caminho', 'ordem_codigo']
+
+    @staticmethod
+    def representar_arvore(raizes):
+        """
+        Leitura rápida da árvore: mesma saída do PlanoDeContasModelSerializer
+        com as subcontas carregadas em memória, a partir de .values()
+        raizes: linhas com as colunas de colunas_raizes()
+        """
+        principal, recursiva = ArvoreUtils._leituras()
+        if not raizes:
+            return []
+
+        filtro = reduce(or_, [
+            Q(caminho__startswith=raiz['caminho']) for raiz in raizes
+        ])
+        descendentes = PlanoAccount.objects.filter(filtro).order_by(
+            'ordem_codigo', 'id').values(*recursiva.colunas, 'vinculo_id')
+
+        subcontas = {}
+        for conta in descendentes:
+            if conta['vinculo_id'] is not None:
+                subcontas.setdefault(conta['vinculo_id'], []).append(conta)
+
+        def representar_subcontas(conta):
+            return recursiva.representar(
+                subcontas.get(conta['id'], []),
+                {'subcontas': representar_subcontas}
+            )
+
+        return principal.representar(raizes, {'subcontas': representar_subcontas})
+
+    @staticmethod
+    def linhas_com_caminho(linhas, maximo_cache=10000):
+        """
+        Recebe blocos de linhas (tuplas iniciadas por id, codigo e caminho)
+        e devolve cada linha com o caminho completo de códigos ("1 > 1.1 > 1.1.2")
+        Os códigos dos ancestrais que ainda não foram vistos são buscados em
+        uma única consulta por bloco e mantidos num cache de tamanho limitado
+        """
+        codigos = {}
+
+        for bloco in linhas:
+            for id, codigo, _caminho, *_ in bloco:
+                codigos[id] = codigo
+
+            faltando = {
+                int(ancestral)
+                for _, _, caminho, *_ in bloco
+                for ancestral in caminho.split('/')[:-2]
+                if ancestral and int(ancestral) not in codigos
+            }
+            if faltando:
+                codigos.update(PlanoAccount.objects.filter(
+                    id__in=faltando).values_list('id', 'codigo'))
+
+            for id, codigo, caminho, *resto in bloco:
+                ancestrais = [
+                    codigos.get(int(ancestral), '')
+                    for ancestral in caminho.split('/')[:-2] if ancestral
+                ]
+                yield (id, codigo, ' > '.join([*ancestrais, codigo]), *resto)
+
+            # Descarta os códigos mais antigos para manter a memória constante
+            excedente = len(codigos) - maximo_cache
+            if excedente > 0:
+                for chave in list(islice(codigos, excedente)):
+                    del codigos[chave]
@@ -0,0 +1,109 @@
+# utils/cache_utils.py
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ArvoreCache:
+    """
+    Cache da árvore serializada do plano de contas por empresa
+    A versão de cada empresa é incrementada a cada alteração de conta,
+    invalidando todas as árvores salvas anteriormente
+    Com o LocMemCache padrão cada worker só enxerga as próprias invalidações:
+    a listagem inclui a versão do banco (VersaoUtils.plano) na página, então
+    uma árvore anterior à alteração nunca é servida por outro worker
+    """
+    PREFIXO = 'plano_contas:arvore'
+    TODAS = 'todas'
+
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @classmethod
+    def _chave_versao(cls, empresa_id):
+        return f'{cls.PREFIXO}:versao:{empresa_id or cls.TODAS}'
+
+    @classmethod
+    def _chave_dados(cls, empresa_id, pagina):
+        # A página (url com cursor e page_size) entra como hash na chave
+        pagina = hashlib.md5(pagina.encode()).hexdigest()
+        return f'{cls.PREFIXO}:dados:{empresa_id or cls.TODAS}:{pagina}'
+
+    @classmethod
+    def obter(cls, empresa_id=None, pagina=''):
+        """
+        Retorna (versão, árvore salva para a versão ou None)
+        Versão e dados são lidos juntos em uma única ida ao cache; a versão
+        deve ser repassada ao salvar(), pois foi lida antes de montar a árvore
+        """
+        chave_versao = cls._chave_versao(empresa_id)
+        chave_dados = cls._chave_dados(empresa_id, pagina)
+        valores = cache.get_many([chave_versao, chave_dados])
+
+        versao = valores.get(chave_versao)
+        salvo = valores.get(chave_dados)
+
+        if versao is not None and salvo is not None and salvo[0] == versao:
+            cls._registrar(hit=True)
+            return versao, salvo[1]
+
+        cls._registrar(hit=False)
+        if versao is None:
+            versao = cls._versao_atual(empresa_id)
+        return versao, None
+
+    @classmethod
+    def salvar(cls, empresa_id, dados, pagina='', versao=None):
+        """
+        versao: a versão retornada por obter(); uma invalidação durante a
+        montagem da árvore a torna obsoleta e a árvore nunca é servida
+        """
+        if versao is None:
+            versao = cls._versao_atual(empresa_id)
+        cache.set(
+            cls._chave_dados(empresa_id, pagina),
+            (versao, dados),
+            settings.PLANO_CONTAS_CACHE_TIMEOUT
+        )
+
+    @classmethod
+    def invalidar(cls, *empresas_ids):
+        """Incrementa a versão das empresas informadas e da listagem geral"""
+        for empresa_id in {*empresas_ids, None}:
+            try:
+                cache.incr(cls._chave_versao(empresa_id))
+            except ValueError:
+                # Chave inexistente (nunca lida ou removida pelo cache)
+                cls._versao_atual(empresa_id)
+
+    @classmethod
+    def estatisticas(cls):
+        total = cls._hits + cls._misses
+        return {
+            'hits': cls._hits,
+            'misses': cls._misses,
+            'taxa_acerto': cls._hits / total if total else 0.0,
+        }
+
+    @classmethod
+    def _versao_atual(cls, empresa_id):
+        chave = cls._chave_versao(empresa_id)
+        versao = cache.get(chave)
+        if versao is None:
+            # Versão inicial baseada no relógio para nunca coincidir com
+            # árvores salvas antes da chave ter sido removida do cache
+            cache.add(chave, time.time_ns(), None)
+            versao = cache.get(chave)
+        return versao
+
+    @classmethod
+    def _registrar(cls, hit):
+        with cls._lock:
+            if hit:
+                cls._hits += 1
+            else:
+                cls._misses += 1
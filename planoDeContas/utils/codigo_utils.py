@@ -0,0 +1,20 @@
+# utils/codigo_utils.py
+import re
+
+
+class CodigoUtils:
+    # Quantidade de dígitos usada para alinhar cada número do código
+    DIGITOS = 9
+
+    @staticmethod
+    def chave_ordenacao(codigo):
+        """
+        Gera a chave de ordenação natural do código
+        Ex: "1.2" -> "000000001.000000002" e "1.10" -> "000000001.000000010",
+        fazendo "1.2" vir antes de "1.10" numa ordenação simples de texto
+        """
+        return re.sub(
+            r'\d+',
+            lambda numero: numero.group().zfill(CodigoUtils.DIGITOS),
+            (codigo or '').strip().lower()
+        )
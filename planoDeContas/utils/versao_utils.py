@@ -0,0 +1,21 @@
+# utils/versao_utils.py
+from django.db.models import Count, Max
+
+from planoDeContas.models import PlanoAccount
+
+
+class VersaoUtils:
+    @staticmethod
+    def plano(empresa_id=None):
+        """
+        Versão das contas da empresa (ou de todas) lida do banco, igual em
+        todos os processos: a maior data identifica inclusões e alterações
+        (a conta movida é salva), a quantidade identifica exclusões
+        """
+        queryset = PlanoAccount.objects.all()
+        if empresa_id:
+            queryset = queryset.filter(empresa_id=empresa_id)
+
+        resumo = queryset.order_by().aggregate(
+            alterado=Max('atualizado_em'), total=Count('id'))
+        return resumo['alterado'], resumo['total']
@@ -1,33 +1,115 @@
 from django_filters.rest_framework import DjangoFilterBackend
 
+from django.conf import settings
+from django.http import Http404
+
 from rest_framework import generics
+from rest_framework.views import APIView
+from rest_framework.response import Response
 
+from empresa.models import Empresa
 from planoDeContas.models import PlanoAccount
 from planoDeContas.serializers import PlanoDeContasModelSerializer, PlanoDeContasRetrieveUpdateModel
 
 from .filters import PlanoDeContasFilter
+from .utils.arvore_utils import ArvoreUtils
+from .utils.cache_utils import ArvoreCache
+from .utils.versao_utils import VersaoUtils
+from app.utils.etag_utils import ETagUtils
+from app.utils.exceptions import ValidationError
+from app.utils.exportacao import ExportacaoUtils
+from app.utils.pagination import CursorPagination
+
+
+class PlanoDeContasPagination(CursorPagination):
+    # Contas em ordem natural do código ("1.2" antes de "1.10")
+    # A chave pode repetir ("1" e "01"): o id desempata e mantém o cursor estável
+    ordering = ('ordem_codigo', 'id')
 
 
 class PlanoDeContasAPIView(generics.ListCreateAPIView):
     serializer_class = PlanoDeContasModelSerializer
+    pagination_class = PlanoDeContasPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = PlanoDeContasFilter
 
     def get_queryset(self):
         """
         Filtra as contas dependendo da existência de uma pesquisa:
-        - Se houver pesquisa (q), retorna todas as contas e aplica o filtro.
+        - Se houver pesquisa (q ou codigo), retorna todas as contas e aplica o filtro.
         - Caso contrário, retorna apenas contas sem vínculo.
         """
-        q = self.request.query_params.get('q', None)  # Verifica se há pesquisa
-
-        if q:
+        if self._tem_pesquisa():
             # Se houver pesquisa, retorna todas as contas e aplica o filtro
             return PlanoAccount.objects.all()  # Aplica o filtro de pesquisa a todas as contas
 
         # Se não houver pesquisa, retorna apenas as contas sem vínculo
         return PlanoAccount.objects.filter(vinculo__isnull=True)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Pagina as contas raiz e monta a subárvore de cada página em memória
+        a partir do caminho materializado, evitando uma consulta por conta
+        """
+        empresa_id = request.query_params.get('empresa', None)
+        if empresa_id and not empresa_id.isdigit():
+            raise ValidationError("Parâmetro 'empresa' inválido.")
+
+        # GET condicional: a versão lida do banco muda a cada alteração, então
+        # uma ETag igual responde 304 com uma única consulta, sem serializar
+        versao = VersaoUtils.plano(empresa_id)
+        etag = ETagUtils.gerar(*versao, request.get_full_path())
+        if ETagUtils.confere(request, etag):
+            return ETagUtils.nao_modificado(etag)
+
+        return ETagUtils.aplicar(self._listar(request, empresa_id, versao), etag)
+
+    def _listar(self, request, empresa_id, versao_banco):
+        queryset = self.get_queryset()
+        if empresa_id:
+            queryset = queryset.filter(empresa_id=empresa_id)
+
+        if self._tem_pesquisa():
+            return self.get_paginated_response(
+                self._arvore(self.filter_queryset(queryset)))
+
+        # Sem pesquisa a página é servida do cache versionado por empresa
+        # A versão do banco entra na chave: um worker que não recebeu a
+        # invalidação (cache local) não serve a árvore anterior
+        pagina = f'{versao_banco}|{request.build_absolute_uri()}'
+        versao, dados = ArvoreCache.obter(empresa_id, pagina)
+        if dados is not None:
+            return Response(dados, headers={'X-Cache': 'HIT'})
+
+        response = self.get_paginated_response(self._arvore(queryset))
+        # Salva com a versão lida antes da montagem, nunca com a atual
+        ArvoreCache.salvar(empresa_id, response.data, pagina, versao)
+
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _tem_pesquisa(self):
+        params = self.request.query_params
+        return bool(params.get('q', None) or params.get('codigo', None))
+
+    def _arvore(self, queryset):
+        """Pagina as contas raiz e monta a árvore de cada página"""
+        if settings.LEITURA_RAPIDA:
+            # Leitura rápida: .values() e conversores pré-compilados
+            raizes = self.paginate_queryset(
+                queryset.values(*ArvoreUtils.colunas_raizes()))
+            return ArvoreUtils.representar_arvore(raizes)
+
+        return self._serializar_arvore(self.paginate_queryset(queryset))
+
+    def _serializar_arvore(self, raizes):
+        context = self.get_serializer_context()
+        context['subcontas'] = ArvoreUtils.carregar_descendentes(raizes)
+
+        serializer = self.get_serializer_class()(
+            raizes, many=True, context=context)
+        return serializer.data
+
     def get_serializer_context(self):
         """Passa o contexto para o serializer incluindo controle de profundidade (depth e max_depth) controle de loop"""
         context = super().get_serializer_context()
@@ -40,3 +122,42 @@ class PlanoDeContasAPIView(generics.ListCreateAPIView):
 class PlanoDeContasRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = PlanoAccount.objects.all()
     serializer_class = PlanoDeContasRetrieveUpdateModel
+
+
+class PlanoDeContasExportacaoAPIView(APIView):
+    def get(self, request):
+        """
+        Exporta o plano de contas em CSV ou NDJSON (?formato=csv|ndjson)
+        Aceita os filtros da listagem (q, codigo, empresa) e cada linha traz
+        o caminho completo de códigos até a conta
+        Somente as contas das empresas do usuário são exportadas
+        """
+        formato = ExportacaoUtils.formato(request)
+
+        queryset = PlanoAccount.objects.filter(empresa__user=request.user)
+        empresa_id = request.query_params.get('empresa', None)
+        if empresa_id:
+            if not empresa_id.isdigit():
+                raise ValidationError("Parâmetro 'empresa' inválido.")
+            # Empresa de outro usuário responde como inexistente
+            if not Empresa.objects.filter(id=empresa_id, user=request.user).exists():
+                raise Http404
+            queryset = queryset.filter(empresa_id=empresa_id)
+
+        filtro = PlanoDeContasFilter(
+            request.query_params, queryset=queryset, request=request)
+        if not filtro.is_valid():
+            raise ValidationError(filtro.errors)
+
+        colunas = ['id', 'codigo', 'caminho', 'nome', 'tipo', 'descricao',
+                   'vinculo_id', 'empresa_id', 'cadastrado_em', 'atualizado_em']
+
+        # iterator() lê em blocos (cursor no servidor no PostgreSQL)
+        linhas = filtro.qs.order_by('ordem_codigo', 'id').values_list(
+            *colunas).iterator(chunk_size=settings.EXPORTACAO_CHUNK_SIZE)
+
+        linhas = ArvoreUtils.linhas_com_caminho(
+            ExportacaoUtils.em_blocos(linhas))
+
+        colunas[2] = 'caminho_codigo'
+        return ExportacaoUtils.resposta(linhas, colunas, formato, 'plano-de-contas')